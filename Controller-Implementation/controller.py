@@ -3,6 +3,7 @@
 import argparse
 import os
 import threading
+import time
 from libs.core.BaseController import BaseController
 from libs.controller.IPv4Controller import IPv4Controller
 from libs.controller.TunnelController import *
@@ -15,6 +16,8 @@ from libs.Configuration import Configuration
 from libs.controller.TopologyController import TopologyController
 from libs.controller.BierController import BierController
 from libs.core.GRPCServer import GRPCServer
+from libs.core.ComputePool import ComputePool
+from libs.Exceptions import ConfigurationNotFound
 
 
 def connect_to_switches(controller=None):
@@ -27,6 +30,24 @@ def connect_to_switches(controller=None):
     controller.connect()
     Configuration.set('system_done', True)
 
+    # the local controllers only report changes of their neighbors, so all neighbors
+    # are requested again, e.g. after a restart of the global controller
+    for switch in Configuration.get('switches'):
+        Event.trigger('adjacency_resync', switch=switch['name'])
+
+    # handle the messages of the local controllers that arrived while connecting
+    Event.trigger('system_done')
+
+def reconcile_periodically(interval=0):
+    """
+    Compare the entries on the switches with the computed entries and repair differences
+    :param interval: seconds between two reconciliations
+    :return:
+    """
+    while True:
+        time.sleep(interval)
+        Event.trigger('reconcile')
+
 def load_static_rules(*args):
     Log.async_info("Write static rules...")
 
@@ -36,9 +57,30 @@ def load_static_rules(*args):
 def main():
     Configuration.set('system_done', False)
 
+    # table entries of different switches are computed by a pool of processes if configured,
+    # the pool is started first, so that its processes are forked before any other thread runs
+    try:
+        ComputePool.start(processes=Configuration.get('compute_processes'))
+    except ConfigurationNotFound:
+        pass
+
     # without this line, no events would be fired, no topology discovered and no entries computed
     Event.activate()
 
+    # events of local controllers are executed by a worker thread,
+    # so that grpc calls return without waiting for the recomputation,
+    # they share one queue to be handled in the order in which they arrived
+    Event.queue(["igmp_packet_in", "topology_packet_in", "port_message"])
+
+    # topology changes that arrive in a burst (e.g. during discovery or from both ends
+    # of a failed link) are merged into one recomputation
+    try:
+        max_delay = Configuration.get('max_delay')
+    except ConfigurationNotFound:
+        max_delay = Configuration.get('delay') * 10
+
+    Event.coalesce("topology_change", min_hold=Configuration.get('delay'), max_hold=max_delay)
+
     # register event for new switch connections, this will add switches to device list
     Event.on('new_switch_connection', TopologyManager.add_device)
 
@@ -48,7 +90,6 @@ def main():
     # register events for static classes
     Event.on("igmp_packet_in", GroupManager.handle_packet_in)  # handles (un-)sub requests
     Event.on("port_message", TopologyManager.react_to_port_change)
-    Event.on("topology_change", TopologyManager.build_domain)
 
     topology = TopologyController(controller)
 
@@ -66,6 +107,17 @@ def main():
 
     CLI.add_command("load_static_rules", load_static_rules, "Load static rules", ipv4)
 
+    # repair entries that differ from the computed entries, e.g. after a switch or local controller restart
+    Event.on('reconcile', controller.reconcile_table_entries)
+
+    try:
+        reconcile = threading.Thread(target=reconcile_periodically,
+                                     kwargs={'interval': Configuration.get('reconcile_interval')})
+        reconcile.daemon = True
+        reconcile.start()
+    except ConfigurationNotFound:
+        pass
+
     # start global grpc control server
     GRPCServer(listen_port=Configuration.get('listen_port')).start()
 
@@ -125,14 +125,17 @@ class GroupManager:
         mc_addr = pkt.mc_address.encode('utf-8')
         src_ip = pkt.src_ip.encode('utf-8')
 
-        
+        # local controllers only report a group if the membership of the switch changes
+        # between empty and non-empty, a group update is only needed on such a change
+        subscribed = bool(GroupManager.group_to_member.get(switch, {}).get(mc_addr))
 
         if pkt.type == 0x16:
             GroupManager.add_to_group(switch, src_ip, mc_addr)
         elif pkt.type == 0x17:
             GroupManager.remove_from_group(switch, src_ip, mc_addr)
 
-        Event.trigger("group_update")
+        if subscribed != bool(GroupManager.group_to_member.get(switch, {}).get(mc_addr)):
+            Event.trigger("group_update")
 
         Log.event("Got igmp packet with type", hex(pkt.type), "and src", src_ip, "for group", mc_addr, "from", switch)
 
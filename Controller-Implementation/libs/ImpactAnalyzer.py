@@ -0,0 +1,64 @@
+"""
+This module determines which switches are affected by a topology change
+
+The analysis is based on the (source, destination) pairs whose first hop changed
+(see TopologyManager.get_changed_paths and ShortestPaths.first_hops). The controllers
+only recompute and diff the entries of the affected switches instead of the entries
+of all switches.
+"""
+
+from libs.TopologyManager import TopologyManager
+from libs.Exceptions import TableNotFound
+
+
+class ImpactAnalyzer:
+
+    @staticmethod
+    def get_affected_switches(table_name=None, switches=None, since=None, node_protection=False):
+        """
+        Returns the switches whose entries in the given table can differ since the last analysis
+        - ipv4 entries of a switch depend on its next hops towards all devices in domain 0
+        - bier entries of a switch depend on its next hops towards the switches of its domains,
+          with node protection also on the next hops of its neighbors
+        :param table_name: name of the table
+        :param switches: switches that should be checked
+        :param since: change number returned by the last analysis for this table, None if there was none
+        :param node_protection: bier-frr node protection is used
+        :return: (set of affected switches, change number for the next analysis)
+        """
+        if table_name == "ingress.ipv4_c.ipv4":
+            domains = [0]
+        elif table_name == "ingress.bier_c.bift":
+            domains = set()
+
+            for switch in switches:
+                domains.update(TopologyManager.get_domain_for_device(switch))
+        else:
+            raise TableNotFound(table_name)
+
+        number = TopologyManager.path_change_number
+        affected = set()
+
+        for domain in domains:
+            changes, number = TopologyManager.get_changed_paths(domain_id=domain, since=since)
+
+            # all entries may have changed
+            if changes is None:
+                return set(switches), number
+
+            for source, destination in changes:
+                # bier entries are only computed towards switches
+                if table_name == "ingress.bier_c.bift" and \
+                        TopologyManager.get_device(destination).get_type() == "Host":
+                    continue
+
+                affected.add(source)
+
+                # the backup entries of the neighbors are computed from the bift of source
+                if table_name == "ingress.bier_c.bift" and node_protection:
+                    graph = TopologyManager.get_topology(domain).get_graph()
+
+                    if graph.has_node(source):
+                        affected.update(graph.predecessors(source))
+
+        return set(switch for switch in switches if switch in affected), number
@@ -0,0 +1,222 @@
+"""
+This module maintains the shortest paths of a topology
+
+All shortest paths are computed once with networkx. When a single edge is added or removed,
+only the shortest path trees of the affected sources are repaired, and of each tree only the
+part below the changed edge.
+
+The table entries use the first hops of first_hops, which only depend on the distances:
+of several shortest paths, the one with the smallest first hop is used. Every update
+returns the (source, destination) pairs whose first hop can have changed, these are
+the pairs whose distance changed, the pairs of the predecessors of their sources and
+all pairs of a source that gained or lost a successor.
+"""
+
+from collections import deque
+import heapq
+import networkx as nx
+
+
+class ShortestPaths(object):
+
+    def __init__(self, graph=None):
+        """
+        Compute all shortest paths of the graph
+        :param graph: nx.DiGraph, later changes of single edges are applied with add_edge and remove_edge
+        """
+        self._graph = graph
+
+        # {source: {destination: path}}, each path is the path to its second to last node plus the destination
+        self.paths = dict(nx.all_pairs_shortest_path(graph))
+
+    def get_paths(self):
+        """
+        Returns the shortest paths
+        :return: {source: {destination: path}}
+        """
+        return self.paths
+
+    @staticmethod
+    def first_hops(graph=None, source=None):
+        """
+        Breadth first search from source that finds the first hop towards every destination
+        If there are several shortest paths, the smallest first hop is used, so that the
+        first hops do not depend on the order of the search
+        :param graph: {node: list of successors}
+        :param source: start node
+        :return: {destination: first hop}, without the source itself
+        """
+        distances = {source: 0}
+        hops = {}
+        queue = deque([source])
+
+        # all nodes of a distance are searched before the first node of the next distance,
+        # so the first hop of a node is final when it is taken from the queue
+        while queue:
+            node = queue.popleft()
+            hop = hops.get(node)
+
+            for successor in graph.get(node, ()):
+                distance = distances.get(successor)
+
+                if distance is None:
+                    distances[successor] = distances[node] + 1
+                    hops[successor] = successor if hop is None else hop
+                    queue.append(successor)
+                elif distance == distances[node] + 1 and hop is not None and hop < hops[successor]:
+                    hops[successor] = hop
+
+        return hops
+
+    @staticmethod
+    def changed_pairs(old=None, new=None):
+        """
+        Compares the distances of two sets of shortest paths
+        :param old: ShortestPaths
+        :param new: ShortestPaths
+        :return: set of (source, destination) pairs whose first hop can differ
+        """
+        old_paths = old.get_paths()
+        new_paths = new.get_paths()
+
+        # {(source, destination): old path}
+        distances = {}
+
+        for source in set(old_paths) | set(new_paths):
+            old_source = old_paths.get(source, {})
+            new_source = new_paths.get(source, {})
+
+            for destination in set(old_source) | set(new_source):
+                old_path = old_source.get(destination)
+                new_path = new_source.get(destination)
+
+                if old_path is None or new_path is None or len(old_path) != len(new_path):
+                    distances[(source, destination)] = old_path
+
+        return new.first_hop_changes(distances=distances, graphs=[old._graph, new._graph])
+
+    def first_hop_changes(self, distances=None, graphs=None):
+        """
+        Returns the pairs whose first hop can differ after the distances of some pairs changed
+        :param distances: {(source, destination): old path} of the pairs whose distance changed
+        :param graphs: graphs before and after the change, for the predecessors of the sources
+        :return: set of (source, destination) pairs
+        """
+        changed = set(distances)
+
+        for (source, destination), old_path in distances.iteritems():
+            # the first hops of the predecessors use the distance of source
+            for graph in graphs:
+                if graph.has_node(source):
+                    changed.update((predecessor, destination) for predecessor in graph.predecessors(source))
+
+            # source gained or lost destination as successor, all of its first hops can differ
+            new_path = self.paths.get(source, {}).get(destination)
+
+            if (old_path is not None and len(old_path) == 2) or (new_path is not None and len(new_path) == 2):
+                changed.update((source, node) for node in self.paths.get(source, {}))
+
+        return changed
+
+    def add_edge(self, u=None, v=None):
+        """
+        Update the shortest paths after the edge u -> v has been added to the graph
+        Only destinations that got closer to a source get a new path
+        :param u: start of the edge
+        :param v: end of the edge
+        :return: set of (source, destination) pairs whose first hop can have changed
+        """
+        # {(source, destination): old path}
+        distances = {}
+
+        for node in (u, v):
+            self.paths.setdefault(node, {node: [node]})
+
+        for source, paths in self.paths.iteritems():
+            if u not in paths:
+                continue
+
+            path = paths.get(v)
+
+            if path is not None and len(path) <= len(paths[u]) + 1:
+                continue
+
+            paths[v] = paths[u] + [v]
+            distances[(source, v)] = path
+
+            # all nodes behind v that are reached faster via v
+            queue = deque([v])
+
+            while queue:
+                node = queue.popleft()
+
+                for successor in self._graph.successors(node):
+                    path = paths.get(successor)
+
+                    if path is not None and len(path) <= len(paths[node]) + 1:
+                        continue
+
+                    paths[successor] = paths[node] + [successor]
+                    distances[(source, successor)] = path
+                    queue.append(successor)
+
+        return self.first_hop_changes(distances=distances, graphs=[self._graph])
+
+    def remove_edge(self, u=None, v=None):
+        """
+        Update the shortest paths after the edge u -> v has been removed from the graph
+        Only sources whose shortest path tree contains the edge are updated
+        :param u: start of the edge
+        :param v: end of the edge
+        :return: set of (source, destination) pairs whose first hop can have changed
+        """
+        # {(source, destination): old path}
+        distances = {}
+
+        for source, paths in self.paths.iteritems():
+            path = paths.get(v)
+
+            if path is None or len(path) < 2 or path[-2] != u:
+                continue
+
+            # destinations whose path uses the removed edge
+            subtree = [v]
+
+            for node in subtree:
+                for successor in self._graph.successors(node):
+                    path = paths.get(successor)
+
+                    if path is not None and len(path) > 1 and path[-2] == node:
+                        subtree.append(successor)
+
+            old_paths = dict((node, paths.pop(node)) for node in subtree)
+
+            # reattach the subtree to the rest of the tree, shortest candidates first
+            candidates = []
+
+            for node in subtree:
+                for predecessor in self._graph.predecessors(node):
+                    if predecessor in paths:
+                        candidates.append((len(paths[predecessor]), len(candidates), node, predecessor))
+
+            heapq.heapify(candidates)
+            counter = len(candidates)
+
+            while candidates:
+                _, _, node, predecessor = heapq.heappop(candidates)
+
+                if node in paths:
+                    continue
+
+                paths[node] = paths[predecessor] + [node]
+
+                for successor in self._graph.successors(node):
+                    if successor in old_paths and successor not in paths:
+                        heapq.heappush(candidates, (len(paths[node]), counter, successor, node))
+                        counter += 1
+
+            for node, path in old_paths.iteritems():
+                if node not in paths or len(paths[node]) != len(path):
+                    distances[(source, node)] = path
+
+        return self.first_hop_changes(distances=distances, graphs=[self._graph])
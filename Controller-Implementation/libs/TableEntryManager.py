@@ -10,13 +10,49 @@ are computed, they are compared to the old ones.
 - If the rule has already been written (unchanged with new topology) no update will be triggered.
 - If the rule has changed (same match fields, but different actions) the rule has to be changed
 - If the rule doesnt exist anymore (e.g. a node has been moved to another domain) the rule has to be deleted
+
+Entries are indexed by switch and a canonical (frozen) key of their match fields,
+so all checks above are dictionary lookups instead of scans over the table.
+
+Writes are not sent immediately. They are queued per switch and handed to the write
+scheduler of the controller when the manager is flushed at the end of a recompute.
+Each table has a priority class, writes of higher classes are sent first (see WriteScheduler).
+
+The digest of the entries computed for a switch is kept per table, a recompute with the
+same digest has nothing to compare and is skipped (see entries_digest).
 """
 
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+import hashlib
 from libs.core.Log import Log
 from prettytable import PrettyTable
 from libs.Exceptions import EntryNotFound, TableManagerNotFound, TableNotFound
 
+# update types of queued writes
+INSERT = "INSERT"
+MODIFY = "MODIFY"
+DELETE = "DELETE"
+
+# priority classes of queued writes, lower classes are written first
+WRITE_REPAIR = 0
+WRITE_BIER = 1
+WRITE_ENCAP = 2
+WRITE_IPV4 = 3
+
+
+class Lpm(namedtuple('Lpm', ['value', 'prefix_len'])):
+    """
+    Value of a lpm match field
+    """
+    pass
+
+
+class Ternary(namedtuple('Ternary', ['value', 'mask'])):
+    """
+    Value of a ternary match field
+    """
+    pass
+
 
 class TableEntry:
     """
@@ -46,30 +82,90 @@ class TableEntry:
             self.action_params == other.action_params and \
             self.priority == other.priority
 
+    def __ne__(self, other):
+        return not self == other
+
     def __str__(self):
         return str(self.switch) + "-" + str(self.match_fields) + "-" + str(self.action_name) \
             + "-" + str(self.action_params) + "-" + str(self.priority)
 
+    def get_match_key(self):
+        """
+        Canonical hashable representation of the match fields
+        :return: frozenset of (field, value) pairs
+        """
+        return match_key(self.match_fields)
+
+
+def entries_digest(entries=None):
+    """
+    Digest of a list of entries, independent of their order
+    :param entries: list of TableEntry
+    :return: digest
+    """
+    return hashlib.sha1("\n".join(sorted(str(entry) for entry in entries))).digest()
+
+
+def match_key(match_fields=None):
+    """
+    Converts match fields into a canonical hashable key
+    :param match_fields: dict of match fields
+    :return: frozenset of (field, value) pairs
+    """
+    return frozenset((field, tuple(value) if isinstance(value, list) else value)
+                     for field, value in match_fields.iteritems())
+
 
 class TableEntryManager:
     Manager = {}
 
     def __init__(self, controller=None, name=None):
-        self.tables = defaultdict(list)
+        # {table_name: {switch: {match key: TableEntry}}}
+        self.tables = defaultdict(lambda: defaultdict(dict))
         self.__controller = controller
         self.name = name
 
+        # queued writes {switch: [(update type, table_name, TableEntry)]}
+        self.pending = defaultdict(list)
+
+        # {table_name: priority class of its writes}
+        self.write_classes = {}
+
+        # {(table_name, switch): digest of the entries that have been computed last}
+        self.digests = {}
+
         # add this table manager to manager list to get access to
         # different controller manager
         TableEntryManager.Manager[name] = self
 
-    def init_table(self, table_name=None):
+    def init_table(self, table_name=None, write_class=WRITE_IPV4):
         """
         Initialize storage for table
         :param table_name: table name
+        :param write_class: priority class of the writes to this table
+        :return:
+        """
+        self.tables[table_name] = defaultdict(dict)
+        self.write_classes[table_name] = write_class
+
+    def get_digest(self, table_name=None, switch=None):
+        """
+        Get the digest of the entries that have been computed last for a switch
+        :param table_name: name of the table
+        :param switch: switch name
+        :return: digest or None
+        """
+        return self.digests.get((table_name, switch))
+
+    def set_digest(self, table_name=None, switch=None, digest=None):
+        """
+        Remember the digest of the computed entries of a switch, after they have been handled
+        :param table_name: name of the table
+        :param switch: switch name
+        :param digest: digest, see entries_digest
         :return:
         """
-        self.tables[table_name] = []
+        self.digests[(table_name, switch)] = digest
 
     def add_table_entry(self, table_name=None, table_entry=None):
         """
@@ -78,18 +174,16 @@ class TableEntryManager:
         :param table_entry: TableEntry object
         :return:
         """
-        self.get_table_entries(table_name=table_name).append(table_entry)
+        self.__get_table(table_name=table_name)[table_entry.switch][table_entry.get_match_key()] = table_entry
 
         # add table entry
-        self.__controller.add_table_entry(switch=table_entry.switch,
-                                          table_name=table_name,
-                                          table_entry=table_entry)
+        self.pending[table_entry.switch].append((INSERT, table_name, table_entry))
 
-    def get_table_entries(self, table_name=None):
+    def __get_table(self, table_name=None):
         """
-        Get the table with the given name
+        Get the index of the table with the given name
         :param table_name: name of the table
-        :return:
+        :return: {switch: {match key: TableEntry}}
         """
         table = self.tables.get(table_name, None)
 
@@ -98,20 +192,33 @@ class TableEntryManager:
 
         return table
 
+    def get_table_entries(self, table_name=None):
+        """
+        Get the table with the given name
+        :param table_name: name of the table
+        :return: list of TableEntry objects
+        """
+        return [entry for entries in self.__get_table(table_name=table_name).itervalues()
+                for entry in entries.itervalues()]
+
     def __get_table_entries_for_switch(self, table_name=None, switch=None):
         """
         Return all current entries for the given switch
         :param table_name: table_name
         :param switch: switch name
-        :return:
+        :return: {match key: TableEntry}
         """
-        entries = []
+        return self.__get_table(table_name=table_name).get(switch, {})
 
-        for entry in self.get_table_entries(table_name=table_name):
-            if entry.switch == switch:
-                entries.append(entry)
-
-        return entries
+    def get_entry(self, table_name=None, table_entry=None):
+        """
+        Get the stored entry with the same switch and match fields
+        :param table_name: name of the table
+        :param table_entry: TableEntry object
+        :return: TableEntry or None
+        """
+        return self.__get_table_entries_for_switch(table_name=table_name,
+                                                   switch=table_entry.switch).get(table_entry.get_match_key())
 
     def entry_exists(self, table_name=None, table_entry=None):
         """
@@ -120,7 +227,9 @@ class TableEntryManager:
         :param table_entry: TableEntry objects
         :return:
         """
-        return table_entry in self.get_table_entries(table_name=table_name)
+        entry = self.get_entry(table_name=table_name, table_entry=table_entry)
+
+        return entry is not None and entry == table_entry
 
     def match_fields_exists(self, table_name=None, table_entry=None):
         """
@@ -129,25 +238,33 @@ class TableEntryManager:
         :param table_entry: table entry, which has certain match_fields
         :return:
         """
-        for entry in self.__get_table_entries_for_switch(switch=table_entry.switch, table_name=table_name):
-            if entry.match_fields == table_entry.match_fields:
-                return True
-
-        return False
+        return self.get_entry(table_name=table_name, table_entry=table_entry) is not None
 
     def update_entry(self, table_name=None, table_entry=None):
         """
         Update a table entry
+        The entry is modified in place if only action or action params changed,
+        a changed priority is part of the key on the switch and needs delete and insert
         :param table_name: table name
         :param table_entry: new table entry
         :return:
         """
+        entries = self.__get_table_entries_for_switch(switch=table_entry.switch, table_name=table_name)
+        old_entry = entries.get(table_entry.get_match_key())
+
+        if old_entry is None:
+            raise EntryNotFound(table_entry)
 
-        # remove the old entry from table storage
-        self.__remove_table_entry(table_name=table_name, table_entry=table_entry)
+        if old_entry.priority != table_entry.priority:
+            # remove the old entry from table storage
+            self.__remove_table_entry(table_name=table_name, table_entry=old_entry)
 
-        # add new entry
-        self.add_table_entry(table_name=table_name, table_entry=table_entry)
+            # add new entry
+            self.add_table_entry(table_name=table_name, table_entry=table_entry)
+        else:
+            entries[table_entry.get_match_key()] = table_entry
+
+            self.pending[table_entry.switch].append((MODIFY, table_name, table_entry))
 
     def __remove_table_entry(self, table_name=None, table_entry=None):
         """
@@ -158,18 +275,13 @@ class TableEntryManager:
         """
 
         # remove table entry based on match_fields
-        for entry in self.__get_table_entries_for_switch(switch=table_entry.switch, table_name=table_name):
-            if entry.match_fields == table_entry.match_fields:
-                self.tables.get(table_name).remove(entry)
-
-                # delete old table entry
-                self.__controller.delete_table_entry(switch=table_entry.switch,
-                                                     table_name=table_name,
-                                                     table_entry=table_entry)
+        entries = self.__get_table_entries_for_switch(switch=table_entry.switch, table_name=table_name)
 
-                return
+        if entries.pop(table_entry.get_match_key(), None) is None:
+            raise EntryNotFound(table_entry)
 
-        raise EntryNotFound(table_entry)
+        # delete old table entry
+        self.pending[table_entry.switch].append((DELETE, table_name, table_entry))
 
     def remove_invalid_entries(self, switch=None, table_name=None, valid_entries=None):
         """
@@ -179,12 +291,101 @@ class TableEntryManager:
         :param valid_entries: a list of match fields of valid entries
         :return:
         """
-        for entry in self.__get_table_entries_for_switch(switch=switch, table_name=table_name):
+        valid_keys = set(match_key(match_fields) for match_fields in valid_entries)
+
+        for key, entry in self.__get_table_entries_for_switch(switch=switch, table_name=table_name).items():
             # the current entry is not a valid entry anymore
             # so delete it
-            if entry.match_fields not in valid_entries:
+            if key not in valid_keys:
                 self.__remove_table_entry(table_name=table_name, table_entry=entry)
 
+    def flush(self, write_class=None, wait=True):
+        """
+        Write all queued updates, the updates of different switches are written concurrently
+        :param write_class: priority class of the updates, default is the class of their table
+        :param wait: return when all updates have been written
+        :return:
+        """
+        pending, self.pending = self.pending, defaultdict(list)
+
+        if not pending:
+            return
+
+        write_classes = dict((table_name, self.write_classes[table_name] if write_class is None else write_class)
+                             for table_name in self.tables)
+
+        self.__controller.write_table_entry_batches(batches=dict(pending), write_classes=write_classes, wait=wait)
+
+    def load_table_entries(self, switch=None, table_name=None, entries=None):
+        """
+        Take over the entries that are on the switch as current entries, without writing anything
+        Used when the controller connects to a switch that still has entries of a previous run
+        :param switch: switch name
+        :param table_name: table name
+        :param entries: list of TableEntry
+        :return:
+        """
+        self.__get_table(table_name=table_name)[switch] = dict((entry.get_match_key(), entry) for entry in entries)
+        self.digests.pop((table_name, switch), None)
+
+    def repair_table_entries(self, switch=None, table_name=None, entries=None):
+        """
+        Queue the writes that bring the entries on the switch to the current entries
+        :param switch: switch name
+        :param table_name: table name
+        :param entries: list of TableEntry that are on the switch
+        :return: number of queued writes
+        """
+        current = self.__get_table_entries_for_switch(table_name=table_name, switch=switch)
+        present = dict((entry.get_match_key(), entry) for entry in entries)
+        pending = len(self.pending[switch])
+
+        for key, entry in current.iteritems():
+            old_entry = present.pop(key, None)
+
+            if old_entry is None:
+                self.pending[switch].append((INSERT, table_name, entry))
+            elif old_entry.priority != entry.priority:
+                self.pending[switch].append((DELETE, table_name, old_entry))
+                self.pending[switch].append((INSERT, table_name, entry))
+            elif old_entry != entry:
+                self.pending[switch].append((MODIFY, table_name, entry))
+
+        # entries that should not be on the switch
+        for entry in present.itervalues():
+            self.pending[switch].append((DELETE, table_name, entry))
+
+        return len(self.pending[switch]) - pending
+
+    @staticmethod
+    def load_entries(switch=None, entries=None):
+        """
+        Take over the entries of a switch in all table managers, see load_table_entries
+        :param switch: switch name
+        :param entries: {table name: list of TableEntry}
+        :return:
+        """
+        for manager in TableEntryManager.Manager.values():
+            for table_name in manager.tables:
+                manager.load_table_entries(switch=switch, table_name=table_name, entries=entries.get(table_name, []))
+
+    @staticmethod
+    def repair_entries(switch=None, entries=None):
+        """
+        Queue the writes that repair the entries of a switch in all table managers, see repair_table_entries
+        Entries of tables without table manager are ignored
+        :param switch: switch name
+        :param entries: {table name: list of TableEntry}
+        :return:
+        """
+        for manager in TableEntryManager.Manager.values():
+            for table_name in manager.tables:
+                repaired = manager.repair_table_entries(switch=switch, table_name=table_name,
+                                                        entries=entries.get(table_name, []))
+
+                if repaired:
+                    Log.async_info("Repair", repaired, "entries of", table_name, "on", switch)
+
     @staticmethod
     def get(manager=None):
         """
@@ -5,6 +5,9 @@ from libs.Configuration import Configuration
 
 
 class Topology:
+    # (switch configuration, names of configured switches)
+    _switch_names = (None, set())
+
     def __init__(self, identifier=None):
         """
         Init (sub-)topology with identifier
@@ -15,6 +18,7 @@ class Topology:
         self._switch_graph = nx.DiGraph()
         self._lastId = 0
         self._linkNumber = 1
+        self._version = 0
         self.links = {}
 
     def add_edge(self, n1, n2):
@@ -26,25 +30,55 @@ class Topology:
         """
         if not self._graph.has_edge(n1, n2):
             self._graph.add_edge(n1, n2)
+            self._version += 1
 
             if not (n1.startswith('h') or n2.startswith('h')):
                 self._switch_graph.add_edge(n1, n2)
                 self.links[str(n1) + "-" + str(n2)] = self._linkNumber
                 self._linkNumber += 1
 
+    def remove_edge(self, n1, n2):
+        """
+        Remove edge between nodes n1 and n2
+        :param n1: first node
+        :param n2: second node
+        :return:
+        """
+        if self._graph.has_edge(n1, n2):
+            self._graph.remove_edge(n1, n2)
+            self._version += 1
+
+            if self._switch_graph.has_edge(n1, n2):
+                self._switch_graph.remove_edge(n1, n2)
+                self.links.pop(str(n1) + "-" + str(n2), None)
+
     def add_node(self, n):
         """
         Add node to graph
         :param n:
         :return:
         """
-        self._graph.add_node(n)
+        if not self._graph.has_node(n):
+            self._graph.add_node(n)
+            self._version += 1
 
         # if this node is a switch, add it to the switch graph
-        for switch in Configuration.get("switches"):
-            if switch["name"] == n:
-                self._switch_graph.add_node(n)
-                return
+        if n in Topology.get_switch_names():
+            self._switch_graph.add_node(n)
+
+    @staticmethod
+    def get_switch_names():
+        """
+        Returns the names of all configured switches
+        The set is only rebuilt if the switch configuration changes
+        :return: set of switch names
+        """
+        switches = Configuration.get("switches")
+
+        if Topology._switch_names[0] is not switches:
+            Topology._switch_names = (switches, set(switch["name"] for switch in switches))
+
+        return Topology._switch_names[1]
 
     def get_identifier(self):
         """
@@ -53,6 +87,14 @@ class Topology:
         """
         return self._identifier
 
+    def get_version(self):
+        """
+        Returns the version of this topology
+        The version is incremented whenever a node or an edge is added or removed
+        :return: version, int
+        """
+        return self._version
+
     def get_graph(self):
         """
         Returns the nx graph
@@ -60,6 +102,13 @@ class Topology:
         """
         return self._graph
 
+    def get_adjacency(self):
+        """
+        Returns the successors of all nodes, a compact and picklable form of the graph
+        :return: {node: list of successors}
+        """
+        return dict((node, list(self._graph.successors(node))) for node in self._graph.nodes())
+
     def get_switch_graph(self):
         """
         Return the graph containing only switches
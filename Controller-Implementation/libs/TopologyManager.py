@@ -6,15 +6,34 @@ import numpy as np
 from sklearn.cluster import spectral_clustering
 from prettytable import PrettyTable
 from libs.Topology import Topology, LinkNotFound
-from libs.Exceptions import DeviceNotFound, DomainNotFound, NextHopNotFound
+from libs.ShortestPaths import ShortestPaths
+from libs.Exceptions import DeviceNotFound, DomainNotFound
 from libs.core.Event import Event
-from libs.Configuration import Configuration
+from collections import deque
 
 
 class TopologyManager:
 
     topology = {'total': 0, 'devices': [], 'domains': []}
 
+    # incremented whenever the device adjacencies change, domains built
+    # with an older version are stale and get rebuilt on the next path lookup
+    version = 0
+
+    # {domain_id: [topology, topology version, ShortestPaths]}
+    path_cache = {}
+
+    # log of (change number, domain_id, (source, destination) pairs whose first hop changed),
+    # the pairs are None if they are not known, e.g. for the first computation of a domain
+    path_changes = deque(maxlen=1000)
+    path_change_number = 0
+
+    # indexes on topology['devices'] for constant time lookups
+    # {name: device entry}, {ip: device}, {(domain, bfr_id): name}
+    devices_by_name = {}
+    devices_by_ip = {}
+    devices_by_bfr_id = {}
+
     @staticmethod
     def react_to_port_change(message=None):
         """
@@ -33,8 +52,133 @@ class TopologyManager:
 
         device.remove_port(port=message.port)
         neighbor.remove_port(port=neighbor.get_device_to_port(device.get_name()))
-        Event.trigger("topology_change", port_update=True, sleep=Configuration.get("delay"))
+        TopologyManager.remove_link(src=device.get_name(), dst=neighbor.get_name())
+        TopologyManager.remove_link(src=neighbor.get_name(), dst=device.get_name())
+        Event.trigger("topology_change", port_update=True)
+
+
+    @staticmethod
+    def increment_version():
+        """
+        Mark all built domains as stale
+        :return:
+        """
+        TopologyManager.version += 1
+
+    @staticmethod
+    def add_link(src=None, dst=None):
+        """
+        Add the link from src to dst, after src learned dst as neighbor
+        The shortest paths of built domains are updated incrementally
+        :param src: name of the device
+        :param dst: name of the neighbor
+        :return:
+        """
+        TopologyManager.__update_link(src=src, dst=dst, add=True)
 
+    @staticmethod
+    def remove_link(src=None, dst=None):
+        """
+        Remove the link from src to dst, after src lost dst as neighbor
+        The shortest paths of built domains are updated incrementally
+        :param src: name of the device
+        :param dst: name of the neighbor
+        :return:
+        """
+        TopologyManager.__update_link(src=src, dst=dst, add=False)
+
+    @staticmethod
+    def __update_link(src=None, dst=None, add=True):
+        """
+        Apply a single link change to all up to date domains
+        :param src: name of the device
+        :param dst: name of the neighbor
+        :param add: True if the link was added, False if it was removed
+        :return:
+        """
+        version = TopologyManager.version
+        TopologyManager.increment_version()
+
+        devices = [TopologyManager.devices_by_name.get(src), TopologyManager.devices_by_name.get(dst)]
+
+        for domain in TopologyManager.topology['domains']:
+            # stale domains are rebuilt on the next path lookup
+            current = domain['version'] == version
+
+            if current:
+                domain['version'] = TopologyManager.version
+
+            if None in devices or any(domain['id'] not in device['domain'] for device in devices):
+                continue
+
+            # an added link may also be a known link on a new port,
+            # which changes the entries of src even if no next hop changes
+            changes = set([(src, dst)]) if add else set()
+
+            top = domain['topology']
+
+            if current and top.get_graph().has_edge(src, dst) != add:
+                cached = TopologyManager.path_cache.get(domain['id'])
+                paths_current = cached is not None and cached[0] is top and cached[1] == top.get_version()
+
+                if add:
+                    top.add_edge(src, dst)
+                else:
+                    top.remove_edge(src, dst)
+
+                if paths_current:
+                    if add:
+                        changes |= cached[2].add_edge(u=src, v=dst)
+                    else:
+                        changes |= cached[2].remove_edge(u=src, v=dst)
+
+                    cached[1] = top.get_version()
+
+            if changes:
+                TopologyManager.log_path_changes(domain_id=domain['id'], changes=changes)
+
+    @staticmethod
+    def log_path_changes(domain_id=0, changes=None):
+        """
+        Remember the pairs whose first hop changed
+        :param domain_id: domain id
+        :param changes: set of (source, destination) pairs, None if unknown or all pairs are affected
+        :return:
+        """
+        TopologyManager.path_change_number += 1
+        TopologyManager.path_changes.append((TopologyManager.path_change_number, domain_id, changes))
+
+    @staticmethod
+    def get_changed_paths(domain_id=0, since=None):
+        """
+        Returns the (source, destination) pairs of the domain whose first hop changed since
+        the given change number
+        :param domain_id: domain id
+        :param since: change number returned by a previous call, None if there is none
+        :return: (set of pairs or None if the changes are not known, current change number)
+        """
+        # bring the paths of the domain up to date
+        TopologyManager.get_shortest_paths(domain_id=domain_id)
+
+        number = TopologyManager.path_change_number
+        log = TopologyManager.path_changes
+
+        # older changes have been dropped from the log
+        if since is None or (len(log) == log.maxlen and log[0][0] > since + 1):
+            return None, number
+
+        changed = set()
+
+        for change_number, domain, changes in log:
+            if change_number <= since or domain != domain_id:
+                continue
+
+            if changes is None:
+                return None, number
+
+            changed |= changes
+
+        return changed, number
 
     @staticmethod
     def exists_device(name=None):
@@ -43,11 +187,7 @@ class TopologyManager:
         :param name: name of device
         :return: boolean
         """
-        for dev in TopologyManager.topology['devices']:
-            if dev['name'] == name:
-                return True
-
-        return False
+        return name in TopologyManager.devices_by_name
 
     @staticmethod
     def add_device(name=None, domain=0, device=None):
@@ -59,7 +199,16 @@ class TopologyManager:
         :return: void
         """
         if not TopologyManager.exists_device(name):
-            TopologyManager.topology['devices'].append({'name': name, 'domain': [domain], 'device': device})
+            entry = {'name': name, 'domain': [domain], 'device': device}
+            TopologyManager.topology['devices'].append(entry)
+            TopologyManager.devices_by_name[name] = entry
+            TopologyManager.devices_by_ip.setdefault(device.get_ip(), device)
+
+            if device.get_type() == "Switch":
+                for d, bfr_id in device.get_bfr_mapping().iteritems():
+                    TopologyManager.devices_by_bfr_id.setdefault((d, bfr_id), name)
+
+            TopologyManager.increment_version()
 
         TopologyManager.topology['total'] = len(TopologyManager.topology['devices'])
 
@@ -70,11 +219,12 @@ class TopologyManager:
         :param name: name of the device
         :return: device
         """
-        for dev in TopologyManager.topology['devices']:
-            if dev['name'] == name:
-                return dev['device']
+        dev = TopologyManager.devices_by_name.get(name, None)
 
-        raise DeviceNotFound(name)
+        if dev is None:
+            raise DeviceNotFound(name)
+
+        return dev['device']
 
     @staticmethod
     def get_device_by_ip(ip=None):
@@ -83,13 +233,12 @@ class TopologyManager:
         :param ip: ip of device
         :return:
         """
-        for dev in TopologyManager.topology['devices']:
-            device = dev['device']
+        device = TopologyManager.devices_by_ip.get(ip, None)
 
-            if device.get_ip() == ip:
-                return device
+        if device is None:
+            raise DeviceNotFound(ip)
 
-        raise DeviceNotFound(ip)
+        return device
 
     @staticmethod
     def get_devices():
@@ -106,11 +255,12 @@ class TopologyManager:
         :param name: name of device
         :return: domain list
         """
-        for dev in TopologyManager.topology['devices']:
-            if dev['name'] == name:
-                return dev['domain']
+        dev = TopologyManager.devices_by_name.get(name, None)
+
+        if dev is None:
+            raise DeviceNotFound(name)
 
-        raise DeviceNotFound(name)
+        return dev['domain']
 
     @staticmethod
     def get_domain(domain_id=1):
@@ -144,40 +294,15 @@ class TopologyManager:
 
         return topology['tunnel_node']
 
-    @staticmethod
-    def get_next_hop(start_node=None, destination_node=None, domain_id=0):
-        """
-        Get the next hop from start_node to destination_node on given domain
-        :param start_node: node where path starts
-        :param destination_node: node where path ends
-        :param domain_id: domain in which the path should be used
-        :return:
-        """
-        paths = TopologyManager.get_topology(id=domain_id).get_shortest_paths()
-
-        if not paths.get(start_node, False):
-            raise NextHopNotFound(start_node, destination_node, domain_id)
-
-        if not paths.get(start_node).get(destination_node, False):
-            raise NextHopNotFound(start_node, destination_node, domain_id)
-
-        if len(paths.get(start_node).get(destination_node)) < 2:
-            raise NextHopNotFound(start_node, destination_node, domain_id)
-
-        return TopologyManager.get_device(paths.get(start_node).get(destination_node)[1])
-
     @staticmethod
     def get_topology(id=0):
         """
-        Returns the domain with the given id
+        Returns the topology of the domain with the given id
+        A stale domain is rebuilt first
         :param id: id of domain
-        :return: domain
+        :return: Topology
         """
-        for domain in TopologyManager.topology['domains']:
-            if domain['id'] == id:
-                return domain['topology']
-
-        raise DomainNotFound(id)
+        return TopologyManager.get_current_domain(domain_id=id)['topology']
 
     @staticmethod
     def link_to_number(link_name=None, domain=0):
@@ -198,11 +323,41 @@ class TopologyManager:
 
     @staticmethod
     def get_device_by_domain_and_id(domain=0, id=0):
-        for device in TopologyManager.topology['devices']:
-            if TopologyManager.get_device(device['name']).get_bfr_id(domain) == id:
-                return device['name']
+        """
+        Get the name of the device with the given bfr id in the given domain
+        :param domain: domain id
+        :param id: bfr id
+        :return: device name
+        """
+        name = TopologyManager.devices_by_bfr_id.get((domain, id), None)
+
+        if name is None:
+            raise DeviceNotFound(id)
+
+        return name
+
+    @staticmethod
+    def update_bfr_id(name=None, domain=0, old_id=None, new_id=None):
+        """
+        Keep the bfr id index consistent when the bfr id of a switch changes
+        :param name: name of the switch
+        :param domain: domain id
+        :param old_id: previous bfr id, None if there was none
+        :param new_id: new bfr id, None if it was removed
+        :return:
+        """
+        if not TopologyManager.exists_device(name):
+            return
+
+        if TopologyManager.devices_by_bfr_id.get((domain, old_id), None) == name:
+            TopologyManager.devices_by_bfr_id.pop((domain, old_id))
+
+        if new_id is not None:
+            TopologyManager.devices_by_bfr_id.setdefault((domain, new_id), name)
 
-        raise DeviceNotFound(id)
+        # bfr ids are part of the entries of all switches of the domain
+        if old_id != new_id:
+            TopologyManager.log_path_changes(domain_id=domain, changes=None)
 
     @staticmethod
     def add_device_to_domain(device_name=None, domain_id=None):
@@ -212,12 +367,11 @@ class TopologyManager:
         :param domain_id: domain where it should be added
         :return:
         """
-        for device in TopologyManager.topology['devices']:
-            if device['name'] == device_name:
-                if domain_id not in device['domain']:
-                    device['domain'].append(domain_id)
+        device = TopologyManager.devices_by_name.get(device_name, None)
 
-                return
+        if device is not None and domain_id not in device['domain']:
+            device['domain'].append(domain_id)
+            TopologyManager.increment_version()
 
     @staticmethod
     def set_topology(domain_id=0, topology=None):
@@ -230,9 +384,11 @@ class TopologyManager:
         for domain in TopologyManager.topology['domains']:
             if domain['id'] == domain_id:
                 domain['topology'] = topology
+                domain['version'] = TopologyManager.version
                 return
 
-        TopologyManager.topology['domains'].append({'id': domain_id, 'topology': topology, 'tunnel_node': None})
+        TopologyManager.topology['domains'].append({'id': domain_id, 'topology': topology, 'tunnel_node': None,
+                                                    'version': TopologyManager.version})
 
     @staticmethod
     def build_domain(domain=0, **kwargs):
@@ -259,6 +415,50 @@ class TopologyManager:
 
         TopologyManager.set_topology(domain_id=domain, topology=top)
 
+    @staticmethod
+    def get_current_domain(domain_id=0):
+        """
+        Return the domain with the given id, a missing or stale domain is built first
+        :param domain_id: domain-identifier
+        :return: domain
+        """
+        try:
+            domain = TopologyManager.get_domain(domain_id)
+        except DomainNotFound:
+            domain = None
+
+        if domain is None or domain['version'] != TopologyManager.version:
+            TopologyManager.build_domain(domain_id)
+            domain = TopologyManager.get_domain(domain_id)
+
+        return domain
+
+    @staticmethod
+    def get_shortest_paths(domain_id=0):
+        """
+        Return the (cached) shortest paths for given domain
+        The paths are only recomputed if the topology of the domain has been replaced or
+        changed since the last call, single link changes are applied incrementally
+        :param domain_id: domain-identifier
+        :return: shortest paths, dict
+        """
+        top = TopologyManager.get_current_domain(domain_id=domain_id)['topology']
+        cached = TopologyManager.path_cache.get(domain_id)
+
+        if cached is None or cached[0] is not top or cached[1] != top.get_version():
+            paths = ShortestPaths(top.get_graph())
+
+            if cached is None:
+                TopologyManager.log_path_changes(domain_id=domain_id, changes=None)
+            else:
+                TopologyManager.log_path_changes(domain_id=domain_id,
+                                                 changes=ShortestPaths.changed_pairs(old=cached[2], new=paths))
+
+            cached = [top, top.get_version(), paths]
+            TopologyManager.path_cache[domain_id] = cached
+
+        return cached[2].get_paths()
+
     @staticmethod
     def get_paths(domain_id=0):
         """
@@ -266,9 +466,7 @@ class TopologyManager:
         :param domain_id: domain-identifier
         :return:
         """
-        TopologyManager.build_domain(domain_id)
-
-        return TopologyManager.get_topology(domain_id).get_shortest_paths()
+        return TopologyManager.get_shortest_paths(domain_id=domain_id)
 
     @staticmethod
     def describe():
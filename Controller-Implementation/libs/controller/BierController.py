@@ -4,22 +4,29 @@ Encap rules and bier header computation are done in the tunnel controller
 """
 
 from libs.core.Log import Log
-from libs.core.CLI import CLI
 from operator import ior
 from libs.core.Event import Event
 from libs.TopologyManager import TopologyManager
 from libs.Configuration import Configuration
-from libs.TopologyManager import DeviceNotFound, NextHopNotFound
-from libs.TableEntryManager import TableEntryManager, TableEntry
+from libs.TopologyManager import DeviceNotFound
+from libs.TableEntryManager import TableEntryManager, TableEntry, Ternary, WRITE_BIER, WRITE_REPAIR, entries_digest
 from libs.GroupManager import GroupManager
-import time
+from libs.ImpactAnalyzer import ImpactAnalyzer
+from libs.core.ComputePool import ComputePool
+from libs.ShortestPaths import ShortestPaths
+from binascii import hexlify
+import numpy as np
+from libs.Exceptions import ConfigurationNotFound
 
 
 class BierComputation(object):
     """
-    This class calculates birt, fbm and bift for a BFR
+    This class calculates the bifts of the BFRs
     """
 
+    # {domain: [(topology version, path change number), {switch: bift}]}
+    bift_cache = {}
+
     @staticmethod
     def id_to_bitstring(id=0):
         """
@@ -31,68 +38,136 @@ class BierComputation(object):
         return int(2 ** (id - 1))
 
     @staticmethod
-    def build_birt(switch=None, domain=None):
+    def get_destinations(domain=0):
         """
-        Build bit index routing table
-        :param switch: switch for which the birt should be calculated
-        :param domain: domain for which the birt should be build
-        :return: birt in format {bfr-id: [dest prefix, nbr prefix]
+        Returns the bfrs of a domain by bfr id
+        If two bfrs share a bfr id the last one wins like in the birt, bfrs without a valid bfr id are skipped
+        :param domain: domain identifier
+        :return: {bfr-id: switch}
         """
-        # {bfr-id: [dest prefix, nbr prefix]
-        birt = {}
-        for destination in TopologyManager.get_topology(domain).get_nodes():
-            if destination != switch:
-                destination_device = TopologyManager.get_device(destination)
+        destinations = {}
 
-                if destination_device.get_type() == "Host": # dont calculate entry for host
-                    continue
+        for node in TopologyManager.get_topology(domain).get_nodes():
+            device = TopologyManager.get_device(node)
 
-                try:
-                    next_hop = TopologyManager.get_next_hop(switch, destination, domain)
-                    birt[destination_device.get_bfr_id(domain)] = [destination_device.get_ip(),
-                                                                   next_hop.get_ip()]
-                except NextHopNotFound: # maybe a path towards the destination is not yet learned
-                    continue
+            if device.get_type() != "Host" and device.get_bfr_id(domain) > 0:
+                destinations[device.get_bfr_id(domain)] = node
 
-        return birt
+        return destinations
 
     @staticmethod
-    def get_fbm(birt=None, next_hop_prefix=None):
+    def build_next_hop_matrix(graph=None, destinations=None, switches=None):
         """
-        Calculated forwarding bitmask for given birt and next_hop
-        :param birt:
-        :param next_hop_prefix:
-        :return:
+        Build the next hop matrix for switches of a domain
+        The next hops are the first hops of ShortestPaths.first_hops
+        :param graph: {node: list of successors} of the domain
+        :param destinations: {bfr-id: switch}
+        :param switches: switches whose rows are built
+        :return: (bfr ids, nodes, matrix), matrix[i, j] is the index in nodes of the
+                 next hop from switches[i] towards bfr ids[j], -1 if there is none
         """
-        fbm = 0
+        nodes = list(graph)
+        node_index = dict((node, i) for i, node in enumerate(nodes))
+
+        bfr_ids = sorted(destinations)
+        matrix = np.full((len(switches), len(bfr_ids)), -1, dtype=np.int32)
+
+        for i, switch in enumerate(switches):
+            first_hops = ShortestPaths.first_hops(graph=graph, source=switch)
 
-        for entry in birt:
-            if birt.get(entry)[1] == next_hop_prefix:
-                fbm |= BierComputation.id_to_bitstring(entry)
+            for j, bfr_id in enumerate(bfr_ids):
+                hop = first_hops.get(destinations[bfr_id])
 
-        return fbm
+                if hop is not None:
+                    matrix[i, j] = node_index[hop]
+
+        return bfr_ids, nodes, matrix
 
     @staticmethod
-    def build_bift(switch=None, domain=0):
+    def reduce_bitstrings(members=None, bfr_ids=None):
+        """
+        Compute one bitstring per row of a membership matrix
+        :param members: boolean matrix, members[k, j] is set if bfr_ids[j] belongs to bitstring k
+        :param bfr_ids: bfr ids of the columns
+        :return: list of bitstrings
         """
-        Generates the bit index forwarding table
-        :param switch: Switch for which the table should be calculated
-        :param domain: Domain for which the bift should be build
-        :return: bift {bfr-id: [fbm, nextHop]
+        # bit i of a bitstring is bfr id i + 1, the width is padded to whole bytes
+        width = (max(bfr_ids) + 7) // 8 * 8
+        bits = np.zeros((members.shape[0], width), dtype=np.bool_)
+        bits[:, np.asarray(bfr_ids) - 1] = members
+
+        # packbits is big endian, so reverse the bits to put the highest bfr id first
+        packed = np.packbits(bits[:, ::-1], axis=1)
+
+        return [int(hexlify(row.tobytes()), 16) for row in packed]
+
+    @staticmethod
+    def build_bifts(graph=None, destinations=None, switches=None):
+        """
+        Generates the bit index forwarding tables of switches of a domain in one pass
+        The fbm of a (switch, next hop) pair is a single reduction over the bfr ids
+        which share this next hop in the next hop matrix
+        :param graph: {node: list of successors} of the domain
+        :param destinations: {bfr-id: switch}
+        :param switches: switches whose bifts are built
+        :return: {switch: bift}, each bift in format {bfr-id: [fbm, nextHop]}
+        """
+        bfr_ids, nodes, matrix = BierComputation.build_next_hop_matrix(graph=graph, destinations=destinations,
+                                                                       switches=switches)
+
+        bifts = {}
+
+        for i, switch in enumerate(switches):
+            row = matrix[i]
+            columns = np.flatnonzero(row >= 0)
+            bift = {}
+
+            if len(columns):
+                next_hops = np.unique(row[columns])
+                fbms = BierComputation.reduce_bitstrings(members=row[np.newaxis, :] == next_hops[:, np.newaxis],
+                                                         bfr_ids=bfr_ids)
+
+                for j, k in zip(columns, np.searchsorted(next_hops, row[columns])):
+                    bift[bfr_ids[j]] = [fbms[k], nodes[row[j]]]
+
+            bifts[switch] = bift
+
+        return bifts
+
+    @staticmethod
+    def get_bifts(domain=0, switches=None):
+        """
+        Returns the bifts of switches in a domain
+        The bifts are kept until the topology, the paths or the bfr ids change,
+        missing bifts are built from the domain graph by the processes of the ComputePool
+        The returned bifts are shared and must not be changed
+        :param domain: domain identifier
+        :param switches: list of switch names
+        :return: {switch: bift}, each bift in format {bfr-id: [fbm, nextHop]}
         """
-        birt = BierComputation.build_birt(switch=switch, domain=domain)
+        # bring the paths up to date, so that their changes are counted
+        TopologyManager.get_shortest_paths(domain_id=domain)
 
-        # {bfr-id: [fbm, nextHop]
-        bift = {}
+        version = (TopologyManager.version, TopologyManager.path_change_number)
+        cached = BierComputation.bift_cache.get(domain)
 
-        for dest in birt:
-            fbm = BierComputation.get_fbm(birt=birt, next_hop_prefix=birt.get(dest)[1])
-            destination = TopologyManager.get_device_by_domain_and_id(domain, dest)
+        if cached is None or cached[0] != version:
+            cached = [version, {}]
+            BierComputation.bift_cache[domain] = cached
 
-            next_hop = TopologyManager.get_next_hop(switch, destination, domain)
+        bifts = cached[1]
+        missing = [switch for switch in switches if switch not in bifts]
 
-            bift[dest] = [fbm, next_hop.get_name()]
-        return bift
+        if missing:
+            graph = TopologyManager.get_topology(domain).get_adjacency()
+            destinations = BierComputation.get_destinations(domain=domain)
+            snapshots = [{'graph': graph, 'destinations': destinations, 'switches': chunk}
+                         for chunk in ComputePool.split(missing)]
+
+            for result in ComputePool.compute(function=compute_bifts, snapshots=snapshots):
+                bifts.update(result)
+
+        return dict((switch, bifts[switch]) for switch in switches)
 
     @staticmethod
     def compute_bier_header(mc_addr=None, domain=None):
@@ -128,43 +203,109 @@ class BierController:
 
         # this controller manages the following tables
         self.table_manager = TableEntryManager(controller=base, name="BierController")
-        self.table_manager.init_table("ingress.bier_c.bift")
+        self.table_manager.init_table("ingress.bier_c.bift", write_class=WRITE_BIER)
 
+        # topology change number of the last update, see ImpactAnalyzer
+        self.change_number = None
 
 
-    def update_frr_node_protection(self, switch=None, domain=None, port=None, to_id=None, fbm=None, next_hop=None):
+
+    @staticmethod
+    def get_snapshot_bifts(switches=None, protection=None):
+        """
+        Returns the bifts needed for the bier entries of the given switches, see BierComputation.get_bifts
+        :param switches: list of switch names
+        :param protection: bier-frr protection, node protection uses the bifts of the next hops
+        :return: {domain: {switch: bift}}
+        """
+        domains = dict((switch, [int(d) for d in TopologyManager.get_domain_for_device(switch)]) for switch in switches)
+        bifts = {}
+
+        for domain in set(d for switch in switches for d in domains[switch]):
+            bifts[domain] = BierComputation.get_bifts(domain=domain,
+                                                      switches=[switch for switch in switches if domain in domains[switch]])
+
+            if protection == 'Node':
+                next_hops = set(entry[1] for bift in bifts[domain].itervalues() for entry in bift.itervalues())
+                bifts[domain].update(BierComputation.get_bifts(domain=domain,
+                                                               switches=[n for n in next_hops if n not in bifts[domain]]))
+
+        return bifts
+
+    @staticmethod
+    def create_snapshot(switches=None, protection=None, bifts=None, digests=None):
+        """
+        Copy the topology data needed to compute the bier entries of the given switches
+        :param switches: list of switch names
+        :param protection: bier-frr protection
+        :param bifts: {domain: {switch: bift}} returned by get_snapshot_bifts
+        :param digests: {switch: digest of the entries computed last}
+        :return: snapshot, see compute_bier_entries
+        """
+        domains = dict((switch, [int(d) for d in TopologyManager.get_domain_for_device(switch)]) for switch in switches)
+        snapshot_bifts = {}
+        bfr_ids = {}
+
+        for domain in set(d for switch in switches for d in domains[switch]):
+            needed = set(switch for switch in switches if domain in domains[switch])
+
+            # node protection uses the bifts of the next hops
+            if protection == 'Node':
+                needed.update(entry[1] for switch in list(needed) for entry in bifts[domain][switch].itervalues())
+
+            snapshot_bifts[domain] = dict((switch, bifts[domain][switch]) for switch in needed)
+            bfr_ids[domain] = dict((switch, TopologyManager.get_device(switch).get_bfr_id(domain)) for switch in needed)
+
+        # the frr entries tunnel to the next hops, with node protection to the next hops of the next hops
+        tunnel_nodes = set()
+
+        if protection in ('Link', 'Node'):
+            tunnel_nodes.update(switches)
+
+            for domain_bifts in snapshot_bifts.itervalues():
+                tunnel_nodes.update(entry[1] for bift in domain_bifts.itervalues() for entry in bift.itervalues())
+
+        return {'switches': switches,
+                'protection': protection,
+                'domains': domains,
+                'bifts': snapshot_bifts,
+                'bfr_ids': bfr_ids,
+                'decap_ids': dict((switch, TopologyManager.get_device(switch).get_bfr_id(0)) for switch in switches),
+                'ports': dict((switch, dict(TopologyManager.get_device(switch).get_device_to_port_mapping())) for switch in switches),
+                'ips': dict((node, TopologyManager.get_device(node).get_ip()) for node in tunnel_nodes),
+                'digests': dict((switch, digests.get(switch)) for switch in switches)}
+
+    @staticmethod
+    def update_frr_node_protection(snapshot=None, switch=None, domain=None, port=None, to_id=None, fbm=None, next_hop=None):
         """
         Implements BIER-FRR node protection
         """
 
-        switch_device = TopologyManager.get_device(name=switch)
         remainingBits = BierComputation.id_to_bitstring(id=to_id)
 
         # get bift for failed nh
-        bift_nh = BierComputation.build_bift(switch=next_hop, domain=domain)
-
-        next_hop_device = TopologyManager.get_device(name=next_hop)
+        bift_nh = snapshot['bifts'][domain].get(next_hop, {})
 
         # send a copy of the packet to the broken node in case its only a link failure
-        if next_hop_device.get_bfr_id(domain) == to_id:
-            bift_nh[to_id] = [BierComputation.id_to_bitstring(to_id), next_hop]
+        if snapshot['bfr_ids'][domain].get(next_hop, -1) == to_id:
+            nh_entry = [BierComputation.id_to_bitstring(to_id), next_hop]
+        else:
+            nh_entry = bift_nh.get(to_id)
 
-        if to_id not in bift_nh:
+        if nh_entry is None:
             return
 
         # the backup fbm is the intersection of the old fbm and the fbm of the nh for this entry
-        new_fbm = fbm & bift_nh.get(to_id)[0]
+        new_fbm = fbm & nh_entry[0]
 
         # tunnel node is nh of bift from failed nh for this entry
-        tunnel_node = TopologyManager.get_device(name=bift_nh.get(to_id)[1])
-
-        src_ip = switch_device.get_ip()
-        dst_ip = tunnel_node.get_ip()
+        src_ip = snapshot['ips'][switch]
+        dst_ip = snapshot['ips'][nh_entry[1]]
 
         entry = TableEntry(switch=switch,
                            match_fields={
-                               "meta.bier_md.remainingBits": (remainingBits, remainingBits),
-                               "meta.ports.status": (0, BierComputation.id_to_bitstring(port))
+                               "meta.bier_md.remainingBits": Ternary(remainingBits, remainingBits),
+                               "meta.ports.status": Ternary(0, BierComputation.id_to_bitstring(port))
                            },
                            action_name="ingress.bier_c.forward_encap",
                            action_params={
@@ -177,22 +318,21 @@ class BierController:
 
         return entry
 
-
-    def update_frr_link_protection(self, switch=None, domain=None, port=None, to_id=None, fbm=None, next_hop=None):
+    @staticmethod
+    def update_frr_link_protection(snapshot=None, switch=None, domain=None, port=None, to_id=None, fbm=None, next_hop=None):
         """
         In BIER-FRR link protection, just use an IP tunnel to the NH behind the failed link
         """
 
-        switch_device = TopologyManager.get_device(name=switch)
-        src_ip = switch_device.get_ip()
-        dst_ip = TopologyManager.get_device(name=next_hop).get_ip()
+        src_ip = snapshot['ips'][switch]
+        dst_ip = snapshot['ips'][next_hop]
         remainingBits = BierComputation.id_to_bitstring(to_id)
 
 
         entry = TableEntry(switch=switch,
                            match_fields={
-                               "meta.bier_md.remainingBits": (remainingBits, remainingBits),
-                               "meta.ports.status": (0, BierComputation.id_to_bitstring(port))
+                               "meta.bier_md.remainingBits": Ternary(remainingBits, remainingBits),
+                               "meta.ports.status": Ternary(0, BierComputation.id_to_bitstring(port))
                             },
                             action_name="ingress.bier_c.forward_encap",
                             action_params={
@@ -205,86 +345,106 @@ class BierController:
 
         return entry
 
-    def update_bier_forwarding_entries(self, switch=None):
+    @staticmethod
+    def compute_bier_entries(snapshot=None, switch=None):
         """
-        Adds bier forwarding entry for given switch in specifc domain
-        :param switch:
-        :param domain: domain identifier
-        :return:
+        Compute the bier forwarding entries of a switch in all of its domains
+        :param snapshot: snapshot created by create_snapshot
+        :param switch: switch name
+        :return: list of TableEntry
         """
+        entries = []
+        ports = snapshot['ports'][switch]
 
-        table_name = "ingress.bier_c.bift"
-
-        valid_entries = []
-
-        for domain in TopologyManager.get_domain_for_device(switch):
-            domain = int(domain)
-            bift = BierComputation.build_bift(switch=switch, domain=domain)
+        for domain in snapshot['domains'][switch]:
+            bift = snapshot['bifts'][domain][switch]
 
             for entry in bift:
                 bit_string = BierComputation.id_to_bitstring(id=entry)
 
+                out_port = ports.get(bift.get(entry)[1])
 
-                out_port = TopologyManager.get_device(switch).get_device_to_port(bift.get(entry)[1])
+                if out_port is None:
+                    raise DeviceNotFound(bift.get(entry)[1])
 
                 # generate default bier entry
-                e = TableEntry(switch=switch,
-                               match_fields={"meta.bier_md.remainingBits": (bit_string, bit_string),
-                                             "meta.ports.status": (
-                                                    BierComputation.id_to_bitstring(id=out_port),
-                                                    BierComputation.id_to_bitstring(id=out_port))
-                                            },
-                               action_name="ingress.bier_c.forward",
-                               action_params={"fbm": bift.get(entry)[0],
-                                              "port": out_port
-                                             },
-                               priority=1)
-
-                if TableEntryManager.handle_table_entry(manager=self.table_manager,
-                                                        table_name=table_name, table_entry=e):
-                    Log.async_debug("Installed BIER rule for", switch, "to bfr-id", entry)
-
-                valid_entries.append(e.match_fields)
+                entries.append(TableEntry(switch=switch,
+                                          match_fields={"meta.bier_md.remainingBits": Ternary(bit_string, bit_string),
+                                                        "meta.ports.status": Ternary(
+                                                               BierComputation.id_to_bitstring(id=out_port),
+                                                               BierComputation.id_to_bitstring(id=out_port))
+                                                       },
+                                          action_name="ingress.bier_c.forward",
+                                          action_params={"fbm": bift.get(entry)[0],
+                                                         "port": out_port
+                                                        },
+                                          priority=1))
 
                 # generate bier-frr link protection entry for this switch and bfr
-                if Configuration.get('protection') == 'Link':
-                    frr_entry = self.update_frr_link_protection(switch=switch, domain=domain, port=out_port, to_id=entry, fbm=bift.get(entry)[0], next_hop=bift.get(entry)[1])
-
-                    if TableEntryManager.handle_table_entry(manager=self.table_manager,
-                                                            table_name=table_name, table_entry=frr_entry):
-                        Log.async_debug("Installed BIER-FRR link protection rule for", switch)
-
-                    valid_entries.append(frr_entry.match_fields)
+                if snapshot['protection'] == 'Link':
+                    entries.append(BierController.update_frr_link_protection(snapshot=snapshot, switch=switch, domain=domain, port=out_port, to_id=entry, fbm=bift.get(entry)[0], next_hop=bift.get(entry)[1]))
 
                 # generate bier-frr node protection entry for this switch and bfr
-                if Configuration.get('protection') == 'Node':
-                    frr_entry = self.update_frr_node_protection(switch=switch, domain=domain, port=out_port, to_id=entry, fbm=bift.get(entry)[0], next_hop=bift.get(entry)[1])
+                if snapshot['protection'] == 'Node':
+                    frr_entry = BierController.update_frr_node_protection(snapshot=snapshot, switch=switch, domain=domain, port=out_port, to_id=entry, fbm=bift.get(entry)[0], next_hop=bift.get(entry)[1])
 
                     if frr_entry:
-                        if TableEntryManager.handle_table_entry(manager=self.table_manager,
-                                                            table_name=table_name, table_entry=frr_entry):
-                            Log.async_debug("Installed BIER-FRR node protection rule for", switch, "to", entry)
+                        entries.append(frr_entry)
 
-                        valid_entries.append(frr_entry.match_fields)
+        bfr_id = BierComputation.id_to_bitstring(snapshot['decap_ids'][switch])
+        # Add decap entry
+        entries.append(TableEntry(switch=switch,
+                                  match_fields={
+                                      "meta.bier_md.remainingBits": Ternary(bfr_id, bfr_id)
+                                  },
+                                  action_name="ingress.bier_c.decap",
+                                  action_params={
+                                      "decapBit": bfr_id
+                                  },
+                                  priority=1))
+
+        return entries
 
+    @staticmethod
+    def compute_entries(switches=None, digests=None):
+        """
+        Compute the bier entries of the given switches, in parallel if the ComputePool has been started
+        :param switches: list of switch names
+        :param digests: {switch: digest of the entries computed last}
+        :return: {switch: (digest, list of TableEntry or None if the digest is unchanged)}
+        """
+        protection = Configuration.get('protection')
 
-        bfr_id = BierComputation.id_to_bitstring(TopologyManager.get_device(switch).get_bfr_id(0))
-        # Add decap entry
-        entry = TableEntry(switch=switch,
-                           match_fields={
-                               "meta.bier_md.remainingBits": (bfr_id, bfr_id)
-                           },
-                           action_name="ingress.bier_c.decap",
-                           action_params={
-                               "decapBit": bfr_id
-                           },
-                           priority=1)
+        # the missing bifts of all chunks are built at once
+        bifts = BierController.get_snapshot_bifts(switches=switches, protection=protection)
+
+        entries = {}
+        snapshots = [BierController.create_snapshot(switches=chunk, protection=protection, bifts=bifts,
+                                                    digests=digests or {})
+                     for chunk in ComputePool.split(switches)]
+
+        for result in ComputePool.compute(function=compute_bier_entries, snapshots=snapshots):
+            entries.update(result)
+
+        return entries
+
+    def update_bier_forwarding_entries(self, switch=None, entries=None):
+        """
+        Update the bier forwarding entries of a switch
+        :param switch: switch name
+        :param entries: entries computed by compute_bier_entries
+        :return:
+        """
+        table_name = "ingress.bier_c.bift"
 
-        if TableEntryManager.handle_table_entry(manager=self.table_manager,
-                                                table_name=table_name, table_entry=entry):
-            Log.async_debug("Installed BIER decap rule for", switch)
+        valid_entries = []
+
+        for entry in entries:
+            if TableEntryManager.handle_table_entry(manager=self.table_manager,
+                                                    table_name=table_name, table_entry=entry):
+                Log.async_debug("Installed BIER rule for", switch, entry.action_name, entry.match_fields["meta.bier_md.remainingBits"])
 
-        valid_entries.append(entry.match_fields)
+            valid_entries.append(entry.match_fields)
 
         self.table_manager.remove_invalid_entries(switch=switch, table_name=table_name, valid_entries=valid_entries)
 
@@ -313,15 +473,65 @@ class BierController:
 
                 if "bier" not in d:
                     return
-
-                if "sleep" in kwargs:
-                    time.sleep(kwargs.get("sleep"))
             except ConfigurationNotFound:
                 pass
 
-        srcDevice = kwargs.get('src_device')
+        # only switches whose entries can differ since the last update are recomputed
+        switches, change_number = ImpactAnalyzer.get_affected_switches(
+                                            table_name="ingress.bier_c.bift",
+                                            switches=self._baseController.get_connections().keys(),
+                                            since=self.change_number,
+                                            node_protection=Configuration.get('protection') == 'Node')
+
+        table_name = "ingress.bier_c.bift"
+        digests = dict((switch, self.table_manager.get_digest(table_name=table_name, switch=switch)) for switch in switches)
+        entries = BierController.compute_entries(switches=list(switches), digests=digests)
 
         for switch in self._baseController.get_connections():
-            self.update_bier_forwarding_entries(switch=switch)
+            if switch in entries:
+                digest, switch_entries = entries[switch]
+
+                # the entries did not change since the last update
+                if switch_entries is None:
+                    continue
+
+                self.update_bier_forwarding_entries(switch=switch, entries=switch_entries)
+                self.table_manager.set_digest(table_name=table_name, switch=switch, digest=digest)
+
+        # if the computation failed, the affected switches are computed again with the next update
+        self.change_number = change_number
+
+        # changes after a port failure are written before all other pending writes
+        self.table_manager.flush(write_class=WRITE_REPAIR if "port_update" in kwargs else None)
 
         Log.async_info("Updated BIER entries.")
+
+
+def compute_bier_entries(snapshot=None):
+    """
+    Compute the bier entries of all switches in a snapshot
+    Module level function, so that it can be executed by the processes of the ComputePool
+    :param snapshot: snapshot created by BierController.create_snapshot
+    :return: {switch: (digest, list of TableEntry or None if the digest is unchanged)}
+    """
+    entries = {}
+
+    for switch in snapshot['switches']:
+        switch_entries = BierController.compute_bier_entries(snapshot=snapshot, switch=switch)
+        digest = entries_digest(entries=switch_entries)
+
+        # unchanged entries are not sent back to the controller process
+        entries[switch] = (digest, None if digest == snapshot['digests'][switch] else switch_entries)
+
+    return entries
+
+
+def compute_bifts(snapshot=None):
+    """
+    Build the bifts of the switches in a snapshot
+    Module level function, so that it can be executed by the processes of the ComputePool
+    :param snapshot: {'graph': {node: list of successors}, 'destinations': {bfr-id: switch}, 'switches': list}
+    :return: {switch: bift}
+    """
+    return BierComputation.build_bifts(graph=snapshot['graph'], destinations=snapshot['destinations'],
+                                       switches=snapshot['switches'])
@@ -8,10 +8,12 @@ from libs.core.CLI import CLI
 from libs.GroupManager import GroupManager
 from libs.core.Event import Event
 from libs.TopologyManager import TopologyManager, DeviceNotFound
-from libs.TableEntryManager import TableEntryManager, TableEntry
+from libs.TableEntryManager import TableEntryManager, TableEntry, Lpm, Ternary, WRITE_IPV4, WRITE_ENCAP, entries_digest
 from libs.controller.BierController import BierComputation
+from libs.ImpactAnalyzer import ImpactAnalyzer
+from libs.core.ComputePool import ComputePool
+from libs.ShortestPaths import ShortestPaths
 import networkx as nx
-import time
 from libs.Exceptions import ConfigurationNotFound
 from libs.Configuration import Configuration
 from collections import defaultdict
@@ -27,63 +29,111 @@ class IPv4Controller(object):
         self._baseController = base
 
         self.table_manager = TableEntryManager(controller=base, name="IPv4Controller")
-        self.table_manager.init_table("ingress.ipv4_c.ipv4")
-        self.table_manager.init_table("ingress.ipv4_c.encap_ipv4")
+        self.table_manager.init_table("ingress.ipv4_c.ipv4", write_class=WRITE_IPV4)
+        self.table_manager.init_table("ingress.ipv4_c.encap_ipv4", write_class=WRITE_ENCAP)
+
+        # topology change number of the last update, see ImpactAnalyzer
+        self.change_number = None
 
         Event.on("group_update", self.update_based_on_group)
 
         Event.on("topology_change", self.update_ipv4_rules)
 
 
-    def update_ipv4_entries(self, switch=None):
+    @staticmethod
+    def create_snapshot(switches=None, graph=None, digests=None):
         """
-        Update ipv4 entries based on shortest path on switch
-        :param switch: switch where ipv4 entries will be installed
-        :return:
+        Copy the topology data needed to compute the ipv4 entries of the given switches
+        The next hops are computed from the graph by the process that computes the snapshot
+        :param switches: list of switch names
+        :param graph: {node: list of successors} of domain 0
+        :param digests: {switch: digest of the entries computed last}
+        :return: snapshot, see compute_ipv4_entries
         """
-
         paths = TopologyManager.get_paths(domain_id=0)
-        valid_entries = []
 
-        cur_dev = TopologyManager.get_device(switch)
+        # the switches have entries towards all devices they reach
+        reachable = set(switches)
 
-        for dst in [d for d in paths.get(switch, {}) if d != switch]:  # don't check path from i->i
-            # get the next_hop towards the destination along the shortest path
-            dst_dev = TopologyManager.get_device(dst)
-            next_hop = TopologyManager.get_next_hop(start_node=switch,
-                                                    destination_node=dst,
-                                                    domain_id=0)
+        for switch in switches:
+            reachable.update(paths.get(switch, {}))
 
-            port = cur_dev.get_device_to_port(next_hop.get_name())
+        return {'switches': switches,
+                'graph': graph,
+                'ports': dict((switch, dict(TopologyManager.get_device(switch).get_device_to_port_mapping())) for switch in switches),
+                'ips': dict((node, TopologyManager.get_device(node).get_ip()) for node in reachable),
+                'digests': dict((switch, digests.get(switch)) for switch in switches)}
 
-            entry = TableEntry(switch=switch,
-                               match_fields={"hdr.ipv4.dstAddr": (str(dst_dev.get_ip()), 32),
-                                             "meta.ports.status": (BierComputation.id_to_bitstring(id=int(port)), BierComputation.id_to_bitstring(id=int(port)))},
-                               action_name="ingress.ipv4_c.forward",
-                               action_params={"port": int(port)},
-                               priority=1)
+    @staticmethod
+    def compute_ipv4_entries(snapshot=None, switch=None):
+        """
+        Compute the ipv4 entries of a switch based on shortest path
+        :param snapshot: snapshot created by create_snapshot
+        :param switch: switch where ipv4 entries will be installed
+        :return: list of TableEntry
+        """
+        entries = []
+        ports = snapshot['ports'][switch]
+        ips = snapshot['ips']
 
-            if TableEntryManager.handle_table_entry(manager=self.table_manager,
-                                                    table_name="ingress.ipv4_c.ipv4",
-                                                    table_entry=entry):
-                Log.async_debug("Installed IPv4 forwarding rule for", switch, "->", dst)
+        for dst, next_hop in ShortestPaths.first_hops(graph=snapshot['graph'], source=switch).iteritems():
+            port = ports.get(next_hop)
 
-            valid_entries.append(entry.match_fields)
+            if port is None:
+                raise DeviceNotFound(next_hop)
 
+            entries.append(TableEntry(switch=switch,
+                                      match_fields={"hdr.ipv4.dstAddr": Lpm(str(ips[dst]), 32),
+                                                    "meta.ports.status": Ternary(BierComputation.id_to_bitstring(id=int(port)), BierComputation.id_to_bitstring(id=int(port)))},
+                                      action_name="ingress.ipv4_c.forward",
+                                      action_params={"port": int(port)},
+                                      priority=1))
 
         # Add decap entry
-        entry = TableEntry(switch=cur_dev.get_name(),
-                           match_fields={"hdr.ipv4.dstAddr": (str(cur_dev.get_ip()), 32)},
-                           action_name="ingress.ipv4_c.decap",
-                           priority=1)
+        entries.append(TableEntry(switch=switch,
+                                  match_fields={"hdr.ipv4.dstAddr": Lpm(str(ips[switch]), 32)},
+                                  action_name="ingress.ipv4_c.decap",
+                                  priority=1))
+
+        return entries
+
+    @staticmethod
+    def compute_entries(switches=None, digests=None):
+        """
+        Compute the ipv4 entries of the given switches, in parallel if the ComputePool has been started
+        :param switches: list of switch names
+        :param digests: {switch: digest of the entries computed last}
+        :return: {switch: (digest, list of TableEntry or None if the digest is unchanged)}
+        """
+        # bring the paths up to date, so that their changes are counted
+        TopologyManager.get_paths(domain_id=0)
+        graph = TopologyManager.get_topology(0).get_adjacency()
 
+        entries = {}
+        snapshots = [IPv4Controller.create_snapshot(switches=chunk, graph=graph, digests=digests or {})
+                     for chunk in ComputePool.split(switches)]
 
-        if TableEntryManager.handle_table_entry(manager=self.table_manager,
-                                                table_name="ingress.ipv4_c.ipv4",
-                                                table_entry=entry):
-            Log.async_debug("Installed IPv4 decap rule for", switch)
+        for result in ComputePool.compute(function=compute_ipv4_entries, snapshots=snapshots):
+            entries.update(result)
 
-        valid_entries.append(entry.match_fields)
+        return entries
+
+    def update_ipv4_entries(self, switch=None, entries=None):
+        """
+        Update ipv4 entries on switch
+        :param switch: switch where ipv4 entries will be installed
+        :param entries: entries computed by compute_ipv4_entries
+        :return: match fields of the entries
+        """
+        valid_entries = []
+
+        for entry in entries:
+            if TableEntryManager.handle_table_entry(manager=self.table_manager,
+                                                    table_name="ingress.ipv4_c.ipv4",
+                                                    table_entry=entry):
+                Log.async_debug("Installed IPv4 rule for", switch, entry.action_name, entry.match_fields["hdr.ipv4.dstAddr"])
+
+            valid_entries.append(entry.match_fields)
 
         return valid_entries
 
@@ -123,9 +173,10 @@ class IPv4Controller(object):
                                                   valid_entries=valid_entries)
 
 
-    def load_static_rules(self):
+    def load_static_rules(self, flush=True):
         """
         Load static rules from json file specified in config
+        :param flush: write the changed entries immediately
         """
 
         valid_entries = defaultdict(list)
@@ -139,8 +190,8 @@ class IPv4Controller(object):
                         continue
 
                     e = TableEntry(switch=entry["switch"],
-                                   match_fields={"hdr.ipv4.dstAddr": (str(entry["match_fields"][0]), int(entry["match_fields"][1])),
-                                                  "meta.ports.status": (BierComputation.id_to_bitstring(id=int(entry["match_fields"][2])), int(entry["match_fields"][3]))},
+                                   match_fields={"hdr.ipv4.dstAddr": Lpm(str(entry["match_fields"][0]), int(entry["match_fields"][1])),
+                                                  "meta.ports.status": Ternary(BierComputation.id_to_bitstring(id=int(entry["match_fields"][2])), int(entry["match_fields"][3]))},
                                    action_name=entry["action_name"],
                                    action_params={"port": int(entry["action_params"])},
                                    priority=1
@@ -155,6 +206,9 @@ class IPv4Controller(object):
 
                 Log.async_info("Static rules for IPv4 loaded.")
 
+        if flush:
+            self.table_manager.flush()
+
         return valid_entries
 
 
@@ -179,6 +233,8 @@ class IPv4Controller(object):
 
             self.update_bier_encap_entry(switch=bfr["name"])
 
+        self.table_manager.flush()
+
     def update_ipv4_rules(self, *args, **kwargs):
         """
         Update ipv4 forwarding entries
@@ -193,22 +249,62 @@ class IPv4Controller(object):
                 if "ipv4" not in d:
                     return
 
-                if "sleep" in kwargs:
-                    time.sleep(kwargs.get("sleep"))
-
             except ConfigurationNotFound:
                 pass
 
+        # only switches whose entries can differ since the last update are recomputed
+        switches, change_number = ImpactAnalyzer.get_affected_switches(
+                                            table_name="ingress.ipv4_c.ipv4",
+                                            switches=self._baseController.get_connections().keys(),
+                                            since=self.change_number)
+
+        table_name = "ingress.ipv4_c.ipv4"
+        digests = dict((switch, self.table_manager.get_digest(table_name=table_name, switch=switch)) for switch in switches)
+
         entries = defaultdict(list)
+        computed = IPv4Controller.compute_entries(switches=list(switches), digests=digests)
 
         for switch in self._baseController.get_connections():
-            entries[switch].extend(self.update_ipv4_entries(switch=switch))
+            if switch in computed:
+                digest, switch_entries = computed[switch]
+
+                # the entries did not change since the last update
+                if switch_entries is None:
+                    continue
+
+                entries[switch].extend(self.update_ipv4_entries(switch=switch, entries=switch_entries))
 
-        static_rules = self.load_static_rules()
+        static_rules = self.load_static_rules(flush=False)
 
         for switch in entries:
             v_entries = entries.get(switch)
             v_entries.extend(static_rules[switch])
-            self.table_manager.remove_invalid_entries(switch=switch, table_name="ingress.ipv4_c.ipv4", valid_entries=v_entries)
+            self.table_manager.remove_invalid_entries(switch=switch, table_name=table_name, valid_entries=v_entries)
+            self.table_manager.set_digest(table_name=table_name, switch=switch, digest=computed[switch][0])
+
+        # if the computation failed, the affected switches are computed again with the next update
+        self.change_number = change_number
+
+        # write all changes in background, bier and repair writes are sent first
+        self.table_manager.flush(wait=False)
 
         Log.async_info("IP rules update.")
+
+
+def compute_ipv4_entries(snapshot=None):
+    """
+    Compute the ipv4 entries of all switches in a snapshot
+    Module level function, so that it can be executed by the processes of the ComputePool
+    :param snapshot: snapshot created by IPv4Controller.create_snapshot
+    :return: {switch: (digest, list of TableEntry or None if the digest is unchanged)}
+    """
+    entries = {}
+
+    for switch in snapshot['switches']:
+        switch_entries = IPv4Controller.compute_ipv4_entries(snapshot=snapshot, switch=switch)
+        digest = entries_digest(entries=switch_entries)
+
+        # unchanged entries are not sent back to the controller process
+        entries[switch] = (digest, None if digest == snapshot['digests'][switch] else switch_entries)
+
+    return entries
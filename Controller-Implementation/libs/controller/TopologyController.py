@@ -11,6 +11,7 @@ from libs.core.Host import Host
 from libs.TopologyManager import TopologyManager
 from libs.TopologyManager import DeviceNotFound
 from libs.Configuration import Configuration
+import hashlib
 
 
 class TopologyController:
@@ -19,10 +20,24 @@ class TopologyController:
         self._baseController = controller
         Event.on("topology_packet_in", self.handle_topology_answer)
 
-    def handle_topology_answer(self, pkt=None):
+    @staticmethod
+    def get_adjacency_digest(neighbors=None):
+        """
+        Digest of a set of neighbors, the local controllers compute the same digest
+        :param neighbors: list of (port, name)
+        :return: 8 bytes
+        """
+        pairs = sorted("{0}:{1}".format(port, name) for port, name in neighbors)
+
+        return hashlib.sha1(",".join(pairs)).digest()[:8]
+
+    def handle_topology_answer(self, pkt=None, digest=None):
         """
         Handle topology packet
+        Adjacency digests are handled by the same queue, so that they are compared
+        after the topology packets sent before them
         :param pkt: contains the topology packet
+        :param digest: AdjacencyDigest of a switch instead of a topology packet
         :return:
         """
 
@@ -31,6 +46,14 @@ class TopologyController:
         if not Configuration.get('system_done'):
             return
 
+        if digest is not None:
+            self.handle_adjacency_digest(digest=digest)
+            return
+
+        if pkt.expired:
+            self.handle_expired_neighbor(pkt=pkt)
+            return
+
         ip = pkt.ip.encode('utf-8')
         mac = pkt.mac.encode('utf-8')
         name = pkt.name.encode('utf-8')
@@ -39,9 +62,61 @@ class TopologyController:
 
         if name.startswith('h'):  # it's a host
             TopologyManager.add_device(name=name, device=Host(name=name, ip=ip, mac=mac))
-            TopologyManager.get_device(name=name).add_device_to_port(device=switch, port=1)
+            if TopologyManager.get_device(name=name).add_device_to_port(device=switch, port=1):
+                TopologyManager.add_link(src=name, dst=switch)
 
         Log.event("topology packet with identifier", name, "from switch", switch, "on port", port, "with ip", ip)
 
         if TopologyManager.get_device(name=switch).add_device_to_port(device=name, port=int(port)):
+            TopologyManager.add_link(src=switch, dst=name)
             Event.trigger("topology_change", src_device=switch, dst_device=name, port=int(port))
+
+    def handle_expired_neighbor(self, pkt=None):
+        """
+        Remove a neighbor that has not been seen by a switch for a while
+        :param pkt: topology packet of the expired neighbor
+        :return:
+        """
+        name = pkt.name.encode('utf-8')
+        switch = pkt.switch.encode('utf-8')
+        device = TopologyManager.get_device(name=switch)
+
+        # the neighbor may already be removed, e.g. by a port down message
+        if device.get_neighbor_by_port(port=pkt.port) != name:
+            return
+
+        device.remove_port(port=pkt.port)
+        TopologyManager.remove_link(src=switch, dst=name)
+
+        if name.startswith('h'):  # the host is only known by this switch
+            host = TopologyManager.get_device(name=name)
+
+            if host.get_neighbor_by_port(port=1) == switch:
+                host.remove_port(port=1)
+                TopologyManager.remove_link(src=name, dst=switch)
+
+        Log.event("neighbor", name, "of switch", switch, "on port", pkt.port, "expired")
+
+        # not a port update: the port is still up in the data plane, so the frr entries
+        # don't take over and all entries have to be recomputed
+        Event.trigger("topology_change")
+
+    def handle_adjacency_digest(self, digest=None):
+        """
+        Compare the adjacency digest of a switch with the neighbors known for it,
+        request all neighbors again if they differ
+        :param digest: AdjacencyDigest
+        :return:
+        """
+        switch = digest.switch.encode('utf-8')
+
+        try:
+            mapping = TopologyManager.get_device(name=switch).get_device_to_port_mapping()
+        except DeviceNotFound:
+            return
+
+        neighbors = [(port, name) for name, port in mapping.items()]
+
+        if TopologyController.get_adjacency_digest(neighbors=neighbors) != digest.digest:
+            Log.async_info("Neighbors of", switch, "differ,", digest.neighbors, "reported,", len(neighbors), "known")
+            Event.trigger("adjacency_resync", switch=switch)
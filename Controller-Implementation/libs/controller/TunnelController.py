@@ -11,7 +11,7 @@ from operator import ior
 from libs.controller.TopologyController import TopologyController
 from libs.TopologyManager import TopologyManager
 from libs.Configuration import Configuration
-from libs.TableEntryManager import TableEntryManager, TableEntry
+from libs.TableEntryManager import TableEntryManager, TableEntry, Ternary, WRITE_ENCAP
 from networkx import NodeNotFound
 
 
@@ -30,9 +30,9 @@ class TunnelController(object):
         Event.on("switch_connected", self.add_ipv4_decap_rule)
 
         self.table_manager = TableEntryManager(controller=base, name="TunnelController")
-        self.table_manager.init_table("ingress.tunnel_c.decap_bier")
-        self.table_manager.init_table("ingress.tunnel_c.decap_ipv4")
-        self.table_manager.init_table("egress.tunnel_c.encap_ipv4")
+        self.table_manager.init_table("ingress.tunnel_c.decap_bier", write_class=WRITE_ENCAP)
+        self.table_manager.init_table("ingress.tunnel_c.decap_ipv4", write_class=WRITE_ENCAP)
+        self.table_manager.init_table("egress.tunnel_c.encap_ipv4", write_class=WRITE_ENCAP)
 
     ##########################################################
     #                                                        #
@@ -92,7 +92,7 @@ class TunnelController(object):
 
             entry = TableEntry(switch=switch,
                                match_fields={
-                                   "hdr.bier[0].BitString": (bfr_id, bfr_id),
+                                   "hdr.bier[0].BitString": Ternary(bfr_id, bfr_id),
                                    "hdr.bier[0].Domain": domain
                                },
                                action_name="ingress.tunnel_c.bier_decap",
@@ -133,6 +133,8 @@ class TunnelController(object):
                                                 table_entry=entry):
             Log.async_debug("Ipv4 decap rule installed for", kwargs.get('name'))
 
+        self.table_manager.flush()
+
 
 
     def update_based_on_topology(self, *args, **kwargs):
@@ -147,6 +149,8 @@ class TunnelController(object):
 
             self.update_bier_decap_rule(switch=switch)
 
+        self.table_manager.flush()
+
     def update_based_on_group(self, *args, **kwargs):
         """
         Updates tunnel rules
@@ -158,3 +162,5 @@ class TunnelController(object):
                 continue
 
             self.update_bier_encap_entry(switch=bfr["name"])
+
+        self.table_manager.flush()
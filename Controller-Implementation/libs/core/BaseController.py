@@ -5,25 +5,40 @@ This module builds the basis for each used controller
 import grpc
 import threading
 import os
-import pickle
+import binascii
 import proto.connection_pb2_grpc
 import proto.connection_pb2
 from libs.core.Switch import Switch
 from libs.core.Event import Event
 from libs.core.Log import Log
 from libs.core.SwitchConnection import SwitchConnection
+from libs.core.WriteScheduler import WriteScheduler, WriteBarrier
 from libs.core.CLI import CLI
 from libs.Configuration import Configuration
 from libs.Exceptions import SwitchConnectionFailed
+from libs.TableEntryManager import TableEntryManager, TableEntry, INSERT, MODIFY, DELETE, WRITE_IPV4, Lpm, Ternary
+from binascii import hexlify
+from collections import defaultdict
 
 
 class BaseController(object):
+    # maps update types of the table entry manager to the rpc update types
+    update_types = {INSERT: proto.connection_pb2.TableEntryUpdate.INSERT,
+                    MODIFY: proto.connection_pb2.TableEntryUpdate.MODIFY,
+                    DELETE: proto.connection_pb2.TableEntryUpdate.DELETE}
 
     def __init__(self):
         self.__connections = {}
         self.__startPort = 30050
         self.connected = True
 
+        # writes to different switches are sent concurrently
+        self.scheduler = WriteScheduler(write=self.__write_batch)
+        Event.on('exit', self.scheduler.stop)
+
+        # barriers of writes that nobody waits for, their errors are logged later
+        self.background_writes = []
+
     def get_connections(self):
         """
         Returns all switch connections
@@ -50,6 +65,10 @@ class BaseController(object):
             try:
                 self.__connections[switch["name"]] = SwitchConnection(grpc_address='127.0.0.1:{0}'.format(switch["local_controller_port"]))
                 Log.async_debug("Connected to controller on port", switch["local_controller_port"])
+
+                # take over the entries that are still on the switch, so that
+                # only the differences to the computed entries are written
+                TableEntryManager.load_entries(switch=switch["name"], entries=self.read_table_entries(switch=switch["name"]))
                 Event.trigger('switch_connected', name=switch["name"])
             except grpc.RpcError as e:
                 raise SwitchConnectionFailed(switch["name"], switch["local_controller_port"])
@@ -57,35 +76,190 @@ class BaseController(object):
         Log.async_info("Connected to", len(self.__connections), "controller")
         Configuration.set('connected', True)
 
-    def delete_table_entry(self, switch=None, table_name=None, table_entry=None):
+    @staticmethod
+    def build_value(value=None):
+        """
+        Converts a match field or action parameter value into a Value message
+        Numbers are transmitted as big-endian bytes, strings (e.g. mac addresses) as text
+        :param value: int or str
+        :return: Value message
+        """
+        if isinstance(value, basestring):
+            return proto.connection_pb2.Value(text=value)
+
+        number = '%x' % value
+
+        return proto.connection_pb2.Value(number=binascii.unhexlify('0' * (len(number) % 2) + number))
+
+    @staticmethod
+    def build_table_entry(table_name=None, table_entry=None):
+        """
+        Converts a table entry into a TableEntry message
+        Scalar match values are sent as exact, Lpm as lpm and other tuples as ternary matches
+        :param table_name: name of the table
+        :param table_entry: TableEntry
+        :return: TableEntry message
+        """
+        entry = proto.connection_pb2.TableEntry(table_name=table_name,
+                                                action_name=table_entry.action_name or '',
+                                                priority=table_entry.priority or 0)
+
+        for name, value in table_entry.match_fields.iteritems():
+            match = entry.match.add(name=name)
+
+            if isinstance(value, Lpm):
+                match.lpm.value.CopyFrom(BaseController.build_value(value.value))
+                match.lpm.prefix_len = value.prefix_len
+            elif isinstance(value, tuple):
+                match.ternary.value.CopyFrom(BaseController.build_value(value[0]))
+                match.ternary.mask.CopyFrom(BaseController.build_value(value[1]))
+            else:
+                match.exact.value.CopyFrom(BaseController.build_value(value))
+
+        for name, value in (table_entry.action_params or {}).iteritems():
+            entry.params.add(name=name, value=BaseController.build_value(value))
+
+        return entry
+
+    @staticmethod
+    def parse_value(value=None):
+        """
+        Converts a Value message back into an int or str, see build_value
+        :param value: Value message
+        :return: int or str
+        """
+        if value.WhichOneof('value') == 'text':
+            return value.text.encode('utf-8')
+
+        return int(hexlify(value.number), 16) if value.number else 0
+
+    @staticmethod
+    def parse_table_entry(switch=None, entry=None):
+        """
+        Converts a TableEntry message back into a table name and TableEntry, see build_table_entry
+        :param switch: switch name
+        :param entry: TableEntry message
+        :return: (table name, TableEntry)
+        """
+        match_fields = {}
+
+        for match in entry.match:
+            match_type = match.WhichOneof('field_match_type')
+
+            if match_type == 'lpm':
+                value = Lpm(BaseController.parse_value(match.lpm.value), match.lpm.prefix_len)
+            elif match_type == 'ternary':
+                value = Ternary(BaseController.parse_value(match.ternary.value),
+                                BaseController.parse_value(match.ternary.mask))
+            else:
+                value = BaseController.parse_value(match.exact.value)
+
+            match_fields[match.name.encode('utf-8')] = value
+
+        table_entry = TableEntry(switch=switch,
+                                 match_fields=match_fields,
+                                 action_name=entry.action_name.encode('utf-8') or None,
+                                 action_params=dict((param.name.encode('utf-8'), BaseController.parse_value(param.value))
+                                                    for param in entry.params),
+                                 priority=entry.priority or None)
+
+        return entry.table_name.encode('utf-8'), table_entry
+
+    def read_table_entries(self, switch=None):
+        """
+        Reads the entries of the global controller from the switch
+        :param switch: switch name
+        :return: {table name: list of TableEntry}
+        """
+        entries = defaultdict(list)
+
+        for entry in self.__connections.get(switch).readTableEntries():
+            table_name, table_entry = BaseController.parse_table_entry(switch=switch, entry=entry)
+            entries[table_name].append(table_entry)
+
+        return entries
+
+    def reconcile_table_entries(self, *args, **kwargs):
         """
-        Deletes an table entry on the switch which matches the table name and match_fields
-        :param switch:
-        :param table_name:
-        :param match_fields:
+        Compares the entries on the switches with the computed entries and repairs differences
+        Triggered by event
         :return:
         """
-        entry = proto.connection_pb2.TableEntry(
-                    table_name=table_name,
-                    table_entry=pickle.dumps(table_entry))
+        if not Configuration.get('system_done'):
+            return
 
-        self.__connections.get(switch).removeTableEntry(tableEntry=entry)
+        # entries that are still written in background would be seen as missing
+        for background in self.background_writes:
+            background.wait()
 
+        for switch in self.__connections:
+            TableEntryManager.repair_entries(switch=switch, entries=self.read_table_entries(switch=switch))
 
+        for manager in TableEntryManager.Manager.values():
+            manager.flush()
 
-    def add_table_entry(self, switch=None, table_name=None, table_entry=None):
+    def __write_batch(self, switch=None, updates=None):
         """
-        Adds an table entry and locks write request to prevent threading problems
-        :param switch:
-        :param table_name:
-        :param match_fields:
-        :param action_name:
-        :param action_params:
+        Writes an ordered batch of table entry updates to the switch with a single call
+        Doesn't log, so that it can be executed by the write scheduler
+        :param switch: switch name
+        :param updates: list of (update type, table name, TableEntry)
+        :return: response of the switch
+        """
+        batch = proto.connection_pb2.TableEntryBatch()
+
+        for update_type, table_name, table_entry in updates:
+            batch.updates.add(type=BaseController.update_types.get(update_type),
+                              entry=BaseController.build_table_entry(table_name=table_name,
+                                                                     table_entry=table_entry))
+
+        return self.__connections.get(switch).writeTableEntries(batch=batch)
+
+    def write_table_entry_batches(self, batches=None, write_classes=None, wait=True):
+        """
+        Schedules the batches of several switches, see WriteScheduler
+        Writes to different switches are sent concurrently, writes of the same entry in order
+        :param batches: {switch: list of (update type, table name, TableEntry)}
+        :param write_classes: {table name: priority class}, default is WRITE_IPV4
+        :param wait: return when all writes have been sent, otherwise they are sent in background
         :return:
         """
+        write_classes = write_classes or {}
+        barrier = WriteBarrier()
+
+        for switch, updates in batches.iteritems():
+            self.scheduler.submit(switch=switch, barrier=barrier,
+                                  updates=[(write_classes.get(update[1], WRITE_IPV4),) + tuple(update) for update in updates])
+
+        # report finished background writes
+        for background in [b for b in self.background_writes if b.is_done()]:
+            self.background_writes.remove(background)
+
+            for error in BaseController.__check_results(results=background.results):
+                Log.error("Error while writing entries:", error)
+
+        if not wait:
+            self.background_writes.append(barrier)
+            return
+
+        errors = BaseController.__check_results(results=barrier.wait())
+
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def __check_results(results=None):
+        """
+        Logs failed responses of a WriteBarrier
+        :param results: list of (switch, response, error, number of writes)
+        :return: list of raised exceptions
+        """
+        errors = []
 
-        entry = proto.connection_pb2.TableEntry(
-                                        table_name=table_name,
-                                        table_entry=pickle.dumps(table_entry))
+        for switch, response, error, count in results:
+            if error is not None:
+                errors.append(error)
+            elif response.code == 0:
+                Log.error("Error while writing", count, "entries on switch", switch, response.message)
 
-        self.__connections.get(switch).addTableEntry(tableEntry=entry)
+        return errors
@@ -0,0 +1,67 @@
+"""
+This module distributes the computation of table entries to a pool of processes
+
+The controllers copy the topology data they need (e.g. the domain graph, bifts, ports
+and ips) into snapshots of plain dicts, one snapshot per chunk of switches. The snapshots
+are computed in parallel by the processes of the pool, including the shortest paths of
+the switches. The results (desired table entries) are diffed and written in the
+controller process. Without a pool, the snapshots are computed in this process.
+"""
+
+import multiprocessing
+from libs.core.Event import Event
+
+
+class ComputePool:
+    pool = None
+    processes = 0
+
+    @staticmethod
+    def start(processes=0):
+        """
+        Start the pool, should be called before other threads are started
+        :param processes: number of processes, the pool is not used if less than 2
+        :return:
+        """
+        if processes < 2 or ComputePool.pool is not None:
+            return
+
+        ComputePool.pool = multiprocessing.Pool(processes)
+        ComputePool.processes = processes
+
+        Event.on('exit', ComputePool.stop)
+
+    @staticmethod
+    def stop(*args, **kwargs):
+        """
+        Stop the pool, snapshots are computed in this process afterwards
+        :return:
+        """
+        if ComputePool.pool is not None:
+            ComputePool.pool.terminate()
+            ComputePool.pool = None
+            ComputePool.processes = 0
+
+    @staticmethod
+    def split(items=None):
+        """
+        Split items into one chunk per process
+        :param items: list of items, e.g. switch names
+        :return: list of non empty chunks
+        """
+        chunks = max(1, ComputePool.processes)
+
+        return [items[i::chunks] for i in range(chunks) if items[i::chunks]]
+
+    @staticmethod
+    def compute(function=None, snapshots=None):
+        """
+        Compute the snapshots, in parallel if the pool has been started
+        :param function: module level function that gets one snapshot, results must be picklable
+        :param snapshots: list of snapshots
+        :return: list of results in order of the snapshots
+        """
+        if ComputePool.pool is None or len(snapshots) < 2:
+            return map(function, snapshots)
+
+        return ComputePool.pool.map(function, snapshots, chunksize=1)
@@ -1,13 +1,128 @@
 """
 Simple event system
+
+Handlers are executed synchronously in the thread that triggers the event.
+Events can be switched to queued dispatch with Event.queue, then trigger only
+puts the event into a bounded queue and a worker thread executes the handlers.
+Several events can share one queue, their handlers are then executed in the
+order in which the events have been triggered.
+This is used for events coming in over grpc, so that the grpc threads don't
+have to wait for the computation of the table entries.
+
+Events can also be coalesced with Event.coalesce. Triggers that arrive in a burst
+are merged and the handlers are executed once when the burst is over.
 """
 
 from collections import defaultdict
+import Queue
+import time
 import traceback
 import threading
 from libs.Exceptions import EventNotFound, HandlerNotFound
 
 
+class Burst(object):
+    """
+    Collects the triggers of a coalesced event
+    A burst is over if no trigger arrived for min_hold seconds,
+    but at the latest max_hold seconds after its first trigger
+    """
+
+    def __init__(self, min_hold=0, max_hold=0):
+        self.min_hold = min_hold
+        self.max_hold = max(min_hold, max_hold)
+        self.condition = threading.Condition()
+        self.running = True
+
+        # time of the first and last trigger of the current burst
+        self.first = None
+        self.last = None
+
+        self.args = ()
+        self.kw = {}
+
+    def add(self, args, kw):
+        """
+        Add a trigger to the current burst
+        Only keyword arguments that all triggers of the burst have in common are kept,
+        with the value of the latest trigger
+        :param args: arguments without key
+        :param kw: arguments with key
+        :return:
+        """
+        with self.condition:
+            now = time.time()
+
+            if self.first is None:
+                self.first = now
+                self.kw = dict(kw)
+            else:
+                self.kw = dict((key, value) for key, value in kw.iteritems() if key in self.kw)
+
+            self.last = now
+            self.args = args
+            self.condition.notify()
+
+    def wait(self):
+        """
+        Wait until the current burst is over
+        :return: merged (args, kw) or None if the burst has been stopped
+        """
+        with self.condition:
+            while self.running:
+                if self.first is None:
+                    self.condition.wait()
+                    continue
+
+                remaining = min(self.last + self.min_hold, self.first + self.max_hold) - time.time()
+
+                if remaining <= 0:
+                    self.first = None
+                    return self.args, self.kw
+
+                self.condition.wait(remaining)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+
+class EventQueue(object):
+    """
+    Queue of triggered events that are executed by one worker thread
+    Put blocks if capacity events are queued, unless the caller executes handlers
+    itself. Waiting for the worker could dead lock in this case, so the event is
+    queued beyond the capacity instead, which keeps the order of the events.
+    """
+
+    def __init__(self, capacity):
+        self.queue = Queue.Queue()
+        self.slots = threading.Semaphore(capacity)
+
+    def put(self, item, block=True):
+        """
+        Queue an event
+        :param item: (event name, args, kw) or None to stop the worker
+        :param block: wait for a free slot if the queue is full
+        :return:
+        """
+        counted = self.slots.acquire(block)
+        self.queue.put((item, counted))
+
+    def get(self):
+        """
+        Get the next event, blocks until an event is queued
+        :return: (event name, args, kw) or None
+        """
+        item, counted = self.queue.get()
+
+        if counted:
+            self.slots.release()
+
+        return item
+
+
 class Event:
 
     events = defaultdict(list)
@@ -16,6 +131,18 @@ class Event:
     # use RLock instead of Lock to allow Events that trigger Events
     lock = threading.RLock()
 
+    # {event name: EventQueue} of events that are executed by a worker thread
+    queues = {}
+
+    # default number of events that can be queued before trigger blocks
+    capacity = 100
+
+    # {event name: Burst} of coalesced events
+    bursts = {}
+
+    # marks threads that are currently executing handlers
+    local = threading.local()
+
     @staticmethod
     def activate():
         """
@@ -35,6 +162,17 @@ class Event:
         Event.activated = False
         Event.events = defaultdict(list)
 
+        # stop worker threads, events can share a queue
+        for queue in set(Event.queues.values()):
+            queue.put(None, block=False)
+
+        Event.queues = {}
+
+        for burst in Event.bursts.values():
+            burst.stop()
+
+        Event.bursts = {}
+
     @staticmethod
     def on(event = None, *handlers):
         """
@@ -71,29 +209,105 @@ class Event:
                 Event.events.get(event).remove(cb)
 
     @staticmethod
-    def async_trigger(event, *args, **kw):
-        Event.trigger(event, *args, **kw)
+    def queue(event=None, capacity=None):
+        """
+        Execute the handlers of events in an own worker thread
+        Trigger returns as soon as the event has been queued and only blocks
+        if the queue is full. Events that are queued together share one worker
+        and are executed in the order in which they have been triggered
+        :param event: event name or list of event names
+        :param capacity: maximal number of queued events
+        :return:
+        """
+        events = [event] if isinstance(event, basestring) or event is None else list(event)
+        events = [e for e in events if e not in Event.queues]
+
+        if not events:
+            return
+
+        queue = EventQueue(capacity=capacity or Event.capacity)
+
+        for e in events:
+            Event.queues[e] = queue
+
+        worker = threading.Thread(target=Event.__work, args=(queue,))
+        worker.daemon = True
+        worker.start()
 
     @staticmethod
-    def trigger(event, *args, **kw):
+    def __work(queue):
         """
-        Trigger an event. The corresponding handlers will be executed
-        :param event: event name
-        :param args: arguments without key
-        :param kw: arguments with key
+        Execute queued events until the event system gets deactivated
+        :param queue: EventQueue of (event name, args, kw)
         :return:
         """
+        while True:
+            item = queue.get()
 
-        if not Event.activated:
+            if item is None:
+                return
+
+            event, args, kw = item
+
+            callbacks = list(Event.events.get(event, []))
+
+            if Event.activated and callbacks:
+                Event.__execute(callbacks, *args, **kw)
+
+    @staticmethod
+    def coalesce(event=None, min_hold=0, max_hold=0):
+        """
+        Merge triggers of an event that arrive in short succession
+        The handlers are executed once by a worker thread when the burst is over
+        :param event: event name
+        :param min_hold: seconds without trigger after which a burst is over
+        :param max_hold: maximal seconds between the first trigger of a burst and the execution
+        :return:
+        """
+        if event in Event.bursts:
             return
 
-        callbacks = list(Event.events.get(event, []))
+        burst = Burst(min_hold=min_hold, max_hold=max_hold)
+        Event.bursts[event] = burst
 
-        if not callbacks:
-            return False
+        worker = threading.Thread(target=Event.__work_bursts, args=(event, burst))
+        worker.daemon = True
+        worker.start()
 
+    @staticmethod
+    def __work_bursts(event, burst):
+        """
+        Execute the handlers of a coalesced event once per burst
+        :param event: event name
+        :param burst: Burst
+        :return:
+        """
+        while True:
+            item = burst.wait()
+
+            if item is None:
+                return
+
+            args, kw = item
+
+            callbacks = list(Event.events.get(event, []))
+
+            if Event.activated and callbacks:
+                Event.__execute(callbacks, *args, **kw)
+
+    @staticmethod
+    def __execute(callbacks, *args, **kw):
+        """
+        Execute the handlers of an event
+        :param callbacks: handlers
+        :param args: arguments without key
+        :param kw: arguments with key
+        :return:
+        """
         # lock this method in order to prevent writing issues
         Event.lock.acquire()
+        Event.local.executing = getattr(Event.local, 'executing', 0) + 1
+
         for cb in callbacks:
             try:
                 cb(*args, **kw)
@@ -103,5 +317,45 @@ class Event:
                 Event.trigger('log_to_input', str=str((traceback.format_exc())))
 
         # release this method
+        Event.local.executing -= 1
         Event.lock.release()
+
+    @staticmethod
+    def async_trigger(event, *args, **kw):
+        Event.trigger(event, *args, **kw)
+
+    @staticmethod
+    def trigger(event, *args, **kw):
+        """
+        Trigger an event. The corresponding handlers will be executed
+        :param event: event name
+        :param args: arguments without key
+        :param kw: arguments with key
+        :return:
+        """
+
+        if not Event.activated:
+            return
+
+        callbacks = list(Event.events.get(event, []))
+
+        if not callbacks:
+            return False
+
+        burst = Event.bursts.get(event)
+
+        if burst is not None:
+            burst.add(args, kw)
+            return True
+
+        queue = Event.queues.get(event)
+
+        if queue is not None:
+            # blocks if the queue is full, unless a handler holds the lock,
+            # waiting for the worker could dead lock in this case
+            queue.put((event, args, kw), block=not getattr(Event.local, 'executing', 0))
+            return True
+
+        Event.__execute(callbacks, *args, **kw)
+
         return True
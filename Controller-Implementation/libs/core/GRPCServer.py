@@ -5,6 +5,7 @@ import proto.connection_pb2
 from concurrent import futures
 from libs.core.Log import Log
 from libs.core.Event import Event
+from libs.Configuration import Configuration
 import threading
 
 
@@ -12,6 +13,67 @@ class GlobalServer(proto.connection_pb2_grpc.GlobalServerServicer):
     group_messages = []
     topology_messages = []
 
+    # {switch: (session, highest handled sequence number)}
+    sequences = {}
+
+    # switches that should send all neighbors again
+    resync = set()
+
+    # set when the global controller is connected to all local controllers,
+    # messages that arrive before are handled afterwards instead of being dropped
+    ready = threading.Event()
+
+    @staticmethod
+    def request_resync(switch=None):
+        GlobalServer.resync.add(switch)
+
+    @staticmethod
+    def release(*args, **kwargs):
+        GlobalServer.ready.set()
+
+    def ControlChannel(self, request_iterator, context):
+        """
+        Receives the messages of a local controller over one stream
+        Messages are handled in order, messages that are sent again after a reconnect are skipped
+        Each batch is acknowledged with the highest handled sequence number
+        """
+        for batch in request_iterator:
+            GlobalServer.ready.wait()
+
+            session, last = GlobalServer.sequences.get(batch.switch, (None, 0))
+
+            # the local controller has been restarted
+            if session != batch.session:
+                last = 0
+
+            for message in batch.messages:
+                if message.sequence <= last:
+                    continue
+
+                if last and message.sequence > last + 1:
+                    Log.async_info(message.sequence - last - 1, "messages of", batch.switch, "lost")
+
+                last = message.sequence
+
+                message_type = message.WhichOneof('message')
+
+                if message_type == 'group':
+                    self.GroupMessage(message.group, context)
+                elif message_type == 'topology':
+                    self.TopologyMessage(message.topology, context)
+                elif message_type == 'port':
+                    self.PortMessage(message.port, context)
+                elif message_type == 'adjacency':
+                    # compared after the queued topology packets
+                    Event.trigger("topology_packet_in", digest=message.adjacency)
+
+            GlobalServer.sequences[batch.switch] = (batch.session, last)
+
+            resync = batch.switch in GlobalServer.resync
+            GlobalServer.resync.discard(batch.switch)
+
+            yield proto.connection_pb2.ControlAck(sequence=last, resync=resync)
+
     def GroupMessage(self, request, context):
         Event.trigger("igmp_packet_in", pkt=request)
 
@@ -46,8 +108,12 @@ class GRPCServer:
     def __init__(self, listen_port=0):
         self.listen_port = listen_port
         self.running = True
-        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+
+        # each local controller keeps one stream open, which occupies a worker
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10 + len(Configuration.get('switches'))))
         Event.on('exit', self.stop)
+        Event.on('adjacency_resync', GlobalServer.request_resync)
+        Event.on('system_done', GlobalServer.release)
 
     def start(self):
         """
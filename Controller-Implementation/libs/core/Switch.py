@@ -3,6 +3,7 @@ This module represents a switch.
 """
 
 from libs.core.Device import Device
+from libs.TopologyManager import TopologyManager
 
 
 class Switch(Device):
@@ -32,8 +33,11 @@ class Switch(Device):
         :param id: bfr id
         :return:
         """
+        old_id = self._domain_id_mapping.get(domain, None)
         self._domain_id_mapping[domain] = id
 
+        TopologyManager.update_bfr_id(name=self._name, domain=domain, old_id=old_id, new_id=id)
+
     def get_bfr_mapping(self):
         """
         Get the domain bfr mapping
@@ -47,6 +51,10 @@ class Switch(Device):
         only set default domain id
         :return:
         """
+        for domain, id in self._domain_id_mapping.items():
+            if domain != 0:
+                TopologyManager.update_bfr_id(name=self._name, domain=domain, old_id=id)
+
         self._domain_id_mapping = {0: self._domain_id_mapping.get(0)}
 
     def get_type(self):
@@ -1,7 +1,6 @@
 import grpc
 import threading
 import proto.connection_pb2_grpc
-from libs.core.Log import Log
 from libs.core.Switch import Switch
 from libs.core.Event import Event
 from libs.Configuration import Configuration
@@ -19,20 +18,18 @@ class SwitchConnection:
         Event.trigger('new_switch_connection',
                       name=self.name, device=Switch(name=self.name, ip=response.ip.encode('utf-8'), mac=response.mac.encode('utf-8'), bfr_id=response.bfr_id))
 
-    def addTableEntry(self, tableEntry=None):
+    def writeTableEntries(self, batch=None):
         """
-        Add a table entry to the switch
+        Write a batch of table entry updates to the switch
+        The response is checked by the caller, see BaseController.write_table_entry_batches
+        :return: response
         """
-        response = self.stub.AddEntry(tableEntry)
+        return self.stub.WriteEntries(batch)
 
-        if response.code == 0:
-            Log.error("Error for entry:", tableEntry, "on switch", self.name)
-
-    def removeTableEntry(self, tableEntry=None):
+    def readTableEntries(self):
         """
-        Remove a table entry from the switch
+        Read the entries of the global controller from the switch
+        The local controller repairs differences between these entries and the switch before
+        :return: list of TableEntry messages
         """
-        response = self.stub.RemoveEntry(tableEntry)
-
-        if response.code == 0:
-            Log.error("Error while removing entry:", tableEntry, "on switch", self.name)
+        return self.stub.ReadEntries(proto.connection_pb2.Empty()).entries
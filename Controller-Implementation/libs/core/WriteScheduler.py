@@ -0,0 +1,268 @@
+"""
+This module schedules the table entry writes to the switches
+
+Each switch has its own queue of pending writes and a worker thread, so writes
+to different switches are sent in parallel. The worker sends the pending writes
+in batches, writes of a higher priority class (e.g. failure repair) first, so that
+they don't wait behind large bulk updates.
+
+Pending writes of the same entry are written in order and redundant writes are
+cancelled, e.g. an insert followed by a delete, or two modifies.
+
+A WriteBarrier waits until all writes submitted with it are done, e.g. all writes of one recompute.
+Writes are executed while the submitting thread may hold the event lock,
+so they must not trigger events (e.g. log), results are returned by the barrier instead.
+"""
+
+from collections import OrderedDict, Counter
+import threading
+from libs.TableEntryManager import INSERT, MODIFY, DELETE
+
+
+def coalesce(writes=None, write=None):
+    """
+    Append a write to the pending writes of the same entry and cancel redundant writes
+    :param writes: pending writes of the entry, list of (update type, table name, TableEntry, barrier)
+    :param write: new write of the entry
+    :return: (pending writes, cancelled writes)
+    """
+    if writes:
+        last = writes[-1]
+
+        # the entry is not written at all
+        if last[0] == INSERT and write[0] == DELETE:
+            return writes[:-1], [last, write]
+
+        # insert the new version of the entry
+        if last[0] == INSERT and write[0] == MODIFY:
+            return writes[:-1] + [(INSERT,) + write[1:]], [last]
+
+        # only the last change matters
+        if last[0] == MODIFY and write[0] in (MODIFY, DELETE):
+            return writes[:-1] + [write], [last]
+
+        # the entry is replaced, a changed priority still needs delete and insert
+        if last[0] == DELETE and write[0] == INSERT and len(writes) == 1 and last[2].priority == write[2].priority:
+            return [(MODIFY,) + write[1:]], [last]
+
+    return writes + [write], []
+
+
+class WriteBarrier(object):
+    """
+    Waits for a group of submitted writes
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = 0
+
+        # [(key, result, error, number of writes)]
+        self.results = []
+
+    def add(self, count=1):
+        """
+        Register submitted writes
+        :param count: number of writes
+        :return:
+        """
+        with self.condition:
+            self.pending += count
+
+    def done(self, key=None, result=None, error=None, count=1):
+        """
+        Mark submitted writes as done
+        :param key: key of the writes, e.g. switch name
+        :param result: return value of the write, None if the writes have been cancelled
+        :param error: exception raised by the write, None if there was none
+        :param count: number of writes
+        :return:
+        """
+        with self.condition:
+            self.pending -= count
+
+            if result is not None or error is not None:
+                self.results.append((key, result, error, count))
+
+            self.condition.notify_all()
+
+    def is_done(self):
+        """
+        Check if all registered writes are done
+        :return: bool
+        """
+        with self.condition:
+            return self.pending <= 0
+
+    def wait(self):
+        """
+        Wait until all registered writes are done
+        :return: list of (key, result, error, number of writes)
+        """
+        with self.condition:
+            while self.pending > 0:
+                self.condition.wait()
+
+            return self.results
+
+
+class PendingWrites(object):
+    """
+    Pending writes of one switch, ordered by priority class
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.running = True
+
+        # {priority class: OrderedDict{(table name, match key): list of writes}}
+        self.classes = {}
+
+        # {(table name, match key): priority class}
+        self.class_of = {}
+
+    def __len__(self):
+        return len(self.class_of)
+
+    def add(self, updates=None, barrier=None):
+        """
+        Add writes, see coalesce
+        :param updates: list of (priority class, update type, table name, TableEntry),
+                        lower classes are written first
+        :param barrier: WriteBarrier that waits for these writes
+        :return:
+        """
+        with self.condition:
+            for write_class, update_type, table_name, table_entry in updates:
+                key = (table_name, table_entry.get_match_key())
+                old_class = self.class_of.pop(key, None)
+                writes = self.classes[old_class].pop(key) if old_class is not None else []
+
+                writes, cancelled = coalesce(writes=writes, write=(update_type, table_name, table_entry, barrier))
+
+                for write in cancelled:
+                    write[3].done()
+
+                if writes:
+                    if old_class is not None:
+                        write_class = min(write_class, old_class)
+
+                    self.classes.setdefault(write_class, OrderedDict())[key] = writes
+                    self.class_of[key] = write_class
+
+            self.condition.notify()
+
+    def take(self, size=None):
+        """
+        Wait for pending writes and remove up to size entries, higher priority classes first
+        :param size: maximal number of entries
+        :return: (list of (update type, table name, TableEntry), {barrier: number of writes})
+                 or None if stopped
+        """
+        updates = []
+        barriers = Counter()
+
+        with self.condition:
+            while self.running and not self.class_of:
+                self.condition.wait()
+
+            if not self.running:
+                return None
+
+            for write_class in sorted(self.classes):
+                queue = self.classes[write_class]
+
+                while queue and len(updates) < size:
+                    key, writes = queue.popitem(last=False)
+                    del self.class_of[key]
+
+                    for update_type, table_name, table_entry, barrier in writes:
+                        updates.append((update_type, table_name, table_entry))
+                        barriers[barrier] += 1
+
+                if not queue:
+                    del self.classes[write_class]
+
+        return updates, barriers
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+
+class WriteScheduler(object):
+    """
+    Writes with one worker thread per switch
+    """
+
+    # maximal number of entries per batch, a pending write of a higher class
+    # waits at most for one batch of a lower class
+    batch_size = 500
+
+    def __init__(self, write=None):
+        """
+        :param write: function(switch, updates) that writes a batch to a switch
+        """
+        self.write = write
+
+        # {switch: PendingWrites}
+        self.switches = {}
+        self.lock = threading.Lock()
+
+    def submit(self, switch=None, barrier=None, updates=None):
+        """
+        Queue writes, writes of the same entry are executed in order
+        :param switch: switch name
+        :param barrier: WriteBarrier that waits for these writes
+        :param updates: list of (priority class, update type, table name, TableEntry)
+        :return:
+        """
+        with self.lock:
+            pending = self.switches.get(switch)
+
+            if pending is None:
+                pending = PendingWrites()
+                self.switches[switch] = pending
+
+                worker = threading.Thread(target=self.__work, args=(switch, pending))
+                worker.daemon = True
+                worker.start()
+
+        barrier.add(count=len(updates))
+        pending.add(updates=updates, barrier=barrier)
+
+    def stop(self, *args, **kwargs):
+        """
+        Stop all worker threads, pending writes are dropped
+        :return:
+        """
+        with self.lock:
+            for pending in self.switches.values():
+                pending.stop()
+
+            self.switches = {}
+
+    def __work(self, switch, pending):
+        """
+        Write the pending writes of a switch in batches
+        :param switch: switch name
+        :param pending: PendingWrites
+        :return:
+        """
+        while True:
+            item = pending.take(size=WriteScheduler.batch_size)
+
+            if item is None:
+                return
+
+            updates, barriers = item
+
+            try:
+                result = self.write(switch=switch, updates=updates)
+            except Exception as e:
+                for barrier, count in barriers.iteritems():
+                    barrier.done(key=switch, error=e, count=count)
+            else:
+                for barrier, count in barriers.iteritems():
+                    barrier.done(key=switch, result=result, count=count)
@@ -24,6 +24,16 @@ class LocalServerStub(object):
         request_serializer=connection__pb2.TableEntry.SerializeToString,
         response_deserializer=connection__pb2.Status.FromString,
         )
+    self.WriteEntries = channel.unary_unary(
+        '/controller_connection.LocalServer/WriteEntries',
+        request_serializer=connection__pb2.TableEntryBatch.SerializeToString,
+        response_deserializer=connection__pb2.Status.FromString,
+        )
+    self.ReadEntries = channel.unary_unary(
+        '/controller_connection.LocalServer/ReadEntries',
+        request_serializer=connection__pb2.Empty.SerializeToString,
+        response_deserializer=connection__pb2.TableEntryList.FromString,
+        )
     self.Hello = channel.unary_unary(
         '/controller_connection.LocalServer/Hello',
         request_serializer=connection__pb2.HelloMessage.SerializeToString,
@@ -49,6 +59,20 @@ class LocalServerServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def WriteEntries(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def ReadEntries(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def Hello(self, request, context):
     # missing associated documentation comment in .proto file
     pass
@@ -69,6 +93,16 @@ def add_LocalServerServicer_to_server(servicer, server):
           request_deserializer=connection__pb2.TableEntry.FromString,
           response_serializer=connection__pb2.Status.SerializeToString,
       ),
+      'WriteEntries': grpc.unary_unary_rpc_method_handler(
+          servicer.WriteEntries,
+          request_deserializer=connection__pb2.TableEntryBatch.FromString,
+          response_serializer=connection__pb2.Status.SerializeToString,
+      ),
+      'ReadEntries': grpc.unary_unary_rpc_method_handler(
+          servicer.ReadEntries,
+          request_deserializer=connection__pb2.Empty.FromString,
+          response_serializer=connection__pb2.TableEntryList.SerializeToString,
+      ),
       'Hello': grpc.unary_unary_rpc_method_handler(
           servicer.Hello,
           request_deserializer=connection__pb2.HelloMessage.FromString,
@@ -90,6 +124,11 @@ class GlobalServerStub(object):
     Args:
       channel: A grpc.Channel.
     """
+    self.ControlChannel = channel.stream_stream(
+        '/controller_connection.GlobalServer/ControlChannel',
+        request_serializer=connection__pb2.ControlMessageBatch.SerializeToString,
+        response_deserializer=connection__pb2.ControlAck.FromString,
+        )
     self.GroupMessage = channel.unary_unary(
         '/controller_connection.GlobalServer/GroupMessage',
         request_serializer=connection__pb2.GroupPacket.SerializeToString,
@@ -116,13 +155,21 @@ class GlobalServerServicer(object):
   # missing associated documentation comment in .proto file
   pass
 
-  def GroupMessage(self, request, context):
-    """use bidirectional streaming for packet to main controller
+  def ControlChannel(self, request_iterator, context):
+    """local controllers send their messages over the control channel,
+    the single message calls are kept for older local controllers
     """
     context.set_code(grpc.StatusCode.UNIMPLEMENTED)
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def GroupMessage(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
   def TopologyMessage(self, request, context):
     # missing associated documentation comment in .proto file
     pass
@@ -147,6 +194,11 @@ class GlobalServerServicer(object):
 
 def add_GlobalServerServicer_to_server(servicer, server):
   rpc_method_handlers = {
+      'ControlChannel': grpc.stream_stream_rpc_method_handler(
+          servicer.ControlChannel,
+          request_deserializer=connection__pb2.ControlMessageBatch.FromString,
+          response_serializer=connection__pb2.ControlAck.SerializeToString,
+      ),
       'GroupMessage': grpc.unary_unary_rpc_method_handler(
           servicer.GroupMessage,
           request_deserializer=connection__pb2.GroupPacket.FromString,
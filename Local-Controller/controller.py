@@ -34,7 +34,7 @@ def init_switches(controller=None, topology_controller=None, group_controller=No
     group_controller.add_flood_node()
     group_controller.init_flood_group()
 
-    topology_controller.send_topology_packets()
+    topology_controller.start_discovery()
 
 
 def main():
@@ -53,6 +53,7 @@ def main():
     Event.on("topology_to_controller", GlobalConnection.send_topology_packet)  # triggers the send routine to server
     Event.on("igmp_packet_to_controller", GlobalConnection.send_group_packet)  # triggers the send routine to server
     Event.on("port_msg_to_controller", GlobalConnection.send_port_info) # triggers the send routine to server
+    Event.on("adjacency_digest_to_controller", GlobalConnection.send_adjacency_digest)  # triggers the send routine to server
 
 
     topology = TopologyController(controller)
@@ -88,6 +89,18 @@ if __name__ == '__main__':
     parser.add_argument('--bmv2-json', help='BMv2 JSON file from p4c',
                         type=str, action="store", required=False,
                         default='../P4-Implementation/build/sdn-bfr.json')
+    parser.add_argument('--force-pipeline', help='set the pipeline even if the switch runs the same pipeline',
+                        action="store_true", required=False,
+                        default=False)
+    parser.add_argument('--packet-in-buffer', help='maximal number of buffered packet-ins, the oldest are dropped',
+                        type=int, action="store", required=False,
+                        default=1024)
+    parser.add_argument('--packet-in-workers', help='number of threads that handle packet-ins',
+                        type=int, action="store", required=False,
+                        default=1)
+    parser.add_argument('--discovery-interval', help='seconds between topology packets once the topology is stable',
+                        type=float, action="store", required=False,
+                        default=10)
     parser.add_argument('--grpc-port', help='GRPC port of switch',
                         type=int, action="store", required=True,
                         default=50051)
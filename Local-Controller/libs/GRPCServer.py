@@ -2,57 +2,234 @@ import grpc
 import proto.connection_pb2_grpc
 import proto.connection_pb2
 
+from collections import deque
 from concurrent import futures
+from itertools import islice
 from libs.core.Log import Log
 from libs.core.Event import Event
 from libs.TopologyManager import TopologyManager
 from libs.core.BaseController import BaseController
 from libs.Configuration import Configuration
+import threading
 import time
-import pickle
+
+
+class ControlStream:
+    """
+    Sends the topology, group and port messages to the global controller over
+    one bidirectional stream (ControlChannel) instead of one call per message
+
+    Messages get consecutive sequence numbers and are kept until the global controller
+    acknowledges them, after a reconnect the unacknowledged messages are sent again.
+    Messages that are added while others are sent are sent together as one batch.
+    """
+
+    # maximal number of unacknowledged messages, the oldest are dropped if the global controller is not connected
+    window = 1000
+
+    # maximal number of messages per batch
+    batch_size = 100
+
+    # seconds a sender waits for acknowledgements if the window is full
+    timeout = 1
+
+    # seconds between reconnect attempts
+    retry_interval = 1
+
+    def __init__(self):
+        self.condition = threading.Condition()
+
+        # sequence numbers restart with each run of the local controller
+        self.session = int(time.time() * 1000)
+        self.sequence = 0
+
+        # ControlMessages in order of their sequence numbers, only the oldest are dropped
+        self.unacked = deque()
+
+        # highest sequence number sent on the current stream
+        self.sent = 0
+        self.dropped = 0
+
+        self.stub = None
+        self.connected = False
+
+        # incremented for each stream, ends the batches of the previous stream
+        self.stream_id = 0
+
+        # keeps the stream open, started with the first connection
+        self.thread = None
+
+    def send(self, **kwargs):
+        """
+        Add a message, waits up to timeout if the window is full
+        :param kwargs: group, topology or port message
+        :return:
+        """
+        message = proto.connection_pb2.ControlMessage(**kwargs)
+
+        with self.condition:
+            deadline = time.time() + ControlStream.timeout
+
+            while self.connected and len(self.unacked) >= ControlStream.window and time.time() < deadline:
+                self.condition.wait(deadline - time.time())
+
+            if len(self.unacked) >= ControlStream.window:
+                self.unacked.popleft()
+                self.dropped += 1
+
+            self.sequence += 1
+            message.sequence = self.sequence
+            self.unacked.append(message)
+            self.condition.notify_all()
+
+    def connect(self, channel=None):
+        """
+        Send the messages over a new channel, e.g. after the global controller restarted
+        :param channel: grpc channel to the global controller
+        :return:
+        """
+        with self.condition:
+            self.stub = proto.connection_pb2_grpc.GlobalServerStub(channel)
+            self.stream_id += 1
+            self.condition.notify_all()
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run)
+                self.thread.daemon = True
+                self.thread.start()
+
+    def disconnect(self):
+        with self.condition:
+            self.stub = None
+            self.connected = False
+            self.stream_id += 1
+            self.condition.notify_all()
+
+    def acknowledge(self, sequence=0, resync=False):
+        """
+        Remove the messages that have been handled by the global controller
+        :param sequence: highest handled sequence number
+        :param resync: the global controller requests all adjacencies again
+        :return:
+        """
+        with self.condition:
+            while self.unacked and self.unacked[0].sequence <= sequence:
+                self.unacked.popleft()
+
+            self.connected = True
+            self.condition.notify_all()
+
+        # the neighbors are sent by another thread, this thread receives the acknowledgements
+        if resync:
+            thread = threading.Thread(target=Event.trigger, args=("topology_resync",))
+            thread.daemon = True
+            thread.start()
+
+    def batches(self, stream_id=0):
+        """
+        Request iterator of a stream, the first batch is sent immediately
+        :param stream_id: id of the stream, the iterator ends if a new stream is started
+        :return: ControlMessageBatch
+        """
+        first = True
+
+        while True:
+            with self.condition:
+                while self.stream_id == stream_id and not first and \
+                        not (self.unacked and self.unacked[-1].sequence > self.sent):
+                    self.condition.wait()
+
+                if self.stream_id != stream_id:
+                    return
+
+                messages = []
+
+                if self.unacked:
+                    start = max(0, self.sent + 1 - self.unacked[0].sequence)
+                    messages = list(islice(self.unacked, start, start + ControlStream.batch_size))
+
+                if messages:
+                    self.sent = messages[-1].sequence
+
+            first = False
+
+            yield proto.connection_pb2.ControlMessageBatch(switch=Configuration.get('name'),
+                                                           session=self.session,
+                                                           messages=messages)
+
+    def run(self):
+        """
+        Keeps the stream to the global controller open
+        :return:
+        """
+        while True:
+            with self.condition:
+                while self.stub is None:
+                    self.condition.wait()
+
+                stub = self.stub
+                self.stream_id += 1
+                stream_id = self.stream_id
+
+                # send all unacknowledged messages again
+                self.sent = 0
+
+            try:
+                for ack in stub.ControlChannel(self.batches(stream_id=stream_id)):
+                    self.acknowledge(sequence=ack.sequence, resync=ack.resync)
+            except Exception as e:
+                pass  # global controller not reachable, retried below
+
+            with self.condition:
+                self.connected = False
+
+                if self.stream_id == stream_id:
+                    self.stream_id += 1
+                    self.condition.notify_all()
+                    self.condition.wait(ControlStream.retry_interval)
 
 
 class GlobalConnection:
     global_connection = None
 
+    # messages to the global controller, kept across connections
+    stream = ControlStream()
+
     def __init__(self, ip=None, port=0):
-        self.channel = grpc.insecure_channel(ip + ":" + str(port))
+        # reconnect quickly if the global controller is not reachable for a while
+        self.channel = grpc.insecure_channel(ip + ":" + str(port),
+                                             options=[('grpc.max_reconnect_backoff_ms', ControlStream.retry_interval * 1000)])
         self.stub = proto.connection_pb2_grpc.GlobalServerStub(self.channel)
 
         reponse = self.stub.CheckConnection(proto.connection_pb2.Empty())
         Log.info("Global connection to", ip + ":" + str(port))
 
+        GlobalConnection.stream.connect(channel=self.channel)
+
         # remove possible old connection when a new global connection is initialized
         Event.on('global_connection', self.close)
 
     def close(self):
         Log.info("Global connection removed")
         Event.off('global_connection', self.close)
+        GlobalConnection.stream.disconnect()
         self.channel.close()
 
     @staticmethod
     def send_topology_packet(pkt=None):
-        if GlobalConnection.global_connection is not None:
-            try:
-                response = GlobalConnection.global_connection.stub.TopologyMessage(pkt)
-            except Exception as e:
-                pass
+        GlobalConnection.stream.send(topology=pkt)
 
     @staticmethod
     def send_group_packet(pkt=None):
-        if GlobalConnection.global_connection is not None:
-            try:
-                response = GlobalConnection.global_connection.stub.GroupMessage(pkt)
-            except Exception as e:
-                pass
+        GlobalConnection.stream.send(group=pkt)
 
     @staticmethod
     def send_port_info(info=None):
-        if GlobalConnection.global_connection is not None:
-            try:
-                response = GlobalConnection.global_connection.stub.PortMessage(info)
-            except Exception as e:
-                pass
+        GlobalConnection.stream.send(port=info)
+
+    @staticmethod
+    def send_adjacency_digest(digest=None):
+        GlobalConnection.stream.send(adjacency=digest)
 
 
 class LocalServer(proto.connection_pb2_grpc.LocalServerServicer):
@@ -79,6 +256,26 @@ class LocalServer(proto.connection_pb2_grpc.LocalServerServicer):
 
         return proto.connection_pb2.Status(code=0, message="error")
 
+    def WriteEntries(self, request, context):
+        """
+        Write an ordered batch of table entry updates to the switch
+        """
+        failed = LocalServer.controller.write_entries(updates=request.updates)
+
+        if Configuration.get("name") == "s1":
+            Log.log_to_file(round((time.time() * 1000) % 1000000), len(request.updates), "\r\n", file="logs/entry_info.txt")
+
+        if failed:
+            return proto.connection_pb2.Status(code=0, message="error in updates " + ", ".join(map(str, failed)))
+
+        return proto.connection_pb2.Status(code=1, message="all good")
+
+    def ReadEntries(self, request, context):
+        """
+        Reconcile the entries on the switch and return the entries of the global controller
+        """
+        return proto.connection_pb2.TableEntryList(entries=LocalServer.controller.reconcile())
+
     def Hello(self, request, context):
         Event.trigger('global_connection')
 
@@ -2,10 +2,11 @@
 This module handles all packet in messages from the switches
 It triggers the corresponding actions based on the type of in message
 """
-from scapy.all import *
-from scapy.contrib.igmp import IGMP
 from libs.core.Event import Event
 from libs.Configuration import Configuration
+from libs.Exceptions import ConfigurationNotFound
+from libs.packet_header.PacketParser import parse_ethernet, parse_topology_discovery, parse_ipv4, parse_igmp, \
+    TYPE_TOPOLOGY_DISCOVERY, TYPE_IPV4, PROTO_IGMP
 from libs.core.Log import Log
 import proto.connection_pb2
 
@@ -24,20 +25,36 @@ class MessageInHandler:
         switch = kwargs.get('switch')
 
         try:
-            pkt = Ether(packet.packet.payload)
+            data = packet.packet.payload
+            ethernet = parse_ethernet(data)
+
+            if ethernet is None:  # it's not an ethernet frame
+                return
 
             try:
                 Configuration.get('system_done')
             except ConfigurationNotFound:
                 return
 
-            if pkt.type == 0xDD00:  # its an topology packet
-                Event.trigger("topology_packet_in", packet=pkt, switch=switch)
+            if ethernet.type == TYPE_TOPOLOGY_DISCOVERY:  # its an topology packet
+                pkt = parse_topology_discovery(data, ethernet.offset)
+
+                if pkt is not None:
+                    Event.trigger("topology_packet_in", packet=pkt, switch=switch)
+
+            if ethernet.type == TYPE_IPV4:  # its an igmp packet
+                ip = parse_ipv4(data, ethernet.offset)
+
+                if ip is None or ip.proto != PROTO_IGMP:
+                    return
+
+                igmp = parse_igmp(data, ip.offset)
+
+                if igmp is None:
+                    return
 
-            if pkt.type == 0x800:  # its an igmp packet
-                igmp = pkt.payload.payload
-                pkt = proto.connection_pb2.GroupPacket(type=int(igmp.type), mc_address=str(igmp.gaddr), src_ip=str(pkt.payload.src), switch=Configuration.get('name'))
-                Event.trigger("igmp_packet_to_controller", pkt=pkt)
+                pkt = proto.connection_pb2.GroupPacket(type=igmp.type, mc_address=igmp.gaddr, src_ip=ip.src, switch=Configuration.get('name'))
+                Event.trigger("igmp_packet_in", pkt=pkt)
 
-        except Exception as e:  # it's not an ethernet frame
+        except Exception as e:  # it's a malformed packet
             pass
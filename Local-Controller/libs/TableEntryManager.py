@@ -3,6 +3,8 @@ This is a simplified version of the TableEntryManager used in the
 global controller.
 
 For further documentation see official docs of global controller implementation.
+
+Entries are indexed by a canonical (frozen) key of their match fields.
 """
 
 from collections import defaultdict
@@ -41,12 +43,30 @@ class TableEntry:
         return str(self.match_fields) + "-" + str(self.action_name) \
             + "-" + str(self.action_params) + "-" + str(self.priority)
 
+    def get_match_key(self):
+        """
+        Canonical hashable representation of the match fields
+        :return: frozenset of (field, value) pairs
+        """
+        return match_key(self.match_fields)
+
+
+def match_key(match_fields=None):
+    """
+    Converts match fields into a canonical hashable key
+    :param match_fields: dict of match fields
+    :return: frozenset of (field, value) pairs
+    """
+    return frozenset((field, tuple(value) if isinstance(value, list) else value)
+                     for field, value in match_fields.iteritems())
+
 
 class TableEntryManager:
     Manager = {}
 
     def __init__(self, controller=None, name=None):
-        self.tables = defaultdict(list)
+        # {table_name: {match key: TableEntry}}
+        self.tables = defaultdict(dict)
         self.__controller = controller
         self.name = name
 
@@ -60,7 +80,7 @@ class TableEntryManager:
         :param table_name: table name
         :return:
         """
-        self.tables[table_name] = []
+        self.tables[table_name] = {}
 
     def add_table_entry(self, table_name=None, table_entry=None):
         """
@@ -69,7 +89,7 @@ class TableEntryManager:
         :param table_entry: TableEntry object
         :return:
         """
-        self.get_table_entries(table_name=table_name).append(table_entry)
+        self.__get_table(table_name=table_name)[table_entry.get_match_key()] = table_entry
 
         # add table entry
         self.__controller.add_table_entry(table_name=table_name,
@@ -84,23 +104,18 @@ class TableEntryManager:
         """
 
         # remove table entry based on match_fields
-        for entry in self.get_table_entries(table_name=table_name):
-            if entry.match_fields == table_entry.match_fields:
-                self.tables.get(table_name).remove(entry)
-
-                # delete old table entry
-                self.__controller.delete_table_entry(table_name=table_name,
-                                                     entry=table_entry)
-
-                return
+        if self.__get_table(table_name=table_name).pop(table_entry.get_match_key(), None) is None:
+            raise EntryNotFound(table_entry)
 
-        raise EntryNotFound(table_entry)
+        # delete old table entry
+        self.__controller.delete_table_entry(table_name=table_name,
+                                             entry=table_entry)
 
-    def get_table_entries(self, table_name=None):
+    def __get_table(self, table_name=None):
         """
-        Get the table with the given name
+        Get the index of the table with the given name
         :param table_name: name of the table
-        :return:
+        :return: {match key: TableEntry}
         """
         table = self.tables.get(table_name, None)
 
@@ -109,6 +124,14 @@ class TableEntryManager:
 
         return table
 
+    def get_table_entries(self, table_name=None):
+        """
+        Get the table with the given name
+        :param table_name: name of the table
+        :return: list of TableEntry objects
+        """
+        return self.__get_table(table_name=table_name).values()
+
     def entry_exists(self, table_name=None, table_entry=None):
         """
         Check if entry exists in table
@@ -116,7 +139,9 @@ class TableEntryManager:
         :param table_entry: TableEntry objects
         :return:
         """
-        return table_entry in self.get_table_entries(table_name=table_name)
+        entry = self.__get_table(table_name=table_name).get(table_entry.get_match_key())
+
+        return entry is not None and entry == table_entry
 
     def match_fields_exists(self, table_name=None, table_entry=None):
         """
@@ -125,25 +150,34 @@ class TableEntryManager:
         :param table_entry: table entry, which has certain match_fields
         :return:
         """
-        for entry in self.get_table_entries(table_name=table_name):
-            if entry.match_fields == table_entry.match_fields:
-                return True
-
-        return False
+        return table_entry.get_match_key() in self.__get_table(table_name=table_name)
 
     def update_entry(self, table_name=None, table_entry=None):
         """
         Update a table entry
+        The entry is modified in place if only action or action params changed,
+        a changed priority is part of the key on the switch and needs delete and insert
         :param table_name: table name
         :param table_entry: new table entry
         :return:
         """
+        table = self.__get_table(table_name=table_name)
+        old_entry = table.get(table_entry.get_match_key())
 
-        # remove the old entry from table storage
-        self.__remove_table_entry(table_name=table_name, table_entry=table_entry)
+        if old_entry is None:
+            raise EntryNotFound(table_entry)
 
-        # add new entry
-        self.add_table_entry(table_name=table_name, table_entry=table_entry)
+        if old_entry.priority != table_entry.priority:
+            # remove the old entry from table storage
+            self.__remove_table_entry(table_name=table_name, table_entry=old_entry)
+
+            # add new entry
+            self.add_table_entry(table_name=table_name, table_entry=table_entry)
+        else:
+            table[table_entry.get_match_key()] = table_entry
+
+            self.__controller.modify_table_entry(table_name=table_name,
+                                                 entry=table_entry)
 
     def remove_invalid_entries(self, table_name=None, valid_entries=None):
         """
@@ -153,10 +187,12 @@ class TableEntryManager:
         :param valid_entries: a list of match fields of valid entries
         :return:
         """
-        for entry in self.get_table_entries(table_name=table_name):
+        valid_keys = set(match_key(match_fields) for match_fields in valid_entries)
+
+        for key, entry in self.__get_table(table_name=table_name).items():
             # the current entry is not a valid entry anymore
             # so delete it
-            if entry.match_fields not in valid_entries:
+            if key not in valid_keys:
                 self.__remove_table_entry(table_name=table_name, table_entry=entry)
 
     @staticmethod
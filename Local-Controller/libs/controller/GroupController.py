@@ -1,11 +1,17 @@
 """
 This module manages the native IPMC multicast groups on the P4 switch
+
+The members of a group (hosts behind the ports of this switch) are kept locally,
+the global controller only needs to know if the switch has members of a group.
+A group is reported to the global controller only if its membership changes
+between empty and non-empty, repeated joins and joins of further hosts are absorbed.
 """
 from libs.core.Event import Event
 from libs.core.Log import Log
 from libs.TopologyManager import TopologyManager
 from libs.TableEntryManager import TableEntryManager, TableEntry
 from libs.Configuration import Configuration
+import proto.connection_pb2
 
 import subprocess
 from subprocess import Popen, PIPE, STDOUT
@@ -21,7 +27,14 @@ class GroupController(object):
 
         self.mcgrp_to_port = defaultdict(list)
 
-        Event.on("igmp_packet_to_controller", self.update_igmp)
+        # {mc_addr: {host ip: port}}
+        self.members = defaultdict(dict)
+
+        # {mc_addr: host ip the join of the group has been reported with}
+        self.reported = {}
+
+        Event.on("igmp_packet_in", self.update_igmp)
+        Event.on("global_connection", self.resync)
 
         self.table_manager = TableEntryManager(controller=base, name="GroupController")
         self.table_manager.init_table("ingress.ipv4_c.ipv4_mc")
@@ -99,18 +112,45 @@ class GroupController(object):
         mc_addr = pkt.mc_address.encode('utf-8')
         src_ip = pkt.src_ip.encode('utf-8')
 
-        port = switch.get_device_to_port(TopologyManager.get_device_by_ip(ip=src_ip).get_name())
+        members = self.members[mc_addr]
 
         if pkt.type == 0x16:
-            if port not in self.mcgrp_to_port[mc_addr]:
-                self.mcgrp_to_port[mc_addr].append(port)
-        elif pkt.type == 0x17:
-            if port in self.mcgrp_to_port[mc_addr]:
-                self.mcgrp_to_port[mc_addr].remove(port)
-
-
-        self.update_mc_table()
+            if src_ip in members:  # repeated join
+                return
 
+            members[src_ip] = switch.get_device_to_port(TopologyManager.get_device_by_ip(ip=src_ip).get_name())
+        elif pkt.type == 0x17:
+            if src_ip not in members:
+                return
+
+            del members[src_ip]
+        else:
+            return
+
+        ports = sorted(set(members.values()))
+
+        if ports != self.mcgrp_to_port[mc_addr]:
+            self.mcgrp_to_port[mc_addr] = ports
+            self.update_mc_table()
+
+        if members and mc_addr not in self.reported:
+            # first member of the group on this switch
+            self.reported[mc_addr] = src_ip
+            Event.trigger("igmp_packet_to_controller", pkt=pkt)
+        elif not members and mc_addr in self.reported:
+            # last member left, the leave has to match the reported join
+            leave = proto.connection_pb2.GroupPacket(type=0x17, mc_address=mc_addr, src_ip=self.reported.pop(mc_addr),
+                                                     switch=pkt.switch)
+            Event.trigger("igmp_packet_to_controller", pkt=leave)
+
+    def resync(self, *args, **kwargs):
+        """
+        Report the joined groups again to a new global controller
+        """
+        for mc_addr, src_ip in self.reported.items():
+            pkt = proto.connection_pb2.GroupPacket(type=0x16, mc_address=mc_addr, src_ip=src_ip,
+                                                   switch=Configuration.get('name'))
+            Event.trigger("igmp_packet_to_controller", pkt=pkt)
 
     def update_mc_table(self):
         valid_entries = []
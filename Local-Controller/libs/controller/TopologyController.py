@@ -1,24 +1,139 @@
 """
 This module implements an TopologyController
 Sends topology packets, receives topology packets and build topology
+
+The neighbors are kept in an adjacency table, only changes are reported to the
+global controller: a new neighbor, a neighbor on another port and an expired neighbor.
+The neighbor of a port that goes down is dropped, down ports are not part of the digest.
+A digest of the adjacency table is sent periodically, if it differs from the view of
+the global controller, all neighbors are sent again.
+
+Topology packets are sent by one discovery thread with an adaptive interval: fast at startup,
+after port changes and new neighbors, then doubled up to the configured discovery interval.
 """
 
-from scapy.all import *
-from libs.packet_header.TopologyPacket import TopologyDiscovery
+from libs.packet_header.PacketParser import build_topology_packet
 from libs.core.Log import Log
 from libs.core.Event import Event
 from libs.core.Host import Host
 from libs.TopologyManager import TopologyManager
 from libs.Configuration import Configuration
 import proto.connection_pb2
+import hashlib
 import threading
+import time
 
 
 class TopologyController:
 
+    # seconds between two topology packets in a burst
+    min_interval = 0.25
+
+    # a neighbor expires if it has not been seen for this number of discovery intervals
+    expiry = 3
+
+    # the adjacency digest is sent every digest_interval topology packets
+    digest_interval = 5
+
     def __init__(self, controller):
         self.__baseController = controller
+
+        # {port: (TopologyPacket, time the neighbor has been seen last)}
+        self.adjacency = {}
+        # ports reported down by the port monitor
+        self.down_ports = set()
+        self.lock = threading.Lock()
+        self.rounds = 0
+
+        # seconds until the next topology packet, doubled after each packet up to the discovery interval
+        self.discovery_interval = TopologyController.min_interval
+        self.burst = False
+        self.condition = threading.Condition()
+
         Event.on("topology_packet_in", self.handle_topology_answer)
+        Event.on("topology_resync", self.resync)
+        Event.on("port_msg_to_controller", self.handle_port_change)
+
+    @staticmethod
+    def get_adjacency_digest(neighbors=None):
+        """
+        Digest of a set of neighbors, the global controller computes the same digest
+        :param neighbors: list of (port, name)
+        :return: 8 bytes
+        """
+        pairs = sorted("{0}:{1}".format(port, name) for port, name in neighbors)
+
+        return hashlib.sha1(",".join(pairs)).digest()[:8]
+
+    def start_discovery(self):
+        """
+        Start the discovery thread, which sends topology packets periodically
+        :return:
+        """
+        thread = threading.Thread(target=self.run_discovery)
+        thread.daemon = True
+        thread.start()
+
+    def run_discovery(self):
+        """
+        Send topology packets with an adaptive interval, see start_burst
+        :return:
+        """
+        while True:
+            sent = time.time()
+
+            try:
+                self.send_topology_packets()
+            except Exception as e:
+                Log.error("Error in topology discovery", e)
+
+            with self.condition:
+                interval = self.discovery_interval
+                self.discovery_interval = min(interval * 2, Configuration.get('discovery_interval'))
+
+                while True:
+                    remaining = sent + interval - time.time()
+
+                    if remaining <= 0:
+                        break
+
+                    self.condition.wait(remaining)
+
+                    if self.burst:
+                        self.burst = False
+                        interval = min(interval, TopologyController.min_interval)
+
+    def start_burst(self, *args, **kwargs):
+        """
+        Send the next topology packets fast again, e.g. after a port change
+        :return:
+        """
+        with self.condition:
+            self.discovery_interval = TopologyController.min_interval
+            self.burst = True
+            self.condition.notify()
+
+    def handle_port_change(self, *args, **kwargs):
+        """
+        Drop the neighbor of a port that went down, the global controller removes
+        the link by the port message itself
+        :param info: PortInfo of the port
+        :return:
+        """
+        info = kwargs.get('info')
+
+        with self.lock:
+            if info.status:
+                self.down_ports.discard(info.port)
+                neighbor = None
+            else:
+                self.down_ports.add(info.port)
+                neighbor = self.adjacency.pop(info.port, None)
+
+        if neighbor is not None:
+            Log.info("Neighbor", neighbor[0].name, "on port", info.port, "dropped, port down")
+
+        self.start_burst()
 
     def send_topology_packets(self):
         """
@@ -29,19 +144,22 @@ class TopologyController:
         sw = Configuration.get('name')
         # get bfr id off switch for identification in top packet
         switch = TopologyManager.get_device(sw)
-        pkt = Ether(src='00:00:00:00:00:00', dst='ff:ff:ff:ff:ff:ff')
 
-        pkt = pkt / TopologyDiscovery(identifier=switch.get_bfr_id(0),
-                                      port=1,
-                                      ip=str(switch.get_ip()),
-                                      mac=str(switch.get_mac()))
+        pkt = build_topology_packet(identifier=switch.get_bfr_id(0),
+                                    port=1,
+                                    ip=str(switch.get_ip()),
+                                    mac=str(switch.get_mac()))
 
-        self.__baseController.get_connection().send_packet_out(str(pkt))
+        self.__baseController.get_connection().send_packet_out(pkt)
 
         Log.debug("Send topology packet to switch", sw)
 
-        # send topology packet periodically
-        threading.Timer(2, self.send_topology_packets).start()
+        self.expire_neighbors()
+
+        self.rounds += 1
+
+        if self.rounds % TopologyController.digest_interval == 0:
+            self.send_adjacency_digest()
 
     def handle_topology_answer(self, *args, **kwargs):
         """
@@ -49,21 +167,105 @@ class TopologyController:
         :param args: contains the topology packet
         :return:
         """
-        packet = kwargs.get('packet')
+        pkt = kwargs.get('packet')
         switch = kwargs.get('switch')
 
-        pkt = packet.payload
-
-        if str(pkt.payload) != 'host':
+        if pkt.payload != 'host':
             name = "s" + str(pkt.identifier)
             TopologyManager.add_device(name=name, device=Host(name=name, ip=pkt.ip, mac=pkt.mac))
         else:  # its a host
             name = "h" + str(pkt.identifier)
             TopologyManager.add_device(name=name, device=Host(name=name, ip=pkt.ip, mac=pkt.mac))
 
-        if TopologyManager.get_device(name=switch).add_device_to_port(device=name, port=int(pkt.port)):
-            Event.trigger("topology_change", src_device=switch, dst_device=name, port=int(pkt.port))
+        port = int(pkt.port)
+        topology_packet = proto.connection_pb2.TopologyPacket(ip=pkt.ip, mac=pkt.mac, port=port, name=name, switch=Configuration.get('name'))
+
+        with self.lock:
+            # the port went down after the packet has been received
+            if port in self.down_ports:
+                return
+
+            known = self.adjacency.get(port)
+            self.adjacency[port] = (topology_packet, time.time())
+
+            # the neighbor moved to this port
+            for other in [p for p, (neighbor, _) in self.adjacency.items() if p != port and neighbor.name == name]:
+                del self.adjacency[other]
+
+        # another neighbor is connected to this port now
+        if known is not None and known[0].name != name:
+            self.remove_neighbor(neighbor=known[0])
+
+        # the new neighbor learns this switch fast
+        if known is None or known[0].name != name:
+            self.start_burst()
+
+        # the port may have been removed by a port down message
+        added = TopologyManager.get_device(name=switch).add_device_to_port(device=name, port=port)
+
+        if added:
+            Event.trigger("topology_change", src_device=switch, dst_device=name, port=port)
+
+        if added or known is None or known[0] != topology_packet:
+            Event.trigger("topology_to_controller", pkt=topology_packet)
+
+    def remove_neighbor(self, neighbor=None):
+        """
+        Remove an expired or replaced neighbor and report it to the global controller
+        :param neighbor: TopologyPacket of the neighbor
+        :return:
+        """
+        device = TopologyManager.get_device(Configuration.get('name'))
+
+        if device.get_device_to_port_mapping().get(neighbor.name) == neighbor.port:
+            device.remove_port(port=neighbor.port)
+            Event.trigger("topology_change")
+
+        Log.info("Neighbor", neighbor.name, "on port", neighbor.port, "removed")
+
+        expired = proto.connection_pb2.TopologyPacket()
+        expired.CopyFrom(neighbor)
+        expired.expired = True
+
+        Event.trigger("topology_to_controller", pkt=expired)
+
+    def expire_neighbors(self):
+        """
+        Remove the neighbors that have not been seen for expiry intervals
+        :return:
+        """
+        deadline = time.time() - Configuration.get('discovery_interval') * TopologyController.expiry
+
+        with self.lock:
+            expired = [self.adjacency.pop(port)[0] for port, (_, seen) in self.adjacency.items() if seen < deadline]
+
+        for neighbor in expired:
+            self.remove_neighbor(neighbor=neighbor)
+
+    def send_adjacency_digest(self):
+        """
+        Send the digest of the adjacency table to the global controller
+        :return:
+        """
+        with self.lock:
+            neighbors = [(port, neighbor.name) for port, (neighbor, _) in self.adjacency.items()
+                         if port not in self.down_ports]
+
+        digest = proto.connection_pb2.AdjacencyDigest(switch=Configuration.get('name'),
+                                                      digest=TopologyController.get_adjacency_digest(neighbors=neighbors),
+                                                      neighbors=len(neighbors))
+
+        Event.trigger("adjacency_digest_to_controller", digest=digest)
+
+    def resync(self, *args, **kwargs):
+        """
+        Send all neighbors again, requested by the global controller if its view differs
+        :return:
+        """
+        with self.lock:
+            neighbors = [neighbor for port, (neighbor, _) in self.adjacency.items() if port not in self.down_ports]
 
-        topology_packet = proto.connection_pb2.TopologyPacket(ip=pkt.ip, mac=pkt.mac, port=pkt.port, name=name, switch=Configuration.get('name'))
+        Log.info("Resync of", len(neighbors), "neighbors requested")
 
-        Event.trigger("topology_to_controller", pkt=topology_packet)
+        for neighbor in neighbors:
+            Event.trigger("topology_to_controller", pkt=neighbor)
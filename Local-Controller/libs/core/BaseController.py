@@ -6,31 +6,45 @@ import utils.p4runtime_lib.bmv2
 import utils.p4runtime_lib.helper
 from libs.core.Log import Log
 import grpc
-import pickle
+import hashlib
+from binascii import hexlify
+import proto.connection_pb2
+from p4.v1 import p4runtime_pb2
 from libs.core.Switch import Switch
 from utils.p4runtime_lib.switch import  ShutdownAllSwitchConnections, RemoveConnection
 from libs.core.Event import Event
 from libs.Configuration import Configuration
-from libs.TableEntryManager import TableEntry
+from libs.TableEntryManager import TableEntry, match_key
 import threading
 
 
 class BaseController(object):
 
+    # tables written by the global controller, tables missing in the p4 program are ignored
+    GLOBAL_TABLES = ["ingress.bier_c.bift",
+                     "ingress.ipv4_c.ipv4",
+                     "ingress.ipv4_c.encap_ipv4",
+                     "ingress.tunnel_c.decap_bier",
+                     "ingress.tunnel_c.decap_ipv4",
+                     "egress.tunnel_c.encap_ipv4"]
+
     def __init__(self, p4info_file_path=None, bmv2_path=None):
         self.__p4info_helper = utils.p4runtime_lib.helper.P4InfoHelper(p4info_file_path)
         self.__bmv2_file_path = bmv2_path
         self.__connection = None
 
+        # the running pipeline of the switch has been kept, entries of a previous run may exist
+        self.pipeline_kept = False
+
         """
-        This list is used to purge all current table entries when the
-        main controller reconnects to the local controller
+        This dict contains the entries written by the global controller, they are
+        reported to the main controller when it reconnects to the local controller
+        {(table name, match key): TableEntry message}
         """
-        self.entries = []
+        self.entries = {}
 
         Event.on('exit', self.shutdown)
         Event.on('add_entry', self.add_entry)
-        Event.on('global_connection', self.purge)  # purge all entries when a new global connection is established
 
     def get_connection(self):
         """
@@ -51,18 +65,47 @@ class BaseController(object):
         switch = utils.p4runtime_lib.bmv2.Bmv2SwitchConnection(name=name,
                                                                address=address,
                                                                device_id=device_id,
-                                                               proto_dump_file="logs/log.txt")
+                                                               proto_dump_file="logs/log.txt",
+                                                               packet_in_buffer=Configuration.get('packet_in_buffer'),
+                                                               packet_in_workers=Configuration.get('packet_in_workers'))
 
         return switch
 
+    def get_pipeline_cookie(self):
+        """
+        Returns a 64 bit hash of p4info and bmv2 json, which identifies the pipeline on the switch
+        :return: cookie
+        """
+        digest = hashlib.sha1(self.__p4info_helper.p4info.SerializeToString())
+
+        with open(self.__bmv2_file_path) as f:
+            digest.update(f.read())
+
+        return int(digest.hexdigest()[:16], 16)
+
     def set_forwarding_pipeline_config(self):
         """
         Set forwarding pipeline on the switch based on p4info file
+        The running pipeline and its entries are kept if its cookie matches, unless force_pipeline is set
         :return:
         """
+        cookie = self.get_pipeline_cookie()
+
+        try:
+            if not Configuration.get('force_pipeline') and self.__connection.GetForwardingPipelineCookie() == cookie:
+                self.pipeline_kept = True
+                Log.info("Forwarding pipeline unchanged, entries kept.")
+                Event.trigger("switch_arbitrated")
+                return
+        except grpc.RpcError as e:
+            # no pipeline set yet
+            pass
+
         try:
             self.__connection.SetForwardingPipelineConfig(p4info=self.__p4info_helper.p4info,
-                                                          bmv2_json_file_path=self.__bmv2_file_path.encode())
+                                                          bmv2_json_file_path=self.__bmv2_file_path.encode(),
+                                                          cookie=cookie)
+            self.pipeline_kept = False
             Event.trigger("switch_arbitrated")
         except Exception as e:
                 Log.error("Error in forwarding pipeline", e)
@@ -114,20 +157,52 @@ class BaseController(object):
         :return:
         """
 
-        try:
-            table_entry = self.__p4info_helper.buildTableEntry(
-                table_name=table_name,
-                match_fields=entry.match_fields,
-                priority=entry.priority)
+        return self.write_table_entries(updates=[(p4runtime_pb2.Update.DELETE, table_name, entry)])[0] is None
 
-            self.__connection.DeleteTableEntry(table_entry)
+    @staticmethod
+    def parse_value(value=None):
+        """
+        Converts a Value message back into an int or str
+        :param value: Value message
+        :return: int or str
+        """
+        if value.WhichOneof('value') == 'text':
+            return value.text.encode('utf-8')
 
-            Log.info("Remove entry:", table_name, entry.match_fields)
+        return int(hexlify(value.number), 16) if value.number else 0
 
-            return True
-        except Exception as e:
-            Log.error("Error in table delete", table_name, entry.match_fields, entry.priority, e)
-            return False
+    @staticmethod
+    def parse_table_entry(entry=None):
+        """
+        Converts a TableEntry message into a table name and TableEntry
+        Lpm matches are returned as (value, prefix length), ternary matches as (value, mask)
+        :param entry: TableEntry message
+        :return: (table name, TableEntry)
+        """
+        match_fields = {}
+
+        for match in entry.match:
+            match_type = match.WhichOneof('field_match_type')
+
+            if match_type == 'lpm':
+                value = (BaseController.parse_value(match.lpm.value), match.lpm.prefix_len)
+            elif match_type == 'ternary':
+                value = (BaseController.parse_value(match.ternary.value),
+                         BaseController.parse_value(match.ternary.mask))
+            else:
+                value = BaseController.parse_value(match.exact.value)
+
+            match_fields[match.name.encode('utf-8')] = value
+
+        action_params = dict((param.name.encode('utf-8'), BaseController.parse_value(param.value))
+                             for param in entry.params)
+
+        table_entry = TableEntry(match_fields=match_fields,
+                                 action_name=entry.action_name.encode('utf-8') or None,
+                                 action_params=action_params,
+                                 priority=entry.priority or None)
+
+        return entry.table_name.encode('utf-8'), table_entry
 
     def add_entry(self, entry=None):
         """
@@ -140,27 +215,115 @@ class BaseController(object):
         :return:
         """
 
-        e = pickle.loads(entry.table_entry)
+        table_name, e = BaseController.parse_table_entry(entry=entry)
 
         # a table entry is identified by match fields and priority
-        self.entries.append((entry.table_name.encode('utf-8'),
-                            TableEntry(match_fields=e.match_fields, priority=e.priority)))
+        self.entries[(table_name, match_key(e.match_fields))] = entry
 
-        return self.add_table_entry(table_name=entry.table_name.encode('utf-8'), entry=e)
+        return self.add_table_entry(table_name=table_name, entry=e)
 
     def remove_entry(self, entry=None):
         """
         Adds an table entry and locks write request to prevent threading problems
-        :param entry: TableEntry serialized as pickle string
+        :param entry: TableEntry message
         :return:
         """
 
-        e = pickle.loads(entry.table_entry)
+        table_name, e = BaseController.parse_table_entry(entry=entry)
 
         # a table entry is identified by match fields and priority
-        self.entries.remove((entry.table_name.encode('utf-8'), TableEntry(match_fields=e.match_fields, priority=e.priority)))
+        self.entries.pop((table_name, match_key(e.match_fields)), None)
+
+        return self.delete_table_entry(table_name=table_name, entry=e)
+
+    def write_entries(self, updates=None):
+        """
+        Applies an ordered batch of table entry updates, written in batched write requests
+        :param updates: list of TableEntryUpdate messages
+        :return: indices of the updates that failed
+        """
+        table_updates = []
+
+        for update in updates:
+            table_name, e = BaseController.parse_table_entry(entry=update.entry)
+            key = (table_name, match_key(e.match_fields))
+
+            if update.type == proto.connection_pb2.TableEntryUpdate.INSERT:
+                self.entries[key] = update.entry
+                update_type = p4runtime_pb2.Update.INSERT
+            elif update.type == proto.connection_pb2.TableEntryUpdate.DELETE:
+                self.entries.pop(key, None)
+                update_type = p4runtime_pb2.Update.DELETE
+            else:
+                self.entries[key] = update.entry
+                update_type = p4runtime_pb2.Update.MODIFY
 
-        return self.delete_table_entry(table_name=entry.table_name.encode('utf-8'), entry=e)
+            table_updates.append((update_type, table_name, e))
+
+        errors = self.write_table_entries(updates=table_updates)
+
+        return [i for i, error in enumerate(errors) if error is not None]
+
+    def write_table_entries(self, updates=None):
+        """
+        Writes table entry updates to the switch, the updates are batched into write requests
+        Inserts of entries that already exist are retried as modify if the pipeline has been kept
+        :param updates: list of (p4runtime update type, table name, TableEntry)
+        :return: list with the error of each update, None if it has been written
+        """
+        errors = [None] * len(updates)
+        table_entries = [None] * len(updates)
+        writer = self.__connection.writer
+
+        def set_error(i):
+            def callback(error):
+                errors[i] = error
+            return callback
+
+        for i, (update_type, table_name, entry) in enumerate(updates):
+            try:
+                if update_type == p4runtime_pb2.Update.DELETE:
+                    table_entries[i] = self.__p4info_helper.buildTableEntry(
+                        table_name=table_name,
+                        match_fields=entry.match_fields,
+                        priority=entry.priority)
+                else:
+                    table_entries[i] = self.__p4info_helper.buildTableEntry(
+                        table_name=table_name,
+                        match_fields=entry.match_fields,
+                        action_name=entry.action_name,
+                        action_params=entry.action_params,
+                        priority=entry.priority)
+            except Exception as e:
+                errors[i] = e
+                continue
+
+            writer.add(update_type, table_entries[i], callback=set_error(i))
+
+        writer.flush()
+
+        # the entries may still be on the switch if the pipeline has been kept
+        if self.pipeline_kept:
+            retry = [i for i, (update_type, _, _) in enumerate(updates)
+                     if update_type == p4runtime_pb2.Update.INSERT and errors[i] is not None and table_entries[i] is not None]
+
+            for i in retry:
+                writer.modify(table_entries[i], callback=set_error(i))
+
+            writer.flush()
+
+        for (update_type, table_name, entry), error in zip(updates, errors):
+            if update_type == p4runtime_pb2.Update.DELETE:
+                if error is None:
+                    Log.info("Remove entry:", table_name, entry.match_fields)
+                else:
+                    Log.error("Error in table delete", table_name, entry.match_fields, entry.priority, error)
+            elif error is None:
+                Log.info("Add entry:" if update_type == p4runtime_pb2.Update.INSERT else "Modify entry:", table_name, entry)
+            else:
+                Log.error(error, "for", table_name, entry.match_fields, entry.action_name, entry.action_params, entry.priority)
+
+        return errors
 
     def add_table_entry(self, table_name=None, entry=None):
         """
@@ -169,30 +332,109 @@ class BaseController(object):
         :param entry: Table entry
         :return:
         """
-        try:
-            table_entry = self.__p4info_helper.buildTableEntry(
-                table_name=table_name,
-                match_fields=entry.match_fields,
-                action_name=entry.action_name,
-                action_params=entry.action_params,
-                priority=entry.priority)
+        return self.write_table_entries(updates=[(p4runtime_pb2.Update.INSERT, table_name, entry)])[0] is None
 
-            self.__connection.WriteTableEntry(table_entry)
+    def modify_table_entry(self, table_name=None, entry=None):
+        """
+        Changes action and action params of the table entry with the same match fields
+        :param table_name: table name
+        :param entry: Table entry
+        :return:
+        """
+        return self.write_table_entries(updates=[(p4runtime_pb2.Update.MODIFY, table_name, entry)])[0] is None
 
-            Log.info("Add entry:", table_name, entry)
+    @staticmethod
+    def p4_entry_key(table_entry=None):
+        """
+        Canonical key of a P4Runtime table entry, leading zero bytes of values are ignored
+        :param table_entry: P4Runtime TableEntry
+        :return: (table id, match, priority)
+        """
+        match = []
 
-            return True
-        except Exception as e:
-            Log.error(e, "for", table_name, entry.match_fields, entry.action_name, entry.action_params, entry.priority)
-            return False
+        for field in table_entry.match:
+            match_type = field.WhichOneof('field_match_type')
+            value = getattr(field, match_type)
+
+            match.append((field.field_id, match_type,
+                          tuple((f.name, v.lstrip('\x00') if isinstance(v, str) else v) for f, v in value.ListFields())))
+
+        return table_entry.table_id, tuple(sorted(match)), table_entry.priority
+
+    @staticmethod
+    def p4_action_key(table_entry=None):
+        """
+        Canonical key of the action of a P4Runtime table entry
+        :param table_entry: P4Runtime TableEntry
+        :return: (action id, params)
+        """
+        action = table_entry.action.action
+
+        return action.action_id, tuple(sorted((param.param_id, param.value.lstrip('\x00')) for param in action.params))
+
+    def get_global_table_ids(self):
+        """
+        Returns the ids of the tables of the global controller that exist in the p4 program
+        :return: list of table ids
+        """
+        table_ids = []
+
+        for table_name in BaseController.GLOBAL_TABLES:
+            try:
+                table_ids.append(self.__p4info_helper.get_tables_id(table_name))
+            except AttributeError:
+                pass
+
+        return table_ids
 
-    def purge(self):
+    def reconcile(self):
         """
-        Delete all current table entries
+        Compares the entries on the switch with the entries written by the global controller
+        and repairs differences: missing entries are added, changed entries are modified and
+        unknown entries in the tables of the global controller are deleted
+        :return: list of TableEntry messages of the entries written by the global controller
         """
-        [self.delete_table_entry(table_name=e[0], entry=e[1]) for e in self.entries]
-        Log.info("Entries purged")
-        self.entries = []
+        # {p4 entry key: (table name, TableEntry, p4 action key)}
+        expected = {}
+
+        for (table_name, _), entry in self.entries.iteritems():
+            table_name, e = BaseController.parse_table_entry(entry=entry)
+            table_entry = self.__p4info_helper.buildTableEntry(table_name=table_name,
+                                                               match_fields=e.match_fields,
+                                                               action_name=e.action_name,
+                                                               action_params=e.action_params,
+                                                               priority=e.priority)
+
+            expected[BaseController.p4_entry_key(table_entry)] = (table_name, e, BaseController.p4_action_key(table_entry))
+
+        # modifies and inserts, written after the deletes
+        updates = []
+        deleted = 0
+
+        # all tables of the global controller are read, the entries of a previous run
+        # are unknown if the pipeline has been kept after a restart
+        for table_id in self.get_global_table_ids():
+            for response in self.__connection.ReadTableEntries(table_id=table_id):
+                for entity in response.entities:
+                    key = BaseController.p4_entry_key(entity.table_entry)
+                    item = expected.pop(key, None)
+
+                    if item is None:
+                        self.__connection.writer.delete(entity.table_entry)
+                        deleted += 1
+                    elif item[2] != BaseController.p4_action_key(entity.table_entry):
+                        updates.append((p4runtime_pb2.Update.MODIFY, item[0], item[1]))
+
+        # entries that are missing on the switch
+        for table_name, e, _ in expected.itervalues():
+            updates.append((p4runtime_pb2.Update.INSERT, table_name, e))
+
+        # flushes the deletes as well
+        self.write_table_entries(updates=updates)
+
+        Log.info("Entries reconciled,", deleted + len(updates), "repaired")
+
+        return self.entries.values()
 
     def shutdown(self):
         ShutdownAllSwitchConnections()
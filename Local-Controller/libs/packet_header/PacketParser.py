@@ -0,0 +1,113 @@
+"""
+This module parses and builds the packets exchanged with the switch without scapy
+
+Packet-ins are parsed directly from the raw payload with struct, only the headers
+the local controller needs are parsed: Ethernet, TopologyDiscovery, IPv4 and IGMP.
+The parse functions return lightweight records or None if the packet is too short.
+"""
+
+from collections import namedtuple
+import socket
+import struct
+
+TYPE_TOPOLOGY_DISCOVERY = 0xDD00
+TYPE_IPV4 = 0x0800
+PROTO_IGMP = 2
+
+ETHERNET_LEN = 14
+TOPOLOGY_DISCOVERY_LEN = 16
+IPV4_MIN_LEN = 20
+IGMP_LEN = 8
+
+Ethernet = namedtuple('Ethernet', ['dst', 'src', 'type', 'offset'])
+TopologyDiscovery = namedtuple('TopologyDiscovery', ['identifier', 'port', 'ip', 'mac', 'payload'])
+IPv4 = namedtuple('IPv4', ['src', 'dst', 'proto', 'offset'])
+IGMP = namedtuple('IGMP', ['type', 'gaddr'])
+
+ethernet_header = struct.Struct('!6s6sH')
+topology_header = struct.Struct('!IH4s6s')
+ipv4_header = struct.Struct('!B8xB2x4s4s')
+igmp_header = struct.Struct('!B3x4s')
+
+
+def decode_mac(data=None):
+    """
+    Converts 6 bytes into a mac address string
+    :param data: bytes
+    :return: str, e.g. 00:00:00:00:00:01
+    """
+    return ':'.join('%02x' % ord(b) for b in data)
+
+
+def parse_ethernet(data=None):
+    """
+    Parses the ethernet header
+    :param data: raw packet
+    :return: Ethernet, offset is the start of the payload
+    """
+    if len(data) < ETHERNET_LEN:
+        return None
+
+    dst, src, type_ = ethernet_header.unpack_from(data, 0)
+
+    return Ethernet(dst=decode_mac(dst), src=decode_mac(src), type=type_, offset=ETHERNET_LEN)
+
+
+def parse_topology_discovery(data=None, offset=ETHERNET_LEN):
+    """
+    Parses the topology discovery header
+    :param data: raw packet
+    :param offset: start of the header
+    :return: TopologyDiscovery, payload is the data after the header, e.g. 'host' for host packets
+    """
+    if len(data) < offset + TOPOLOGY_DISCOVERY_LEN:
+        return None
+
+    identifier, port, ip, mac = topology_header.unpack_from(data, offset)
+
+    return TopologyDiscovery(identifier=identifier, port=port, ip=socket.inet_ntoa(ip), mac=decode_mac(mac),
+                             payload=data[offset + TOPOLOGY_DISCOVERY_LEN:])
+
+
+def parse_ipv4(data=None, offset=ETHERNET_LEN):
+    """
+    Parses the ipv4 header
+    :param data: raw packet
+    :param offset: start of the header
+    :return: IPv4, offset is the start of the payload (after the options)
+    """
+    if len(data) < offset + IPV4_MIN_LEN:
+        return None
+
+    version_ihl, proto, src, dst = ipv4_header.unpack_from(data, offset)
+
+    return IPv4(src=socket.inet_ntoa(src), dst=socket.inet_ntoa(dst), proto=proto,
+                offset=offset + (version_ihl & 0x0F) * 4)
+
+
+def parse_igmp(data=None, offset=0):
+    """
+    Parses the igmp header
+    :param data: raw packet
+    :param offset: start of the header
+    :return: IGMP
+    """
+    if len(data) < offset + IGMP_LEN:
+        return None
+
+    type_, gaddr = igmp_header.unpack_from(data, offset)
+
+    return IGMP(type=type_, gaddr=socket.inet_ntoa(gaddr))
+
+
+def build_topology_packet(identifier=0, port=0, ip=None, mac=None):
+    """
+    Builds a broadcast topology discovery packet
+    :param identifier: identifier of the sender, e.g. bfr id
+    :param port: port
+    :param ip: ip of the sender
+    :param mac: mac of the sender
+    :return: raw packet
+    """
+    return ethernet_header.pack('\xff' * 6, '\x00' * 6, TYPE_TOPOLOGY_DISCOVERY) + \
+        topology_header.pack(identifier, port, socket.inet_aton(ip), mac.replace(':', '').decode('hex'))
@@ -19,11 +19,37 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='controller_connection',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x10\x63onnection.proto\x12\x15\x63ontroller_connection\"\x07\n\x05\x45mpty\"(\n\x0cHelloMessage\x12\n\n\x02ip\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\r\"C\n\nSwitchInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02ip\x18\x02 \x01(\t\x12\x0b\n\x03mac\x18\x03 \x01(\t\x12\x0e\n\x06\x62\x66r_id\x18\x04 \x01(\r\"\'\n\x06Status\x12\x0c\n\x04\x63ode\x18\x01 \x01(\r\x12\x0f\n\x07message\x18\x02 \x01(\t\"5\n\nTableEntry\x12\x12\n\ntable_name\x18\x01 \x01(\t\x12\x13\n\x0btable_entry\x18\x02 \x01(\t\"O\n\x0bGroupPacket\x12\x0c\n\x04type\x18\x01 \x01(\r\x12\x12\n\nmc_address\x18\x02 \x01(\t\x12\x0e\n\x06src_ip\x18\x03 \x01(\t\x12\x0e\n\x06switch\x18\x04 \x01(\t\"U\n\x0eTopologyPacket\x12\n\n\x02ip\x18\x01 \x01(\t\x12\x0b\n\x03mac\x18\x02 \x01(\t\x12\x0c\n\x04port\x18\x03 \x01(\r\x12\x0c\n\x04name\x18\x04 \x01(\t\x12\x0e\n\x06switch\x18\x05 \x01(\t\"8\n\x08PortInfo\x12\x0e\n\x06switch\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\r\x12\x0e\n\x06status\x18\x03 \x01(\x08\x32\xfd\x01\n\x0bLocalServer\x12L\n\x08\x41\x64\x64\x45ntry\x12!.controller_connection.TableEntry\x1a\x1d.controller_connection.Status\x12O\n\x0bRemoveEntry\x12!.controller_connection.TableEntry\x1a\x1d.controller_connection.Status\x12O\n\x05Hello\x12#.controller_connection.HelloMessage\x1a!.controller_connection.SwitchInfo2\xd9\x02\n\x0cGlobalServer\x12Q\n\x0cGroupMessage\x12\".controller_connection.GroupPacket\x1a\x1d.controller_connection.Status\x12W\n\x0fTopologyMessage\x12%.controller_connection.TopologyPacket\x1a\x1d.controller_connection.Status\x12M\n\x0bPortMessage\x12\x1f.controller_connection.PortInfo\x1a\x1d.controller_connection.Status\x12N\n\x0f\x43heckConnection\x12\x1c.controller_connection.Empty\x1a\x1d.controller_connection.Statusb\x06proto3')
+  serialized_pb=_b('\n\x10\x63onnection.proto\x12\x15\x63ontroller_connection\"\x07\n\x05\x45mpty\"(\n\x0cHelloMessage\x12\n\n\x02ip\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\r\"C\n\nSwitchInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02ip\x18\x02 \x01(\t\x12\x0b\n\x03mac\x18\x03 \x01(\t\x12\x0e\n\x06\x62\x66r_id\x18\x04 \x01(\r\"\'\n\x06Status\x12\x0c\n\x04\x63ode\x18\x01 \x01(\r\x12\x0f\n\x07message\x18\x02 \x01(\t\"2\n\x05Value\x12\x10\n\x06number\x18\x01 \x01(\x0cH\x00\x12\x0e\n\x04text\x18\x02 \x01(\tH\x00\x42\x07\n\x05value\"\xbe\x03\n\nFieldMatch\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x38\n\x05\x65xact\x18\x02 \x01(\x0b\x32\'.controller_connection.FieldMatch.ExactH\x00\x12\x34\n\x03lpm\x18\x03 \x01(\x0b\x32%.controller_connection.FieldMatch.LPMH\x00\x12<\n\x07ternary\x18\x04 \x01(\x0b\x32).controller_connection.FieldMatch.TernaryH\x00\x1a\x34\n\x05\x45xact\x12+\n\x05value\x18\x01 \x01(\x0b\x32\x1c.controller_connection.Value\x1a\x46\n\x03LPM\x12+\n\x05value\x18\x01 \x01(\x0b\x32\x1c.controller_connection.Value\x12\x12\n\nprefix_len\x18\x02 \x01(\r\x1a\x62\n\x07Ternary\x12+\n\x05value\x18\x01 \x01(\x0b\x32\x1c.controller_connection.Value\x12*\n\x04mask\x18\x02 \x01(\x0b\x32\x1c.controller_connection.ValueB\x12\n\x10\x66ield_match_type\"H\n\x0b\x41\x63tionParam\x12\x0c\n\x04name\x18\x01 \x01(\t\x12+\n\x05value\x18\x02 \x01(\x0b\x32\x1c.controller_connection.Value\"\xb3\x01\n\nTableEntry\x12\x12\n\ntable_name\x18\x01 \x01(\t\x12\x30\n\x05match\x18\x03 \x03(\x0b\x32!.controller_connection.FieldMatch\x12\x13\n\x0b\x61\x63tion_name\x18\x04 \x01(\t\x12\x32\n\x06params\x18\x05 \x03(\x0b\x32\".controller_connection.ActionParam\x12\x10\n\x08priority\x18\x06 \x01(\x05J\x04\x08\x02\x10\x03\"\xac\x01\n\x10TableEntryUpdate\x12:\n\x04type\x18\x01 \x01(\x0e\x32,.controller_connection.TableEntryUpdate.Type\x12\x30\n\x05\x65ntry\x18\x02 \x01(\x0b\x32!.controller_connection.TableEntry\"*\n\x04Type\x12\n\n\x06INSERT\x10\x00\x12\n\n\x06MODIFY\x10\x01\x12\n\n\x06\x44\x45LETE\x10\x02\"K\n\x0fTableEntryBatch\x12\x38\n\x07updates\x18\x01 \x03(\x0b\x32\'.controller_connection.TableEntryUpdate\"D\n\x0eTableEntryList\x12\x32\n\x07\x65ntries\x18\x01 \x03(\x0b\x32!.controller_connection.TableEntry\"O\n\x0bGroupPacket\x12\x0c\n\x04type\x18\x01 \x01(\r\x12\x12\n\nmc_address\x18\x02 \x01(\t\x12\x0e\n\x06src_ip\x18\x03 \x01(\t\x12\x0e\n\x06switch\x18\x04 \x01(\t\"f\n\x0eTopologyPacket\x12\n\n\x02ip\x18\x01 \x01(\t\x12\x0b\n\x03mac\x18\x02 \x01(\t\x12\x0c\n\x04port\x18\x03 \x01(\r\x12\x0c\n\x04name\x18\x04 \x01(\t\x12\x0e\n\x06switch\x18\x05 \x01(\t\x12\x0f\n\x07\x65xpired\x18\x06 \x01(\x08\"D\n\x0f\x41\x64jacencyDigest\x12\x0e\n\x06switch\x18\x01 \x01(\t\x12\x0e\n\x06\x64igest\x18\x02 \x01(\x0c\x12\x11\n\tneighbors\x18\x03 \x01(\r\"8\n\x08PortInfo\x12\x0e\n\x06switch\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\r\x12\x0e\n\x06status\x18\x03 \x01(\x08\"\x8b\x02\n\x0e\x43ontrolMessage\x12\x10\n\x08sequence\x18\x01 \x01(\x04\x12\x33\n\x05group\x18\x02 \x01(\x0b\x32\".controller_connection.GroupPacketH\x00\x12\x39\n\x08topology\x18\x03 \x01(\x0b\x32%.controller_connection.TopologyPacketH\x00\x12/\n\x04port\x18\x04 \x01(\x0b\x32\x1f.controller_connection.PortInfoH\x00\x12;\n\tadjacency\x18\x05 \x01(\x0b\x32&.controller_connection.AdjacencyDigestH\x00\x42\t\n\x07message\"o\n\x13\x43ontrolMessageBatch\x12\x0e\n\x06switch\x18\x01 \x01(\t\x12\x0f\n\x07session\x18\x02 \x01(\x04\x12\x37\n\x08messages\x18\x03 \x03(\x0b\x32%.controller_connection.ControlMessage\".\n\nControlAck\x12\x10\n\x08sequence\x18\x01 \x01(\x04\x12\x0e\n\x06resync\x18\x02 \x01(\x08\x32\xa8\x03\n\x0bLocalServer\x12L\n\x08\x41\x64\x64\x45ntry\x12!.controller_connection.TableEntry\x1a\x1d.controller_connection.Status\x12O\n\x0bRemoveEntry\x12!.controller_connection.TableEntry\x1a\x1d.controller_connection.Status\x12U\n\x0cWriteEntries\x12&.controller_connection.TableEntryBatch\x1a\x1d.controller_connection.Status\x12R\n\x0bReadEntries\x12\x1c.controller_connection.Empty\x1a%.controller_connection.TableEntryList\x12O\n\x05Hello\x12#.controller_connection.HelloMessage\x1a!.controller_connection.SwitchInfo2\xbe\x03\n\x0cGlobalServer\x12\x63\n\x0e\x43ontrolChannel\x12*.controller_connection.ControlMessageBatch\x1a!.controller_connection.ControlAck(\x01\x30\x01\x12Q\n\x0cGroupMessage\x12\".controller_connection.GroupPacket\x1a\x1d.controller_connection.Status\x12W\n\x0fTopologyMessage\x12%.controller_connection.TopologyPacket\x1a\x1d.controller_connection.Status\x12M\n\x0bPortMessage\x12\x1f.controller_connection.PortInfo\x1a\x1d.controller_connection.Status\x12N\n\x0f\x43heckConnection\x12\x1c.controller_connection.Empty\x1a\x1d.controller_connection.Statusb\x06proto3')
 )
 
 
 
+_TABLEENTRYUPDATE_TYPE = _descriptor.EnumDescriptor(
+  name='Type',
+  full_name='controller_connection.TableEntryUpdate.Type',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='INSERT', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='MODIFY', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='DELETE', index=2, number=2,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1092,
+  serialized_end=1134,
+)
+_sym_db.RegisterEnumDescriptor(_TABLEENTRYUPDATE_TYPE)
+
 
 _EMPTY = _descriptor.Descriptor(
   name='Empty',
@@ -177,6 +203,244 @@ _STATUS = _descriptor.Descriptor(
 )
 
 
+_VALUE = _descriptor.Descriptor(
+  name='Value',
+  full_name='controller_connection.Value',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='number', full_name='controller_connection.Value.number', index=0,
+      number=1, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='text', full_name='controller_connection.Value.text', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='value', full_name='controller_connection.Value.value',
+      index=0, containing_type=None, fields=[]),
+  ],
+  serialized_start=204,
+  serialized_end=254,
+)
+
+
+_FIELDMATCH_EXACT = _descriptor.Descriptor(
+  name='Exact',
+  full_name='controller_connection.FieldMatch.Exact',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='value', full_name='controller_connection.FieldMatch.Exact.value', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=459,
+  serialized_end=511,
+)
+
+_FIELDMATCH_LPM = _descriptor.Descriptor(
+  name='LPM',
+  full_name='controller_connection.FieldMatch.LPM',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='value', full_name='controller_connection.FieldMatch.LPM.value', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='prefix_len', full_name='controller_connection.FieldMatch.LPM.prefix_len', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=513,
+  serialized_end=583,
+)
+
+_FIELDMATCH_TERNARY = _descriptor.Descriptor(
+  name='Ternary',
+  full_name='controller_connection.FieldMatch.Ternary',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='value', full_name='controller_connection.FieldMatch.Ternary.value', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='mask', full_name='controller_connection.FieldMatch.Ternary.mask', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=585,
+  serialized_end=683,
+)
+
+_FIELDMATCH = _descriptor.Descriptor(
+  name='FieldMatch',
+  full_name='controller_connection.FieldMatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='controller_connection.FieldMatch.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='exact', full_name='controller_connection.FieldMatch.exact', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='lpm', full_name='controller_connection.FieldMatch.lpm', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='ternary', full_name='controller_connection.FieldMatch.ternary', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[_FIELDMATCH_EXACT, _FIELDMATCH_LPM, _FIELDMATCH_TERNARY, ],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='field_match_type', full_name='controller_connection.FieldMatch.field_match_type',
+      index=0, containing_type=None, fields=[]),
+  ],
+  serialized_start=257,
+  serialized_end=703,
+)
+
+
+_ACTIONPARAM = _descriptor.Descriptor(
+  name='ActionParam',
+  full_name='controller_connection.ActionParam',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='controller_connection.ActionParam.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='value', full_name='controller_connection.ActionParam.value', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=705,
+  serialized_end=777,
+)
+
+
 _TABLEENTRY = _descriptor.Descriptor(
   name='TableEntry',
   full_name='controller_connection.TableEntry',
@@ -192,12 +456,33 @@ _TABLEENTRY = _descriptor.Descriptor(
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='table_entry', full_name='controller_connection.TableEntry.table_entry', index=1,
-      number=2, type=9, cpp_type=9, label=1,
+      name='match', full_name='controller_connection.TableEntry.match', index=1,
+      number=3, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='action_name', full_name='controller_connection.TableEntry.action_name', index=2,
+      number=4, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='params', full_name='controller_connection.TableEntry.params', index=3,
+      number=5, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='priority', full_name='controller_connection.TableEntry.priority', index=4,
+      number=6, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -210,8 +495,109 @@ _TABLEENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=204,
-  serialized_end=257,
+  serialized_start=780,
+  serialized_end=959,
+)
+
+
+_TABLEENTRYUPDATE = _descriptor.Descriptor(
+  name='TableEntryUpdate',
+  full_name='controller_connection.TableEntryUpdate',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='type', full_name='controller_connection.TableEntryUpdate.type', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='entry', full_name='controller_connection.TableEntryUpdate.entry', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _TABLEENTRYUPDATE_TYPE,
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=962,
+  serialized_end=1134,
+)
+
+
+_TABLEENTRYBATCH = _descriptor.Descriptor(
+  name='TableEntryBatch',
+  full_name='controller_connection.TableEntryBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='updates', full_name='controller_connection.TableEntryBatch.updates', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1136,
+  serialized_end=1211,
+)
+
+
+_TABLEENTRYLIST = _descriptor.Descriptor(
+  name='TableEntryList',
+  full_name='controller_connection.TableEntryList',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='entries', full_name='controller_connection.TableEntryList.entries', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1213,
+  serialized_end=1281,
 )
 
 
@@ -262,8 +648,8 @@ _GROUPPACKET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=259,
-  serialized_end=338,
+  serialized_start=1283,
+  serialized_end=1362,
 )
 
 
@@ -309,6 +695,13 @@ _TOPOLOGYPACKET = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='expired', full_name='controller_connection.TopologyPacket.expired', index=5,
+      number=6, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -321,8 +714,53 @@ _TOPOLOGYPACKET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=340,
-  serialized_end=425,
+  serialized_start=1364,
+  serialized_end=1466,
+)
+
+
+_ADJACENCYDIGEST = _descriptor.Descriptor(
+  name='AdjacencyDigest',
+  full_name='controller_connection.AdjacencyDigest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='switch', full_name='controller_connection.AdjacencyDigest.switch', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='digest', full_name='controller_connection.AdjacencyDigest.digest', index=1,
+      number=2, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='neighbors', full_name='controller_connection.AdjacencyDigest.neighbors', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1468,
+  serialized_end=1536,
 )
 
 
@@ -366,18 +804,223 @@ _PORTINFO = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=427,
-  serialized_end=483,
+  serialized_start=1538,
+  serialized_end=1594,
+)
+
+
+_CONTROLMESSAGE = _descriptor.Descriptor(
+  name='ControlMessage',
+  full_name='controller_connection.ControlMessage',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='sequence', full_name='controller_connection.ControlMessage.sequence', index=0,
+      number=1, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='group', full_name='controller_connection.ControlMessage.group', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='topology', full_name='controller_connection.ControlMessage.topology', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='port', full_name='controller_connection.ControlMessage.port', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='adjacency', full_name='controller_connection.ControlMessage.adjacency', index=4,
+      number=5, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='message', full_name='controller_connection.ControlMessage.message',
+      index=0, containing_type=None, fields=[]),
+  ],
+  serialized_start=1597,
+  serialized_end=1864,
+)
+
+
+_CONTROLMESSAGEBATCH = _descriptor.Descriptor(
+  name='ControlMessageBatch',
+  full_name='controller_connection.ControlMessageBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='switch', full_name='controller_connection.ControlMessageBatch.switch', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='session', full_name='controller_connection.ControlMessageBatch.session', index=1,
+      number=2, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='messages', full_name='controller_connection.ControlMessageBatch.messages', index=2,
+      number=3, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1866,
+  serialized_end=1977,
+)
+
+
+_CONTROLACK = _descriptor.Descriptor(
+  name='ControlAck',
+  full_name='controller_connection.ControlAck',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='sequence', full_name='controller_connection.ControlAck.sequence', index=0,
+      number=1, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='resync', full_name='controller_connection.ControlAck.resync', index=1,
+      number=2, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1979,
+  serialized_end=2025,
 )
 
+_VALUE.oneofs_by_name['value'].fields.append(
+  _VALUE.fields_by_name['number'])
+_VALUE.fields_by_name['number'].containing_oneof = _VALUE.oneofs_by_name['value']
+_VALUE.oneofs_by_name['value'].fields.append(
+  _VALUE.fields_by_name['text'])
+_VALUE.fields_by_name['text'].containing_oneof = _VALUE.oneofs_by_name['value']
+_FIELDMATCH_EXACT.fields_by_name['value'].message_type = _VALUE
+_FIELDMATCH_EXACT.containing_type = _FIELDMATCH
+_FIELDMATCH_LPM.fields_by_name['value'].message_type = _VALUE
+_FIELDMATCH_LPM.containing_type = _FIELDMATCH
+_FIELDMATCH_TERNARY.fields_by_name['value'].message_type = _VALUE
+_FIELDMATCH_TERNARY.fields_by_name['mask'].message_type = _VALUE
+_FIELDMATCH_TERNARY.containing_type = _FIELDMATCH
+_FIELDMATCH.fields_by_name['exact'].message_type = _FIELDMATCH_EXACT
+_FIELDMATCH.fields_by_name['lpm'].message_type = _FIELDMATCH_LPM
+_FIELDMATCH.fields_by_name['ternary'].message_type = _FIELDMATCH_TERNARY
+_FIELDMATCH.oneofs_by_name['field_match_type'].fields.append(
+  _FIELDMATCH.fields_by_name['exact'])
+_FIELDMATCH.fields_by_name['exact'].containing_oneof = _FIELDMATCH.oneofs_by_name['field_match_type']
+_FIELDMATCH.oneofs_by_name['field_match_type'].fields.append(
+  _FIELDMATCH.fields_by_name['lpm'])
+_FIELDMATCH.fields_by_name['lpm'].containing_oneof = _FIELDMATCH.oneofs_by_name['field_match_type']
+_FIELDMATCH.oneofs_by_name['field_match_type'].fields.append(
+  _FIELDMATCH.fields_by_name['ternary'])
+_FIELDMATCH.fields_by_name['ternary'].containing_oneof = _FIELDMATCH.oneofs_by_name['field_match_type']
+_ACTIONPARAM.fields_by_name['value'].message_type = _VALUE
+_TABLEENTRY.fields_by_name['match'].message_type = _FIELDMATCH
+_TABLEENTRY.fields_by_name['params'].message_type = _ACTIONPARAM
+_TABLEENTRYUPDATE.fields_by_name['type'].enum_type = _TABLEENTRYUPDATE_TYPE
+_TABLEENTRYUPDATE.fields_by_name['entry'].message_type = _TABLEENTRY
+_TABLEENTRYUPDATE_TYPE.containing_type = _TABLEENTRYUPDATE
+_TABLEENTRYBATCH.fields_by_name['updates'].message_type = _TABLEENTRYUPDATE
+_TABLEENTRYLIST.fields_by_name['entries'].message_type = _TABLEENTRY
+_CONTROLMESSAGE.fields_by_name['group'].message_type = _GROUPPACKET
+_CONTROLMESSAGE.fields_by_name['topology'].message_type = _TOPOLOGYPACKET
+_CONTROLMESSAGE.fields_by_name['port'].message_type = _PORTINFO
+_CONTROLMESSAGE.fields_by_name['adjacency'].message_type = _ADJACENCYDIGEST
+_CONTROLMESSAGE.oneofs_by_name['message'].fields.append(
+  _CONTROLMESSAGE.fields_by_name['group'])
+_CONTROLMESSAGE.fields_by_name['group'].containing_oneof = _CONTROLMESSAGE.oneofs_by_name['message']
+_CONTROLMESSAGE.oneofs_by_name['message'].fields.append(
+  _CONTROLMESSAGE.fields_by_name['topology'])
+_CONTROLMESSAGE.fields_by_name['topology'].containing_oneof = _CONTROLMESSAGE.oneofs_by_name['message']
+_CONTROLMESSAGE.oneofs_by_name['message'].fields.append(
+  _CONTROLMESSAGE.fields_by_name['port'])
+_CONTROLMESSAGE.fields_by_name['port'].containing_oneof = _CONTROLMESSAGE.oneofs_by_name['message']
+_CONTROLMESSAGE.oneofs_by_name['message'].fields.append(
+  _CONTROLMESSAGE.fields_by_name['adjacency'])
+_CONTROLMESSAGE.fields_by_name['adjacency'].containing_oneof = _CONTROLMESSAGE.oneofs_by_name['message']
+_CONTROLMESSAGEBATCH.fields_by_name['messages'].message_type = _CONTROLMESSAGE
 DESCRIPTOR.message_types_by_name['Empty'] = _EMPTY
 DESCRIPTOR.message_types_by_name['HelloMessage'] = _HELLOMESSAGE
 DESCRIPTOR.message_types_by_name['SwitchInfo'] = _SWITCHINFO
 DESCRIPTOR.message_types_by_name['Status'] = _STATUS
+DESCRIPTOR.message_types_by_name['Value'] = _VALUE
+DESCRIPTOR.message_types_by_name['FieldMatch'] = _FIELDMATCH
+DESCRIPTOR.message_types_by_name['ActionParam'] = _ACTIONPARAM
 DESCRIPTOR.message_types_by_name['TableEntry'] = _TABLEENTRY
+DESCRIPTOR.message_types_by_name['TableEntryUpdate'] = _TABLEENTRYUPDATE
+DESCRIPTOR.message_types_by_name['TableEntryBatch'] = _TABLEENTRYBATCH
+DESCRIPTOR.message_types_by_name['TableEntryList'] = _TABLEENTRYLIST
 DESCRIPTOR.message_types_by_name['GroupPacket'] = _GROUPPACKET
 DESCRIPTOR.message_types_by_name['TopologyPacket'] = _TOPOLOGYPACKET
+DESCRIPTOR.message_types_by_name['AdjacencyDigest'] = _ADJACENCYDIGEST
 DESCRIPTOR.message_types_by_name['PortInfo'] = _PORTINFO
+DESCRIPTOR.message_types_by_name['ControlMessage'] = _CONTROLMESSAGE
+DESCRIPTOR.message_types_by_name['ControlMessageBatch'] = _CONTROLMESSAGEBATCH
+DESCRIPTOR.message_types_by_name['ControlAck'] = _CONTROLACK
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 Empty = _reflection.GeneratedProtocolMessageType('Empty', (_message.Message,), dict(
@@ -408,6 +1051,51 @@ Status = _reflection.GeneratedProtocolMessageType('Status', (_message.Message,),
   ))
 _sym_db.RegisterMessage(Status)
 
+Value = _reflection.GeneratedProtocolMessageType('Value', (_message.Message,), dict(
+  DESCRIPTOR = _VALUE,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.Value)
+  ))
+_sym_db.RegisterMessage(Value)
+
+FieldMatch = _reflection.GeneratedProtocolMessageType('FieldMatch', (_message.Message,), dict(
+
+  Exact = _reflection.GeneratedProtocolMessageType('Exact', (_message.Message,), dict(
+    DESCRIPTOR = _FIELDMATCH_EXACT,
+    __module__ = 'connection_pb2'
+    # @@protoc_insertion_point(class_scope:controller_connection.FieldMatch.Exact)
+    ))
+  ,
+
+  LPM = _reflection.GeneratedProtocolMessageType('LPM', (_message.Message,), dict(
+    DESCRIPTOR = _FIELDMATCH_LPM,
+    __module__ = 'connection_pb2'
+    # @@protoc_insertion_point(class_scope:controller_connection.FieldMatch.LPM)
+    ))
+  ,
+
+  Ternary = _reflection.GeneratedProtocolMessageType('Ternary', (_message.Message,), dict(
+    DESCRIPTOR = _FIELDMATCH_TERNARY,
+    __module__ = 'connection_pb2'
+    # @@protoc_insertion_point(class_scope:controller_connection.FieldMatch.Ternary)
+    ))
+  ,
+  DESCRIPTOR = _FIELDMATCH,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.FieldMatch)
+  ))
+_sym_db.RegisterMessage(FieldMatch)
+_sym_db.RegisterMessage(FieldMatch.Exact)
+_sym_db.RegisterMessage(FieldMatch.LPM)
+_sym_db.RegisterMessage(FieldMatch.Ternary)
+
+ActionParam = _reflection.GeneratedProtocolMessageType('ActionParam', (_message.Message,), dict(
+  DESCRIPTOR = _ACTIONPARAM,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.ActionParam)
+  ))
+_sym_db.RegisterMessage(ActionParam)
+
 TableEntry = _reflection.GeneratedProtocolMessageType('TableEntry', (_message.Message,), dict(
   DESCRIPTOR = _TABLEENTRY,
   __module__ = 'connection_pb2'
@@ -415,6 +1103,27 @@ TableEntry = _reflection.GeneratedProtocolMessageType('TableEntry', (_message.Me
   ))
 _sym_db.RegisterMessage(TableEntry)
 
+TableEntryUpdate = _reflection.GeneratedProtocolMessageType('TableEntryUpdate', (_message.Message,), dict(
+  DESCRIPTOR = _TABLEENTRYUPDATE,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.TableEntryUpdate)
+  ))
+_sym_db.RegisterMessage(TableEntryUpdate)
+
+TableEntryBatch = _reflection.GeneratedProtocolMessageType('TableEntryBatch', (_message.Message,), dict(
+  DESCRIPTOR = _TABLEENTRYBATCH,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.TableEntryBatch)
+  ))
+_sym_db.RegisterMessage(TableEntryBatch)
+
+TableEntryList = _reflection.GeneratedProtocolMessageType('TableEntryList', (_message.Message,), dict(
+  DESCRIPTOR = _TABLEENTRYLIST,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.TableEntryList)
+  ))
+_sym_db.RegisterMessage(TableEntryList)
+
 GroupPacket = _reflection.GeneratedProtocolMessageType('GroupPacket', (_message.Message,), dict(
   DESCRIPTOR = _GROUPPACKET,
   __module__ = 'connection_pb2'
@@ -429,6 +1138,13 @@ TopologyPacket = _reflection.GeneratedProtocolMessageType('TopologyPacket', (_me
   ))
 _sym_db.RegisterMessage(TopologyPacket)
 
+AdjacencyDigest = _reflection.GeneratedProtocolMessageType('AdjacencyDigest', (_message.Message,), dict(
+  DESCRIPTOR = _ADJACENCYDIGEST,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.AdjacencyDigest)
+  ))
+_sym_db.RegisterMessage(AdjacencyDigest)
+
 PortInfo = _reflection.GeneratedProtocolMessageType('PortInfo', (_message.Message,), dict(
   DESCRIPTOR = _PORTINFO,
   __module__ = 'connection_pb2'
@@ -436,6 +1152,27 @@ PortInfo = _reflection.GeneratedProtocolMessageType('PortInfo', (_message.Messag
   ))
 _sym_db.RegisterMessage(PortInfo)
 
+ControlMessage = _reflection.GeneratedProtocolMessageType('ControlMessage', (_message.Message,), dict(
+  DESCRIPTOR = _CONTROLMESSAGE,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.ControlMessage)
+  ))
+_sym_db.RegisterMessage(ControlMessage)
+
+ControlMessageBatch = _reflection.GeneratedProtocolMessageType('ControlMessageBatch', (_message.Message,), dict(
+  DESCRIPTOR = _CONTROLMESSAGEBATCH,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.ControlMessageBatch)
+  ))
+_sym_db.RegisterMessage(ControlMessageBatch)
+
+ControlAck = _reflection.GeneratedProtocolMessageType('ControlAck', (_message.Message,), dict(
+  DESCRIPTOR = _CONTROLACK,
+  __module__ = 'connection_pb2'
+  # @@protoc_insertion_point(class_scope:controller_connection.ControlAck)
+  ))
+_sym_db.RegisterMessage(ControlAck)
+
 
 
 _LOCALSERVER = _descriptor.ServiceDescriptor(
@@ -444,8 +1181,8 @@ _LOCALSERVER = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=486,
-  serialized_end=739,
+  serialized_start=2028,
+  serialized_end=2452,
   methods=[
   _descriptor.MethodDescriptor(
     name='AddEntry',
@@ -465,10 +1202,28 @@ _LOCALSERVER = _descriptor.ServiceDescriptor(
     output_type=_STATUS,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='WriteEntries',
+    full_name='controller_connection.LocalServer.WriteEntries',
+    index=2,
+    containing_service=None,
+    input_type=_TABLEENTRYBATCH,
+    output_type=_STATUS,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='ReadEntries',
+    full_name='controller_connection.LocalServer.ReadEntries',
+    index=3,
+    containing_service=None,
+    input_type=_EMPTY,
+    output_type=_TABLEENTRYLIST,
+    serialized_options=None,
+  ),
   _descriptor.MethodDescriptor(
     name='Hello',
     full_name='controller_connection.LocalServer.Hello',
-    index=2,
+    index=4,
     containing_service=None,
     input_type=_HELLOMESSAGE,
     output_type=_SWITCHINFO,
@@ -486,13 +1241,22 @@ _GLOBALSERVER = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=1,
   serialized_options=None,
-  serialized_start=742,
-  serialized_end=1087,
+  serialized_start=2455,
+  serialized_end=2901,
   methods=[
+  _descriptor.MethodDescriptor(
+    name='ControlChannel',
+    full_name='controller_connection.GlobalServer.ControlChannel',
+    index=0,
+    containing_service=None,
+    input_type=_CONTROLMESSAGEBATCH,
+    output_type=_CONTROLACK,
+    serialized_options=None,
+  ),
   _descriptor.MethodDescriptor(
     name='GroupMessage',
     full_name='controller_connection.GlobalServer.GroupMessage',
-    index=0,
+    index=1,
     containing_service=None,
     input_type=_GROUPPACKET,
     output_type=_STATUS,
@@ -501,7 +1265,7 @@ _GLOBALSERVER = _descriptor.ServiceDescriptor(
   _descriptor.MethodDescriptor(
     name='TopologyMessage',
     full_name='controller_connection.GlobalServer.TopologyMessage',
-    index=1,
+    index=2,
     containing_service=None,
     input_type=_TOPOLOGYPACKET,
     output_type=_STATUS,
@@ -510,7 +1274,7 @@ _GLOBALSERVER = _descriptor.ServiceDescriptor(
   _descriptor.MethodDescriptor(
     name='PortMessage',
     full_name='controller_connection.GlobalServer.PortMessage',
-    index=2,
+    index=3,
     containing_service=None,
     input_type=_PORTINFO,
     output_type=_STATUS,
@@ -519,7 +1283,7 @@ _GLOBALSERVER = _descriptor.ServiceDescriptor(
   _descriptor.MethodDescriptor(
     name='CheckConnection',
     full_name='controller_connection.GlobalServer.CheckConnection',
-    index=3,
+    index=4,
     containing_service=None,
     input_type=_EMPTY,
     output_type=_STATUS,
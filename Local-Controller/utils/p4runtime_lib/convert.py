@@ -14,6 +14,7 @@
 #
 import re
 import socket
+import struct
 
 import math
 
@@ -78,6 +79,29 @@ def encode(x, bitwidth):
     assert(len(encoded_bytes) == byte_len)
     return encoded_bytes
 
+def encoder(bitwidth):
+    '''Returns a function that encodes values of the given bitwidth like `encode`,
+    with fast paths for numbers up to 64 bits, IPv4 and MAC address strings'''
+    byte_len = bitwidthToBytes(bitwidth)
+
+    def encode_value(x):
+        if type(x) == int or type(x) == long:
+            if byte_len <= 8:
+                if x < 0 or x >> bitwidth:
+                    raise Exception("Number, %d, does not fit in %d bits" % (x, bitwidth))
+                return struct.pack('>Q', x)[8 - byte_len:]
+        elif type(x) == str:
+            if len(x) == byte_len:
+                # already encoded
+                return x
+            if byte_len == 4 and x.count('.') == 3:
+                return socket.inet_aton(x)
+            if byte_len == 6 and len(x) == 17:
+                return x.replace(':', '').decode('hex')
+        return encode(x, bitwidth)
+
+    return encode_value
+
 if __name__ == '__main__':
     # TODO These tests should be moved out of main eventually
     mac = "aa:bb:cc:dd:ee:ff"
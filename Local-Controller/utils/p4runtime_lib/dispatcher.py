@@ -0,0 +1,126 @@
+"""
+Dispatches the messages of the P4Runtime stream channel of a switch connection
+
+The receive loop of the stream must never block, otherwise the stream stalls.
+Messages are dispatched by their type: inline handlers (e.g. arbitration) are
+called on the receive thread and must not block, messages of the other handlers
+(e.g. packet-ins) are put into a bounded ring buffer that is drained by worker threads.
+If the buffer is full, the oldest message is overwritten.
+"""
+
+from collections import deque
+import threading
+from libs.core.Log import Log
+
+
+class StreamDispatcher(object):
+
+    def __init__(self, name=None, capacity=1024, workers=1):
+        """
+        :param name: name of the switch, used for logging
+        :param capacity: maximal number of buffered messages
+        :param workers: number of worker threads, with more than one worker handlers are called concurrently
+        """
+        self.name = name
+        self.capacity = capacity
+
+        # [(handler, message)]
+        self.buffer = deque()
+        self.condition = threading.Condition()
+        self.running = True
+
+        # {message type: (handler, inline)}
+        self.handlers = {}
+
+        # received messages, messages without handler, messages overwritten in the full buffer
+        self.received = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.reported_overflows = 0
+
+        self.workers = [threading.Thread(target=self.work) for _ in range(max(1, workers))]
+
+        for worker in self.workers:
+            worker.daemon = True
+            worker.start()
+
+    def on(self, type_=None, handler=None, inline=False):
+        """
+        Set the handler of a message type
+        :param type_: message type, e.g. arbitration or packet
+        :param handler: function that gets the message
+        :param inline: call the handler on the receive thread instead of a worker
+        :return:
+        """
+        self.handlers[type_] = (handler, inline)
+
+    def dispatch(self, message=None):
+        """
+        Dispatch a received message, never blocks
+        :param message: StreamMessageResponse
+        :return:
+        """
+        self.received += 1
+        item = self.handlers.get(message.WhichOneof('update'))
+
+        if item is None:
+            self.dropped += 1
+            return
+
+        handler, inline = item
+
+        if inline:
+            handler(message)
+            return
+
+        with self.condition:
+            if len(self.buffer) >= self.capacity:
+                self.buffer.popleft()
+                self.overflows += 1
+
+            self.buffer.append((handler, message))
+            self.condition.notify()
+
+    def work(self):
+        """
+        Call the handlers of the buffered messages
+        :return:
+        """
+        while True:
+            with self.condition:
+                while self.running and not self.buffer:
+                    self.condition.wait()
+
+                if not self.running:
+                    return
+
+                handler, message = self.buffer.popleft()
+
+                overflows = self.overflows - self.reported_overflows
+                self.reported_overflows = self.overflows
+
+            if overflows:
+                Log.info("Stream buffer of", self.name, "full,", overflows, "messages dropped")
+
+            try:
+                handler(message)
+            except Exception as e:
+                Log.error("Error in stream handler of", self.name, e)
+
+    def get_counters(self):
+        """
+        Returns the counters of the dispatcher
+        :return: dict
+        """
+        with self.condition:
+            return {'received': self.received, 'dropped': self.dropped,
+                    'overflows': self.overflows, 'buffered': len(self.buffer)}
+
+    def stop(self):
+        """
+        Stop the workers, buffered messages are dropped
+        :return:
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
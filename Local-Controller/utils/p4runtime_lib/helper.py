@@ -12,34 +12,77 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import os
 import re
 
 import google.protobuf.text_format
 from p4.v1 import p4runtime_pb2
 from p4.config.v1 import p4info_pb2
 
-from utils.p4runtime_lib.convert import encode
+from utils.p4runtime_lib.convert import encoder
 
 class P4InfoHelper(object):
     def __init__(self, p4_info_filepath):
         p4info = p4info_pb2.P4Info()
-        # Load the p4info file into a skeleton P4Info object
-        with open(p4_info_filepath) as p4info_f:
-            google.protobuf.text_format.Merge(p4info_f.read(), p4info)
+        cache_filepath = p4_info_filepath + '.bin'
+
+        # The binary cache next to the text file is parsed much faster than the text format
+        if os.path.exists(cache_filepath) and \
+                os.path.getmtime(cache_filepath) >= os.path.getmtime(p4_info_filepath):
+            with open(cache_filepath, 'rb') as cache_f:
+                p4info.ParseFromString(cache_f.read())
+        else:
+            # Load the p4info file into a skeleton P4Info object
+            with open(p4_info_filepath) as p4info_f:
+                google.protobuf.text_format.Merge(p4info_f.read(), p4info)
+
+            try:
+                with open(cache_filepath, 'wb') as cache_f:
+                    cache_f.write(p4info.SerializeToString())
+            except IOError:
+                pass  # e.g. read-only build directory, parse the text file next time again
         self.p4info = p4info
 
+        # Lookup indexes, built once instead of scanning the p4info on every call
+        # {entity_type: ({name or alias: entity}, {id: entity})}, built on first use per entity type
+        self.entities = {}
+
+        # {(table_name, name or id): (match field, encoder)}
+        self.match_fields = {}
+        for t in p4info.tables:
+            for mf in t.match_fields:
+                match_field = (mf, encoder(mf.bitwidth))
+                self.match_fields.setdefault((t.preamble.name, mf.name), match_field)
+                self.match_fields.setdefault((t.preamble.name, mf.id), match_field)
+
+        # {(action_name, name or id): (param, encoder)}
+        self.action_params = {}
+        for a in p4info.actions:
+            for p in a.params:
+                action_param = (p, encoder(p.bitwidth))
+                self.action_params.setdefault((a.preamble.name, p.name), action_param)
+                self.action_params.setdefault((a.preamble.name, p.id), action_param)
+
+    def get_entities(self, entity_type):
+        if entity_type not in self.entities:
+            by_name = {}
+            by_id = {}
+            for o in getattr(self.p4info, entity_type):
+                pre = o.preamble
+                by_name.setdefault(pre.name, o)
+                by_name.setdefault(pre.alias, o)
+                by_id.setdefault(pre.id, o)
+            self.entities[entity_type] = (by_name, by_id)
+        return self.entities[entity_type]
+
     def get(self, entity_type, name=None, id=None):
         if name is not None and id is not None:
             raise AssertionError("name or id must be None")
 
-        for o in getattr(self.p4info, entity_type):
-            pre = o.preamble
-            if name:
-                if (pre.name == name or pre.alias == name):
-                    return o
-            else:
-                if pre.id == id:
-                    return o
+        by_name, by_id = self.get_entities(entity_type)
+        o = by_name.get(name) if name else by_id.get(id)
+        if o is not None:
+            return o
 
         if name:
             raise AttributeError("Could not find %r of type %s" % (name, entity_type))
@@ -73,16 +116,12 @@ class P4InfoHelper(object):
         raise AttributeError("%r object has no attribute %r" % (self.__class__, attr))
 
     def get_match_field(self, table_name, name=None, id=None):
-        for t in self.p4info.tables:
-            pre = t.preamble
-            if pre.name == table_name:
-                for mf in t.match_fields:
-                    if name is not None:
-                        if mf.name == name:
-                            return mf
-                    elif id is not None:
-                        if mf.id == id:
-                            return mf
+        return self.get_match_field_encoder(table_name, name=name, id=id)[0]
+
+    def get_match_field_encoder(self, table_name, name=None, id=None):
+        match_field = self.match_fields.get((table_name, name if name is not None else id))
+        if match_field is not None:
+            return match_field
         raise AttributeError("%r has no attribute %r" % (table_name, name if name is not None else id))
 
     def get_match_field_id(self, table_name, match_field_name):
@@ -92,27 +131,26 @@ class P4InfoHelper(object):
         return self.get_match_field(table_name, id=match_field_id).name
 
     def get_match_field_pb(self, table_name, match_field_name, value):
-        p4info_match = self.get_match_field(table_name, match_field_name)
-        bitwidth = p4info_match.bitwidth
+        p4info_match, encode = self.get_match_field_encoder(table_name, match_field_name)
         p4runtime_match = p4runtime_pb2.FieldMatch()
         p4runtime_match.field_id = p4info_match.id
         match_type = p4info_match.match_type
 
         if match_type == p4info_pb2.MatchField.EXACT:
             exact = p4runtime_match.exact
-            exact.value = encode(value, bitwidth)
+            exact.value = encode(value)
         elif match_type == p4info_pb2.MatchField.LPM:
             lpm = p4runtime_match.lpm
-            lpm.value = encode(value[0], bitwidth)
+            lpm.value = encode(value[0])
             lpm.prefix_len = value[1]
         elif match_type == p4info_pb2.MatchField.TERNARY:
             lpm = p4runtime_match.ternary
-            lpm.value = encode(value[0], bitwidth)
-            lpm.mask = encode(value[1], bitwidth)
+            lpm.value = encode(value[0])
+            lpm.mask = encode(value[1])
         elif match_type == p4info_pb2.MatchField.RANGE:
             lpm = p4runtime_match.range
-            lpm.low = encode(value[0], bitwidth)
-            lpm.high = encode(value[1], bitwidth)
+            lpm.low = encode(value[0])
+            lpm.high = encode(value[1])
         else:
             raise Exception("Unsupported match type with type %r" % match_type)
         return p4runtime_match
@@ -133,17 +171,13 @@ class P4InfoHelper(object):
             raise Exception("Unsupported match type with type %r" % match_type)
 
     def get_action_param(self, action_name, name=None, id=None):
-        for a in self.p4info.actions:
-            pre = a.preamble
-            if pre.name == action_name:
-                for p in a.params:
-                    if name is not None:
-                        if p.name == name:
-                            return p
-                    elif id is not None:
-                        if p.id == id:
-                            return p
-        raise AttributeError("action %r has no param %r, (has: %r)" % (action_name, name if name is not None else id, a.params))
+        return self.get_action_param_encoder(action_name, name=name, id=id)[0]
+
+    def get_action_param_encoder(self, action_name, name=None, id=None):
+        action_param = self.action_params.get((action_name, name if name is not None else id))
+        if action_param is not None:
+            return action_param
+        raise AttributeError("action %r has no param %r" % (action_name, name if name is not None else id))
 
     def get_action_param_id(self, action_name, param_name):
         return self.get_action_param(action_name, name=param_name).id
@@ -152,10 +186,10 @@ class P4InfoHelper(object):
         return self.get_action_param(action_name, id=param_id).name
 
     def get_action_param_pb(self, action_name, param_name, value):
-        p4info_param = self.get_action_param(action_name, param_name)
+        p4info_param, encode = self.get_action_param_encoder(action_name, param_name)
         p4runtime_param = p4runtime_pb2.Action.Param()
         p4runtime_param.param_id = p4info_param.id
-        p4runtime_param.value = encode(value, p4info_param.bitwidth)
+        p4runtime_param.value = encode(value)
         return p4runtime_param
 
     def buildTableEntry(self,
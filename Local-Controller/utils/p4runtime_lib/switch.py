@@ -17,12 +17,14 @@ from abc import abstractmethod
 from datetime import datetime
 
 import grpc
+from google.rpc import status_pb2
 from p4.v1 import p4runtime_pb2
 from p4.tmp import p4config_pb2
 from libs.core.Log import Log
 import threading
 import time
 from libs.core.Event import Event
+from utils.p4runtime_lib.dispatcher import StreamDispatcher
 
 MSG_LOG_MAX_LEN = 1024
 
@@ -39,10 +41,44 @@ def RemoveConnection(c):
     connections.remove(c)
 
 
+class WriteError(Exception):
+    """Error of a single update of a WriteRequest"""
+
+    def __init__(self, canonical_code=None, message=None):
+        self.canonical_code = canonical_code
+        self.message = message
+        Exception.__init__(self, "%s (code %s)" % (message, canonical_code))
+
+
+def GetUpdateErrors(e, count):
+    """Maps the error of a WriteRequest to its updates, the p4runtime server sends
+    one p4.v1.Error per update in the status details, canonical code 0 (OK) if the update succeeded.
+    Returns a list with one error or None per update"""
+    for key, value in e.trailing_metadata() or ():
+        if key != 'grpc-status-details-bin':
+            continue
+
+        status = status_pb2.Status()
+        status.ParseFromString(value)
+
+        if len(status.details) != count:
+            break
+
+        errors = []
+        for detail in status.details:
+            error = p4runtime_pb2.Error()
+            detail.Unpack(error)
+            errors.append(WriteError(error.canonical_code, error.message) if error.canonical_code != 0 else None)
+        return errors
+
+    # no details, the error belongs to all updates
+    return [e] * count
+
+
 class SwitchConnection(object):
 
     def __init__(self, name=None, address='127.0.0.1:50051', device_id=0,
-                 proto_dump_file=None):
+                 proto_dump_file=None, packet_in_buffer=1024, packet_in_workers=1):
         self.name = name
         self.address = address
         self.device_id = device_id
@@ -55,9 +91,15 @@ class SwitchConnection(object):
         self.client_stub = p4runtime_pb2.P4RuntimeStub(self.channel)
 
         self.proto_dump_file = proto_dump_file
+        self.writer = BatchWriter(self)
         self.stream_out_q = IterableQueue()
         self.stream_in_q = IterableQueue()
 
+        # arbitration responses are queued for get_stream_packet, packet-ins are handled by workers
+        self.dispatcher = StreamDispatcher(name=name, capacity=packet_in_buffer, workers=packet_in_workers)
+        self.dispatcher.on('arbitration', self.stream_in_q.put, inline=True)
+        self.dispatcher.on('packet', self.packet_in)
+
         self.stream = self.client_stub.StreamChannel(self.stream_req_iterator())
         self.stream_recv_thread = threading.Thread(
             target=self.stream_recv, args=(self.stream,))
@@ -84,14 +126,13 @@ class SwitchConnection(object):
     def stream_recv(self, stream):
         try:
             for p in stream:
-                self.stream_in_q.put(p)
-                Event.trigger("packet_in", packet=p, switch=self.name)
-
+                self.dispatcher.dispatch(p)
 
         except grpc.RpcError as e:
             pass  # arbitration end
 
-
+    def packet_in(self, p):
+        Event.trigger("packet_in", packet=p, switch=self.name)
 
     @abstractmethod
     def buildDeviceConfig(self, **kwargs):
@@ -99,6 +140,8 @@ class SwitchConnection(object):
 
     def shutdown(self):
         self.active = False
+        self.writer.stop()
+        self.dispatcher.stop()
         self.stream_out_q.put(None)
         self.stream_recv_thread.join()
 
@@ -117,7 +160,19 @@ class SwitchConnection(object):
         else:
             return True
 
-    def SetForwardingPipelineConfig(self, p4info, dry_run=False, **kwargs):
+    def GetForwardingPipelineCookie(self):
+        request = p4runtime_pb2.GetForwardingPipelineConfigRequest()
+        request.device_id = self.device_id
+        request.response_type = p4runtime_pb2.GetForwardingPipelineConfigRequest.COOKIE_ONLY
+
+        response = self.client_stub.GetForwardingPipelineConfig(request)
+
+        if not response.config.HasField('cookie'):
+            return None
+
+        return response.config.cookie.cookie
+
+    def SetForwardingPipelineConfig(self, p4info, dry_run=False, cookie=None, **kwargs):
         device_config = self.buildDeviceConfig(**kwargs)
         request = p4runtime_pb2.SetForwardingPipelineConfigRequest()
         request.election_id.low = 1
@@ -126,6 +181,9 @@ class SwitchConnection(object):
         config.p4info.CopyFrom(p4info)
         config.p4_device_config = device_config.SerializeToString()
 
+        if cookie is not None:
+            config.cookie.cookie = cookie
+
         request.action = p4runtime_pb2.SetForwardingPipelineConfigRequest.VERIFY_AND_COMMIT
         if dry_run:
             print("P4Runtime SetForwardingPipelineConfig:", request)
@@ -173,6 +231,34 @@ class SwitchConnection(object):
             self.client_stub.Write(request)
 
 
+    def WriteUpdates(self, updates, dry_run=False):
+        """Writes a list of (update type, table entry) in one WriteRequest,
+        returns a list with one error or None per update"""
+
+        if not self.active:
+            return [None] * len(updates)
+
+        request = p4runtime_pb2.WriteRequest()
+        request.device_id = self.device_id
+        request.election_id.low = 1
+        request.election_id.high = 0
+
+        for update_type, table_entry in updates:
+            update = request.updates.add()
+            update.type = update_type
+            update.entity.table_entry.CopyFrom(table_entry)
+
+        if dry_run:
+            print("P4Runtime Write:", request)
+            return [None] * len(updates)
+
+        try:
+            self.client_stub.Write(request)
+        except grpc.RpcError as e:
+            return GetUpdateErrors(e, len(updates))
+
+        return [None] * len(updates)
+
     def WritePacketOut(self, payload):
         if not self.active:
             return
@@ -248,6 +334,98 @@ class SwitchConnection(object):
         return None
 
 
+class BatchWriter(object):
+    """Accumulates table entry updates of a switch connection and writes them as one WriteRequest.
+    The pending updates are written when max_updates are pending, max_delay seconds
+    after the first pending update or when flush is called, always in the order they were added"""
+
+    def __init__(self, connection, max_updates=1000, max_delay=0.01):
+        self.connection = connection
+        self.max_updates = max_updates
+        self.max_delay = max_delay
+
+        # [(update type, table entry, callback)]
+        self.pending = []
+
+        # time of the oldest pending update, None if there is none
+        self.since = None
+
+        self.condition = threading.Condition()
+
+        # held while a batch is written, keeps the order of the batches
+        self.write_lock = threading.Lock()
+
+        self.running = True
+        self.thread = threading.Thread(target=self.flush_delayed)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def insert(self, table_entry, callback=None):
+        self.add(p4runtime_pb2.Update.INSERT, table_entry, callback)
+
+    def modify(self, table_entry, callback=None):
+        self.add(p4runtime_pb2.Update.MODIFY, table_entry, callback)
+
+    def delete(self, table_entry, callback=None):
+        self.add(p4runtime_pb2.Update.DELETE, table_entry, callback)
+
+    def add(self, update_type, table_entry, callback=None):
+        """Adds an update, callback(error) is called after the update has been written,
+        error is None if it succeeded"""
+        with self.condition:
+            self.pending.append((update_type, table_entry, callback))
+
+            if self.since is None:
+                self.since = time.time()
+                self.condition.notify()
+
+            full = len(self.pending) >= self.max_updates
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Writes all pending updates, returns after their callbacks have been called"""
+        with self.write_lock:
+            while True:
+                with self.condition:
+                    batch = self.pending[:self.max_updates]
+                    del self.pending[:self.max_updates]
+                    self.since = time.time() if self.pending else None
+
+                if not batch:
+                    return
+
+                errors = self.connection.WriteUpdates([(update_type, table_entry)
+                                                       for update_type, table_entry, _ in batch])
+
+                for (_, _, callback), error in zip(batch, errors):
+                    if callback is not None:
+                        callback(error)
+
+    def flush_delayed(self):
+        while True:
+            with self.condition:
+                while self.running and self.since is None:
+                    self.condition.wait()
+
+                if not self.running:
+                    return
+
+                remaining = self.since + self.max_delay - time.time()
+
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+
+            self.flush()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+
 class GrpcRequestLogger(grpc.UnaryUnaryClientInterceptor,
                         grpc.UnaryStreamClientInterceptor):
     """Implementation of a gRPC interceptor that logs request to a file"""